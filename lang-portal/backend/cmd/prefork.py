@@ -0,0 +1,338 @@
+"""Preforking production server.
+
+The master binds the listening socket, checks the schema once in a
+short-lived child, then forks SERVER_WORKERS workers that share the
+socket. Each worker builds its own app, warms its caches and only then
+starts accepting connections, serving them from a pool of SERVER_THREADS
+threads.
+
+Signals to the master:
+    SIGHUP           graceful restart: start and warm a new set of workers,
+                     then let the old ones finish their requests and exit
+    SIGTERM, SIGINT  graceful shutdown
+
+The app modules are only imported in the children, so a restart picks up
+new code and configuration.
+
+    python cmd/prefork.py --workers 4 --threads 8 --port 5000
+"""
+import argparse
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# The backend directory goes first so that its cmd package wins over the
+# standard library module of that name
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from config import Config
+
+class PooledRequestHandler(WSGIRequestHandler):
+    # One request per connection, so a keep-alive client never holds a pool thread
+    protocol_version = 'HTTP/1.0'
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug server that handles connections on a fixed pool of threads.
+
+    Requests for ``stream_paths`` stay open indefinitely, so they are moved
+    to a thread of their own instead of pinning one of the pool's.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, stream_paths=(), fd=None):
+        super().__init__(host, port, app, handler=PooledRequestHandler, fd=fd)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+        self.stream_prefixes = tuple(f'GET {path}'.encode() for path in stream_paths)
+        self._streams = set()
+        self._streams_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        if self._is_stream(request):
+            thread = threading.Thread(target=self._handle_stream, args=(request, client_address),
+                                      name='stream', daemon=True)
+            with self._streams_lock:
+                self._streams.add(thread)
+            thread.start()
+            return
+        self._finish(request, client_address)
+
+    def _handle_stream(self, request, client_address):
+        try:
+            self._finish(request, client_address)
+        finally:
+            with self._streams_lock:
+                self._streams.discard(threading.current_thread())
+
+    def _finish(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def _is_stream(self, request):
+        if not self.stream_prefixes:
+            return False
+        # Peek at the request line; a line split across packets is served on the pool
+        try:
+            head = request.recv(max(map(len, self.stream_prefixes)), socket.MSG_PEEK)
+        except OSError:
+            return False
+        return head.startswith(self.stream_prefixes)
+
+    def drain(self):
+        """Wait for the requests already accepted to finish; open streams must be ended first"""
+        self.executor.shutdown(wait=True)
+        with self._streams_lock:
+            streams = list(self._streams)
+        for thread in streams:
+            thread.join()
+
+def load_app(config=None):
+    from cmd.server import create_app
+    return create_app(config)
+
+def warm_up(app):
+    """Fill the statement, entity and group caches before a worker takes traffic.
+
+    The warm-up paths compile and cache the hot statements and open the
+    pool's connection; groups and activities are then loaded into the
+    entity caches and group member lists.
+    """
+    from internal.cache.entities import get_activity, get_group
+    from internal.cache.groups import group_word_ids
+    from internal.models.models import db, Group, StudyActivity
+
+    client = app.test_client()
+    for path in app.config['WARMUP_PATHS']:
+        client.get(path)
+
+    with app.app_context():
+        group_ids = [row[0] for row in db.session.query(Group.id)
+                     .order_by(Group.id).limit(app.config['WARMUP_MAX_GROUPS'])]
+        for group_id in group_ids:
+            get_group(group_id)
+            group_word_ids(group_id)
+        for (activity_id,) in db.session.query(StudyActivity.id):
+            get_activity(activity_id)
+    return len(group_ids)
+
+class PreforkServer:
+    """Master process: owns the socket, forks workers and replaces them on SIGHUP"""
+
+    def __init__(self, host='0.0.0.0', port=5000, workers=1, threads=8, config=None,
+                 graceful_timeout=30, boot_timeout=60):
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.threads = threads
+        self.config = dict(config or {})
+        self.graceful_timeout = graceful_timeout
+        self.boot_timeout = boot_timeout
+
+        self.socket = None
+        self.workers = set()
+        self._retiring = {}
+        self._signals = []
+
+    def run(self):
+        self.socket = socket.create_server((self.host, self.port), backlog=2048)
+        self.port = self.socket.getsockname()[1]
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self._signals.append(signum))
+
+        if not self._preflight():
+            return 1
+        self.workers = self._spawn_generation()
+        if not self.workers:
+            return 1
+        self.log(f'Listening on http://{self.host}:{self.port} with {len(self.workers)} workers, '
+                 f'{self.threads} threads each')
+
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                else:
+                    return self.shutdown()
+            self._reap()
+            time.sleep(0.2)
+
+    def reload(self):
+        """Swap in a warm set of workers, then retire the old set"""
+        self.log('Reloading')
+        if not self._preflight():
+            self.log('Reload aborted, keeping the current workers')
+            return
+        workers = self._spawn_generation()
+        if len(workers) < self.worker_count:
+            self.log('Reload aborted, new workers failed to boot')
+            self._retire(workers)
+            return
+        old, self.workers = self.workers, workers
+        self._retire(old)
+        self.log(f'Reloaded with {len(self.workers)} workers')
+
+    def shutdown(self):
+        self.log('Shutting down')
+        self._retire(self.workers)
+        self.workers = set()
+        while self._retiring:
+            self._reap()
+            time.sleep(0.1)
+        self.socket.close()
+        return 0
+
+    def _preflight(self):
+        """Create the app once in a throwaway child so schema changes run exactly once"""
+        pid = os.fork()
+        if pid == 0:
+            self._child(lambda: load_app(self.config))
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            self.log('Application failed to start')
+            return False
+        return True
+
+    def _spawn_generation(self, count=None):
+        """Fork a full set of workers (or ``count``) and wait until each has warmed up"""
+        pending = dict(self._spawn() for _ in range(count or self.worker_count))
+        ready = set()
+        deadline = time.monotonic() + self.boot_timeout
+        while pending and time.monotonic() < deadline:
+            readable, _, _ = select.select(list(pending), [], [], deadline - time.monotonic())
+            for fd in readable:
+                pid = pending.pop(fd)
+                if os.read(fd, 1):
+                    ready.add(pid)
+                os.close(fd)
+        for fd, pid in pending.items():
+            os.close(fd)
+            self._retire({pid})
+        return ready
+
+    def _spawn(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._child(lambda: self._serve(write_fd))
+        os.close(write_fd)
+        return read_fd, pid
+
+    def _child(self, target):
+        for signum in (signal.SIGHUP, signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, signal.SIG_DFL)
+        # Ctrl-C reaches the whole process group; only the master reacts to it
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        code = 0
+        try:
+            target()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip the master's atexit handlers and buffered state
+            os._exit(code)
+
+    def _serve(self, ready_fd):
+        app = load_app(self.config)
+        groups = warm_up(app)
+        server = PooledWSGIServer(self.host, self.port, app, self.threads,
+                                  stream_paths=app.config['SERVER_STREAM_PATHS'], fd=self.socket.fileno())
+        self.socket.close()
+
+        # shutdown() waits for serve_forever() to return, so it cannot run in the handler itself
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+        self.log(f'Worker {os.getpid()} ready ({groups} groups warmed)')
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+
+        server.serve_forever()
+        # Dashboard streams never end by themselves; they tell their clients
+        # to reconnect (to another worker) and finish
+        from internal.events import dashboard_hub
+        dashboard_hub.close()
+        server.drain()
+        write_queue = app.extensions.get('review_write_queue')
+        if write_queue is not None:
+            write_queue.stop()
+
+    def _retire(self, pids):
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                self._retiring[pid] = deadline
+            except ProcessLookupError:
+                pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self._retiring.pop(pid, None) is None and pid in self.workers:
+                self.workers.discard(pid)
+                self.log(f'Worker {pid} died (exit code {os.waitstatus_to_exitcode(status)}), replacing it')
+                self.workers |= self._spawn_generation(1)
+
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now > deadline:
+                self.log(f'Worker {pid} did not stop in time, killing it')
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    self._retiring.pop(pid)
+                else:
+                    self._retiring[pid] = float('inf')
+
+    def log(self, message):
+        # One write per line, so lines from the master and workers never interleave
+        os.write(1, f'[prefork {os.getpid()}] {message}\n'.encode())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the API with several preforked worker processes')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000, help='0 picks a free port')
+    parser.add_argument('--workers', type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument('--threads', type=int, default=Config.SERVER_THREADS, help='Request threads per worker')
+    parser.add_argument('--graceful-timeout', type=float, default=Config.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument('--database', help='SQLite file to serve instead of db/words.db')
+    args = parser.parse_args(argv)
+
+    config = {'DEBUG': False}
+    if args.database:
+        config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{Path(args.database).resolve()}'
+    # Workers cache entities independently, so they have to see each other's writes
+    if args.workers > 1 and 'CACHE_COHERENCE' not in os.environ:
+        config['CACHE_COHERENCE'] = True
+
+    server = PreforkServer(args.host, args.port, args.workers, args.threads, config,
+                           graceful_timeout=args.graceful_timeout)
+    return server.run()
+
+if __name__ == '__main__':
+    sys.exit(main())
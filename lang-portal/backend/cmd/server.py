@@ -1,5 +1,4 @@
 from flask import Flask, jsonify
-from flask_restful import Api, Resource
 import sys
 from pathlib import Path
 
@@ -9,44 +8,104 @@ sys.path.append(str(backend_dir))
 
 from internal.models.models import db
 from config import Config
-from internal.handlers.dashboard import LastStudySessionAPI, StudyProgressAPI, QuickStatsAPI
-from internal.handlers.words import WordListAPI, WordAPI
-from internal.handlers.groups import GroupListAPI, GroupAPI, GroupWordsAPI, GroupStudySessionsAPI
-from internal.handlers.study_sessions import StudySessionListAPI, StudySessionAPI, StudySessionWordsAPI
-from internal.handlers.activities import StudyActivityListAPI, StudyActivityAPI
-from internal.handlers.word_reviews import WordReviewAPI, WordReviewListAPI, WordReviewSessionAPI
-from internal.middleware.error_handler import register_error_handlers
-from internal.handlers.reset import ResetHistory, FullReset
-
-def create_app():
-    """Application factory function"""
+from internal.middleware.error_handler import RestfulApi, register_error_handlers
+from internal.middleware.profiler import init_profiler
+from internal.middleware.slow_query import init_slow_query_log
+from internal.storage.sharding import init_sharding
+from internal.storage.schema import ensure_schema
+from internal.cache.coherence import init_cache_coherence
+
+def create_db_app(config=None):
+    """Minimal app with only config and the database, for CLI tasks"""
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
 
-    # Initialize extensions
     db.init_app(app)
-    api = Api(app)
+    return app
+
+def create_app(config=None):
+    """Application factory function"""
+    app = create_db_app(config)
+    api = RestfulApi(app)
 
     # Register error handlers
     register_error_handlers(app)
 
-    with app.app_context():
-        db.create_all()
+    # Opt-in sampling profiler; registered first so it covers the other hooks
+    init_profiler(app)
+
+    # Log slow statements from every engine when SLOW_QUERY_MS is set
+    init_slow_query_log(app)
+
+    # Route learner requests to their own database shard when enabled
+    init_sharding(app)
+
+    # Only does work the first time a database sees this schema version
+    ensure_schema(app)
+
+    # Notice writes from other worker processes (needs the schema in place)
+    init_cache_coherence(app)
 
     # Register API resources
+    register_resources(api)
+
+    # Health check endpoint
+    @app.route('/api/health')
+    def health_check():
+        return jsonify({'status': 'healthy'}), 200
+
+    # Debug routes endpoint (only enabled in debug mode)
+    @app.route('/debug/routes')
+    def list_routes():
+        if not app.debug:
+            return jsonify({'error': 'Only available in debug mode'}), 403
+
+        routes = []
+        for rule in app.url_map.iter_rules():
+            routes.append({
+                'endpoint': rule.endpoint,
+                'methods': list(rule.methods),
+                'path': str(rule)
+            })
+        return jsonify({'routes': routes})
+
+    return app
+
+def register_resources(api):
+    """Handlers are imported here so that CLI tasks never load them"""
+    from internal.handlers.dashboard import LastStudySessionAPI, StudyProgressAPI, QuickStatsAPI, DashboardStreamAPI, init_dashboard_coherence
+    from internal.handlers.words import WordListAPI, WordAPI, DifficultWordsAPI
+    from internal.handlers.groups import GroupListAPI, GroupAPI, GroupWordsAPI, GroupStudySessionsAPI, GroupSampleAPI, GroupDeckAPI, GroupMembersAPI
+    from internal.handlers.study_sessions import StudySessionListAPI, StudySessionAPI, StudySessionWordsAPI
+    from internal.handlers.activities import StudyActivityListAPI, StudyActivityAPI
+    from internal.handlers.word_reviews import WordReviewAPI, WordReviewListAPI, WordReviewSessionAPI
+    from internal.handlers.reset import ResetHistory, FullReset
+    from internal.handlers.cache import CacheStatsAPI
+    from internal.handlers.batch import BatchAPI
+    from internal.handlers.changes import ChangesAPI
+    from internal.handlers.analytics import RetentionAPI, IntervalRecallAPI, CohortsAPI, AnalyticsExportAPI
+
     api.add_resource(LastStudySessionAPI, '/api/dashboard/last_study_session')
     api.add_resource(StudyProgressAPI, '/api/dashboard/study_progress')
     api.add_resource(QuickStatsAPI, '/api/dashboard/quick_stats')
+    api.add_resource(DashboardStreamAPI, '/api/dashboard/stream')
+    init_dashboard_coherence(api.app)
     api.add_resource(ResetHistory, '/api/reset_history')  # Add this line
     api.add_resource(FullReset, '/api/full_reset')       # Add this line
 
     api.add_resource(WordListAPI, '/api/words')
     api.add_resource(WordAPI, '/api/words/<int:word_id>')
+    api.add_resource(DifficultWordsAPI, '/api/words/difficult')
 
     api.add_resource(GroupListAPI, '/api/groups')
     api.add_resource(GroupAPI, '/api/groups/<int:group_id>')
     api.add_resource(GroupWordsAPI, '/api/groups/<int:group_id>/words')
     api.add_resource(GroupStudySessionsAPI, '/api/groups/<int:group_id>/study_sessions')  # Add this line
+    api.add_resource(GroupSampleAPI, '/api/groups/<int:group_id>/sample')
+    api.add_resource(GroupDeckAPI, '/api/groups/<int:group_id>/deck')
+    api.add_resource(GroupMembersAPI, '/api/groups/<int:group_id>/members')
 
     api.add_resource(StudySessionListAPI, '/api/study_sessions')
     api.add_resource(StudySessionAPI, '/api/study_sessions/<int:session_id>')
@@ -59,28 +118,17 @@ def create_app():
     api.add_resource(WordReviewAPI, '/api/word_reviews/<int:review_id>')
     api.add_resource(WordReviewSessionAPI, '/api/study_sessions/<int:session_id>/words/<int:word_id>/review')
 
-    # Health check endpoint
-    @app.route('/api/health')
-    def health_check():
-        return jsonify({'status': 'healthy'}), 200
+    api.add_resource(CacheStatsAPI, '/api/cache/stats')
 
-    # Debug routes endpoint (only enabled in debug mode)
-    @app.route('/debug/routes')
-    def list_routes():
-        if not app.debug:
-            return jsonify({'error': 'Only available in debug mode'}), 403
-        
-        routes = []
-        for rule in app.url_map.iter_rules():
-            routes.append({
-                'endpoint': rule.endpoint,
-                'methods': list(rule.methods),
-                'path': str(rule)
-            })
-        return jsonify({'routes': routes})
+    api.add_resource(BatchAPI, '/api/batch')
 
-    return app
+    api.add_resource(ChangesAPI, '/api/changes')
+
+    api.add_resource(RetentionAPI, '/api/analytics/retention')
+    api.add_resource(IntervalRecallAPI, '/api/analytics/intervals')
+    api.add_resource(CohortsAPI, '/api/analytics/cohorts')
+    api.add_resource(AnalyticsExportAPI, '/api/analytics/export')
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
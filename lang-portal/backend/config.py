@@ -10,6 +10,62 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{BASE_DIR}/db/words.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Per-learner sharding: sessions and reviews go to db/shards/<learner>.db
+    SHARDING_ENABLED = os.environ.get('SHARDING_ENABLED', '0') == '1'
+    SHARD_DIR = BASE_DIR / 'db' / 'shards'
+    SHARD_MAX_OPEN_ENGINES = 32
+    LEARNER_HEADER = 'X-Learner-Id'
+
+    # Group commit for review writes: one writer thread commits batches
+    REVIEW_WRITE_QUEUE = os.environ.get('REVIEW_WRITE_QUEUE', '0') == '1'
+    REVIEW_WRITE_BATCH_SIZE = 64
+    REVIEW_WRITE_MAX_DELAY_MS = 5
+
+    # Drop in-process caches when another worker process writes the tables
+    # they were built from; checked before each request, at most once per interval
+    CACHE_COHERENCE = os.environ.get('CACHE_COHERENCE', '0') == '1'
+    CACHE_COHERENCE_INTERVAL_MS = 0
+
+    # Request profiling: requests signed with PROFILER_SECRET in the
+    # PROFILER_HEADER, plus a random PROFILER_SAMPLE_RATE share, are sampled
+    # and written to PROFILER_DIR (the newest PROFILER_KEEP are kept)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+    PROFILER_SECRET = os.environ.get('PROFILER_SECRET')
+    PROFILER_HEADER = 'X-Profile'
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0'))
+    PROFILER_INTERVAL_MS = 5
+    PROFILER_DIR = BASE_DIR / 'db' / 'profiles'
+    PROFILER_KEEP = 50
+
+    # Slow-query log: statements over SLOW_QUERY_MS (unset disables it) are
+    # written as JSON lines with their caller and EXPLAIN QUERY PLAN output
+    SLOW_QUERY_MS = float(os.environ['SLOW_QUERY_MS']) if os.environ.get('SLOW_QUERY_MS') else None
+    SLOW_QUERY_EXPLAIN = True
+    SLOW_QUERY_LOG_FILE = BASE_DIR / 'logs' / 'slow_queries.log'
+
+    # Columnar review exports behind /api/analytics, rebuilt when older than this
+    ANALYTICS_DIR = BASE_DIR / 'db' / 'analytics'
+    ANALYTICS_MAX_AGE_SECONDS = 300
+
+    # Prefork server (cmd/prefork.py): worker processes, request threads per
+    # worker, and how long a stopping worker may take to finish its requests
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '8'))
+    SERVER_GRACEFUL_TIMEOUT = 30
+    # Requested by each worker before it takes traffic, to fill the caches
+    WARMUP_PATHS = (
+        '/api/groups',
+        '/api/study_activities',
+        '/api/words',
+        '/api/study_sessions',
+        '/api/dashboard/last_study_session',
+        '/api/dashboard/study_progress',
+        '/api/dashboard/quick_stats',
+    )
+    WARMUP_MAX_GROUPS = 100
+    # Long-lived responses, served on their own threads instead of the pool
+    SERVER_STREAM_PATHS = ('/api/dashboard/stream',)
+
     # Flask settings
     DEBUG = True
     TESTING = False
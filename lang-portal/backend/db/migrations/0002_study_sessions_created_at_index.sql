@@ -0,0 +1,2 @@
+-- Composite index for keyset pagination and time-range filtering of study sessions
+CREATE INDEX IF NOT EXISTS idx_study_sessions_created_at_id ON study_sessions(created_at, id);
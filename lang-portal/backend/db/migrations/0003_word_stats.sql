@@ -0,0 +1,28 @@
+-- Per-word review statistics used to rank difficult words
+CREATE TABLE IF NOT EXISTS word_stats (
+    word_id INTEGER PRIMARY KEY,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    wrong_count INTEGER NOT NULL DEFAULT 0,
+    decayed_correct FLOAT NOT NULL DEFAULT 0,
+    decayed_wrong FLOAT NOT NULL DEFAULT 0,
+    last_reviewed_at DATETIME,
+    score FLOAT NOT NULL DEFAULT 0.5,
+    FOREIGN KEY (word_id) REFERENCES words (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_word_stats_score ON word_stats(score);
+
+-- Backfill from existing reviews (without recency decay)
+INSERT OR IGNORE INTO word_stats (
+    word_id, correct_count, wrong_count, decayed_correct, decayed_wrong, last_reviewed_at, score
+)
+SELECT
+    word_id,
+    COUNT(CASE WHEN correct = 1 THEN 1 END),
+    COUNT(CASE WHEN correct = 0 THEN 1 END),
+    COUNT(CASE WHEN correct = 1 THEN 1 END),
+    COUNT(CASE WHEN correct = 0 THEN 1 END),
+    MAX(created_at),
+    (COUNT(CASE WHEN correct = 0 THEN 1 END) + 1.0) / (COUNT(*) + 2.0)
+FROM word_review_items
+GROUP BY word_id;
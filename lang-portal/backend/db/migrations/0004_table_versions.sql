@@ -0,0 +1,89 @@
+-- Per-table change counters, bumped by triggers on every write. Workers
+-- compare them after PRAGMA data_version reports a commit from another
+-- connection and drop only the caches built from the tables that changed.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO table_versions (table_name) VALUES
+    ('words'),
+    ('groups'),
+    ('words_groups'),
+    ('study_activities'),
+    ('study_sessions');
+
+CREATE TRIGGER IF NOT EXISTS words_insert_version AFTER INSERT ON words
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words';
+END;
+
+CREATE TRIGGER IF NOT EXISTS words_update_version AFTER UPDATE ON words
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words';
+END;
+
+CREATE TRIGGER IF NOT EXISTS words_delete_version AFTER DELETE ON words
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words';
+END;
+
+CREATE TRIGGER IF NOT EXISTS groups_insert_version AFTER INSERT ON groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS groups_update_version AFTER UPDATE ON groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS groups_delete_version AFTER DELETE ON groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS words_groups_insert_version AFTER INSERT ON words_groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words_groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS words_groups_update_version AFTER UPDATE ON words_groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words_groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS words_groups_delete_version AFTER DELETE ON words_groups
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'words_groups';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_activities_insert_version AFTER INSERT ON study_activities
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_activities';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_activities_update_version AFTER UPDATE ON study_activities
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_activities';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_activities_delete_version AFTER DELETE ON study_activities
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_activities';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_sessions_insert_version AFTER INSERT ON study_sessions
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_sessions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_sessions_update_version AFTER UPDATE ON study_sessions
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_sessions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_sessions_delete_version AFTER DELETE ON study_sessions
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'study_sessions';
+END;
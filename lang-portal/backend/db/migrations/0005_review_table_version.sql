@@ -0,0 +1,18 @@
+-- Reviews get a change counter too, so workers notice reviews written by
+-- other processes and reload the dashboard stream snapshot.
+INSERT OR IGNORE INTO table_versions (table_name) VALUES ('word_review_items');
+
+CREATE TRIGGER IF NOT EXISTS word_review_items_insert_version AFTER INSERT ON word_review_items
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'word_review_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS word_review_items_update_version AFTER UPDATE ON word_review_items
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'word_review_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS word_review_items_delete_version AFTER DELETE ON word_review_items
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'word_review_items';
+END;
@@ -0,0 +1,158 @@
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# One .npy file per column; rows are sorted by (learner, word_id, ts) so
+# consecutive reviews of the same word by the same learner are adjacent
+COLUMNS = {
+    'learner': np.int32,
+    'word_id': np.int64,
+    'group_id': np.int64,
+    'ts': np.int64,         # Unix seconds of the (last) review
+    'correct': np.int32,    # Correct answers in the row
+    'reviews': np.int32,    # Reviews in the row; archived daily rows hold several
+}
+
+MANIFEST = 'manifest.json'
+LOCK_FILE = '.lock'
+
+EXPORT_QUERY = """
+    SELECT
+        rh.word_id,
+        ss.group_id,
+        CAST(strftime('%s', rh.last_reviewed_at) AS INTEGER),
+        rh.correct_count,
+        rh.review_count
+    FROM review_history rh
+    JOIN study_sessions ss ON ss.id = rh.study_session_id
+"""
+
+@contextmanager
+def export_lock(out_dir, exclusive=True):
+    """Lock the export directory across processes: exclusive to export and prune, shared to load"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def export_reviews(db_path, out_dir, shard_dir=None, chunk_size=50000):
+    """Export the review history of the database and every shard into .npy columns.
+
+    Each export goes into a fresh version directory and the manifest is
+    switched over atomically, so readers that still have the previous
+    version memory-mapped are never disturbed. Returns the new manifest.
+    """
+    with export_lock(out_dir):
+        return _export(db_path, Path(out_dir), shard_dir, chunk_size)
+
+def _export(db_path, out_dir, shard_dir=None, chunk_size=50000):
+    # Callers hold the exclusive export lock
+    sources = [('', Path(db_path))]
+    if shard_dir and Path(shard_dir).is_dir():
+        sources.extend((path.stem, path) for path in sorted(Path(shard_dir).glob('*.db')))
+
+    chunks = {name: [] for name in COLUMNS}
+    learners = []
+    for learner, path in sources:
+        learner_index = len(learners)
+        learners.append(learner)
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            cursor = conn.execute(EXPORT_QUERY)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                block = np.array(rows, dtype=np.int64).reshape(-1, 5)
+                chunks['learner'].append(np.full(len(block), learner_index, dtype=np.int32))
+                for i, name in enumerate(('word_id', 'group_id', 'ts', 'correct', 'reviews')):
+                    chunks[name].append(block[:, i])
+        except sqlite3.OperationalError:
+            # A shard that has not been opened since review_history was added
+            pass
+        finally:
+            conn.close()
+
+    columns = {
+        name: np.concatenate(chunks[name]).astype(dtype) if chunks[name] else np.empty(0, dtype=dtype)
+        for name, dtype in COLUMNS.items()
+    }
+    order = np.lexsort((columns['ts'], columns['word_id'], columns['learner']))
+
+    version = f'{time.time_ns()}'
+    version_dir = out_dir / version
+    version_dir.mkdir(parents=True)
+    for name, values in columns.items():
+        np.save(version_dir / f'{name}.npy', values[order])
+
+    manifest = {
+        'version': version,
+        'rows': int(len(order)),
+        'learners': learners,
+        'exported_at': time.time()
+    }
+    tmp_path = out_dir / f'.{MANIFEST}.tmp'
+    tmp_path.write_text(json.dumps(manifest))
+    os.replace(tmp_path, out_dir / MANIFEST)
+
+    _prune(out_dir, keep={version})
+    return manifest
+
+def read_manifest(out_dir):
+    try:
+        return json.loads((Path(out_dir) / MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
+
+def load_reviews(out_dir, manifest):
+    """Memory-map the columns of an export; nothing is read until it is used"""
+    version_dir = Path(out_dir) / manifest['version']
+    return {name: np.load(version_dir / f'{name}.npy', mmap_mode='r') for name in COLUMNS}
+
+def _prune(out_dir, keep):
+    # Mapped files stay readable after unlinking, so old versions can go at
+    # once; loads hold the shared lock, so none is between reading the
+    # manifest and mapping its files
+    for path in out_dir.iterdir():
+        if path.is_dir() and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+def current_reviews(app, db_path, refresh=False):
+    """Return (manifest, columns) for the app, re-exporting when the export is missing or stale"""
+    out_dir = app.config['ANALYTICS_DIR']
+    max_age = app.config['ANALYTICS_MAX_AGE_SECONDS']
+
+    def stale(manifest):
+        return manifest is None or time.time() - manifest['exported_at'] > max_age
+
+    if not refresh:
+        with export_lock(out_dir, exclusive=False):
+            manifest = read_manifest(out_dir)
+            if not stale(manifest):
+                return manifest, _mapped_reviews(app, out_dir, manifest)
+
+    with export_lock(out_dir):
+        # Another request or process may have finished an export while we waited
+        manifest = read_manifest(out_dir)
+        if refresh or stale(manifest):
+            shard_dir = app.config['SHARD_DIR'] if app.config['SHARDING_ENABLED'] else None
+            manifest = _export(db_path, Path(out_dir), shard_dir)
+        return manifest, _mapped_reviews(app, out_dir, manifest)
+
+def _mapped_reviews(app, out_dir, manifest):
+    loaded = app.extensions.get('analytics_reviews')
+    if loaded is None or loaded[0] != manifest['version']:
+        loaded = (manifest['version'], load_reviews(out_dir, manifest))
+        app.extensions['analytics_reviews'] = loaded
+    return loaded[1]
@@ -0,0 +1,113 @@
+"""Vectorized retention statistics over exported review columns.
+
+All functions take the column dict from ``load_reviews`` (or any dict of
+equal-length arrays sorted by learner, word_id and ts) and never loop over
+reviews in Python.
+"""
+import numpy as np
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Upper edges of the gaps since the previous review of the same word
+INTERVAL_BUCKETS = (
+    ('< 1h', HOUR),
+    ('1h - 1d', DAY),
+    ('1 - 2d', 2 * DAY),
+    ('2 - 4d', 4 * DAY),
+    ('4 - 7d', WEEK),
+    ('7 - 14d', 2 * WEEK),
+    ('14 - 30d', 30 * DAY),
+    ('30d +', None),
+)
+
+def select(columns, mask):
+    """Rows matching a boolean mask; the sort order is preserved"""
+    if mask is None:
+        return columns
+    return {name: values[mask] for name, values in columns.items()}
+
+def _recall(correct, reviews, bins, size):
+    correct_sums = np.bincount(bins, weights=correct, minlength=size)
+    review_sums = np.bincount(bins, weights=reviews, minlength=size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recall = np.where(review_sums > 0, correct_sums / review_sums, np.nan)
+    return review_sums, recall
+
+def _first_of_run(columns):
+    """True where a row starts a new (learner, word) run"""
+    learner, word_id = columns['learner'], columns['word_id']
+    starts = np.ones(len(word_id), dtype=bool)
+    starts[1:] = (learner[1:] != learner[:-1]) | (word_id[1:] != word_id[:-1])
+    return starts
+
+def interval_recall(columns):
+    """Recall rate by the time since the previous review of the same word"""
+    later = ~_first_of_run(columns)
+    # later[0] is always False, so gap i belongs to row i + 1
+    gaps = np.diff(columns['ts'])[later[1:]]
+
+    edges = np.array([edge for _, edge in INTERVAL_BUCKETS[:-1]])
+    bins = np.searchsorted(edges, gaps, side='right')
+    review_sums, recall = _recall(
+        columns['correct'][later], columns['reviews'][later], bins, len(INTERVAL_BUCKETS)
+    )
+    return [{
+        'interval': label,
+        'reviews': int(count),
+        'recall': None if np.isnan(rate) else round(float(rate), 4)
+    } for (label, _), count, rate in zip(INTERVAL_BUCKETS, review_sums, recall)]
+
+def retention_curve(columns, max_days=30):
+    """Recall rate by days since the word was first reviewed (a forgetting curve).
+
+    The first review of each word is where it was learned, so it is left out.
+    The last bucket collects everything at ``max_days`` or later.
+    """
+    starts = _first_of_run(columns)
+    positions = np.arange(len(starts))
+    first_index = np.maximum.accumulate(np.where(starts, positions, 0))
+    ts = columns['ts']
+    days = np.minimum((ts - ts[first_index]) // DAY, max_days)
+
+    later = ~starts
+    review_sums, recall = _recall(
+        columns['correct'][later], columns['reviews'][later], days[later].astype(np.int64), max_days + 1
+    )
+    return [{
+        'day': day,
+        'reviews': int(count),
+        'recall': None if np.isnan(rate) else round(float(rate), 4)
+    } for day, (count, rate) in enumerate(zip(review_sums, recall))]
+
+def cohorts(columns, learners, max_weeks=12):
+    """Learners grouped by the week of their first review, with the share still active each week after"""
+    learner, ts = columns['learner'], columns['ts']
+    if not len(learner):
+        return []
+
+    first_ts = np.full(len(learners), np.iinfo(np.int64).max)
+    np.minimum.at(first_ts, learner, ts)
+    cohort_week = first_ts // WEEK
+    active = first_ts != np.iinfo(np.int64).max
+
+    offsets = ts // WEEK - cohort_week[learner]
+    keep = offsets <= max_weeks
+    # One entry per (learner, week offset) the learner reviewed in
+    pairs = np.unique(learner[keep].astype(np.int64) * (max_weeks + 1) + offsets[keep])
+    pair_learner, pair_offset = np.divmod(pairs, max_weeks + 1)
+
+    weeks = np.unique(cohort_week[active])
+    week_index = np.searchsorted(weeks, cohort_week)
+    active_counts = np.zeros((len(weeks), max_weeks + 1), dtype=np.int64)
+    np.add.at(active_counts, (week_index[pair_learner], pair_offset), 1)
+    sizes = np.bincount(week_index[active], minlength=len(weeks))
+
+    # Weeks after the newest review have not happened yet
+    last_week = ts.max() // WEEK
+    return [{
+        'cohort_week_start': int(week * WEEK),
+        'learners': int(size),
+        'retention': [round(float(count / size), 4) for count in counts[:last_week - week + 1]]
+    } for week, size, counts in zip(weeks, sizes, active_counts)]
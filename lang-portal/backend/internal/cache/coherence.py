@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+
+from internal.cache.registry import invalidate_tables, clear_all
+
+class TableVersionWatcher:
+    """Notices writes made by other processes and drops the caches they affect.
+
+    Keeps one private connection to the database. ``PRAGMA data_version`` on
+    that connection only changes when some other connection commits, so the
+    common case costs a single pragma. When it changes, the per-table
+    counters in table_versions (bumped by triggers, see migration 0004) tell
+    which tables were written, and only caches built from those are cleared.
+    """
+
+    def __init__(self, db_path, min_interval=0.0):
+        self.db_path = db_path
+        self.min_interval = min_interval
+        self.checks = 0
+        self.invalidations = 0
+        self._conn = None
+        self._pid = None
+        self._data_version = None
+        self._versions = {}
+        self._last_check = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Call ``callback(tables)`` after other processes write; ``tables`` is None when unknown"""
+        self._listeners.append(callback)
+
+    def check(self):
+        """Invalidate caches for tables changed since the last check; returns the changed tables"""
+        now = time.monotonic()
+        if self.min_interval and now - self._last_check < self.min_interval:
+            return set()
+
+        with self._lock:
+            self._last_check = now
+            self.checks += 1
+            conn = self._connection()
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            first_check = self._data_version is None
+            self._data_version = data_version
+
+            try:
+                versions = dict(conn.execute('SELECT table_name, version FROM table_versions'))
+            except sqlite3.OperationalError:
+                # No version table (e.g. the schema was dropped), so we
+                # cannot tell what changed: drop everything
+                versions = None
+            changed = set() if versions is None else {
+                table for table, version in versions.items() if self._versions.get(table) != version
+            }
+            self._versions = versions or {}
+
+        if first_check:
+            return set()
+        if versions is None:
+            clear_all()
+        elif changed:
+            invalidate_tables(*changed)
+        self.invalidations += 1
+        for callback in self._listeners:
+            callback(None if versions is None else changed)
+        return changed
+
+    def stats(self):
+        return {'checks': self.checks, 'invalidations': self.invalidations}
+
+    def _connection(self):
+        # A connection must not be shared with a forked child
+        if self._conn is None or self._pid != os.getpid():
+            if self._conn is not None:
+                # Caches inherited from the parent cannot be checked against
+                # the new connection's baseline
+                clear_all()
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._pid = os.getpid()
+            self._data_version = None
+        return self._conn
+
+def get_watcher(app):
+    return app.extensions.get('table_version_watcher')
+
+def init_cache_coherence(app):
+    """Check for other processes' writes before each request, when CACHE_COHERENCE is on"""
+    if not app.config.get('CACHE_COHERENCE'):
+        return
+
+    from internal.models.models import db
+    with app.app_context():
+        db_path = db.engine.url.database
+    watcher = app.extensions.setdefault('table_version_watcher', TableVersionWatcher(
+        db_path, min_interval=app.config['CACHE_COHERENCE_INTERVAL_MS'] / 1000
+    ))
+    # Read the current versions now, so the first request has a baseline
+    watcher.check()
+
+    @app.before_request
+    def check_table_versions():
+        watcher.check()
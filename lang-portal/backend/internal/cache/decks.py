@@ -0,0 +1,56 @@
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+
+from sqlalchemy import text
+
+from internal.cache.entities import get_group
+from internal.cache.lru import LRUCache
+from internal.cache.registry import register
+from internal.models.models import db
+
+# A deck is rebuilt whenever the group, its words or its memberships change
+deck_cache = register(LRUCache('group_decks', maxsize=128, tables=('groups', 'words', 'words_groups')))
+
+Deck = namedtuple('Deck', ['etag', 'body', 'word_count'])
+
+def build_deck(group_id):
+    """Serialize a group's words once, as gzip-compressed JSON
+
+    Review counters are left out: they change on every review, and a deck is
+    served under an immutable URL. Clients read them from /api/groups/:id/words.
+    """
+    group = get_group(group_id)
+    words = db.session.execute(
+        text("""
+            SELECT
+                w.id, w.kanji, w.romaji, w.english, w.parts
+            FROM words_groups wg
+            JOIN words w ON w.id = wg.word_id
+            WHERE wg.group_id = :group_id
+            ORDER BY w.id
+        """),
+        {"group_id": group_id}
+    ).fetchall()
+
+    payload = json.dumps({
+        "group_id": group_id,
+        "name": group['name'],
+        "items": [{
+            "id": word[0],
+            "kanji": word[1],
+            "romaji": word[2],
+            "english": word[3],
+            "parts": word[4]
+        } for word in words]
+    }, ensure_ascii=False, separators=(',', ':')).encode()
+
+    # mtime=0 keeps the bytes, and so the hash, stable across rebuilds
+    body = gzip.compress(payload, compresslevel=6, mtime=0)
+    etag = hashlib.sha256(payload).hexdigest()[:32]
+    return Deck(etag, body, len(words))
+
+def get_deck(group_id):
+    """Return the cached deck, building it on first use after an invalidation"""
+    return deck_cache.get_or_load(group_id, lambda: build_deck(group_id))
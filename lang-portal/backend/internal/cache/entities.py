@@ -0,0 +1,49 @@
+from flask import abort, g
+
+from internal.cache.lru import LRUCache
+from internal.cache.registry import register
+from internal.models.models import db, Word, Group, StudyActivity, StudySession
+
+# Cached values are plain dicts rather than ORM instances, so they can be
+# shared between requests without being bound to a session.
+word_cache = register(LRUCache('words', maxsize=4096, tables=('words',)))
+group_cache = register(LRUCache('groups', maxsize=512, tables=('groups',)))
+activity_cache = register(LRUCache('study_activities', maxsize=256, tables=('study_activities',)))
+session_cache = register(LRUCache('study_sessions', maxsize=1024, tables=('study_sessions',)))
+
+def _snapshot(model, ident):
+    instance = db.session.get(model, ident)
+    if instance is None:
+        return None
+    return {column.key: getattr(instance, column.key) for column in model.__table__.columns}
+
+def _get_or_404(cache, key, model, ident):
+    entity = cache.get_or_load(key, lambda: _snapshot(model, ident))
+    if entity is None:
+        abort(404)
+    return entity
+
+def get_word(word_id):
+    return _get_or_404(word_cache, word_id, Word, word_id)
+
+def get_group(group_id):
+    return _get_or_404(group_cache, group_id, Group, group_id)
+
+def get_activity(activity_id):
+    return _get_or_404(activity_cache, activity_id, StudyActivity, activity_id)
+
+def get_session(session_id):
+    # Sessions live in per-learner shards, so the learner is part of the key
+    return _get_or_404(session_cache, (g.get('learner_id'), session_id), StudySession, session_id)
+
+def group_name(group_id):
+    if group_id is None:
+        return None
+    group = group_cache.get_or_load(group_id, lambda: _snapshot(Group, group_id))
+    return group['name'] if group else None
+
+def activity_name(activity_id):
+    if activity_id is None:
+        return None
+    activity = activity_cache.get_or_load(activity_id, lambda: _snapshot(StudyActivity, activity_id))
+    return activity['name'] if activity else None
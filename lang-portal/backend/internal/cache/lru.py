@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe bounded LRU cache that counts hits and misses.
+
+    ``tables`` lists the database tables the cached values are derived from,
+    so writers can invalidate every dependent cache by table name.
+
+    ``generation`` goes up on every invalidation. A value loaded while it
+    changed may predate the write, so ``put`` drops it instead of caching it.
+    """
+
+    def __init__(self, name, maxsize=1024, tables=()):
+        self.name = name
+        self.maxsize = maxsize
+        self.tables = frozenset(tables)
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        """Cache ``value``; with ``generation``, only if nothing was invalidated since it was read"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value, calling ``loader`` on a miss.
+
+        ``None`` results are not cached so that missing rows are re-checked.
+        """
+        generation = self.generation
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            self.put(key, value, generation)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize
+            }
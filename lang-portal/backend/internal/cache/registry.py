@@ -0,0 +1,30 @@
+import threading
+
+_caches = {}
+_lock = threading.Lock()
+
+def register(cache):
+    """Register a cache so it can be invalidated by table and reported in stats"""
+    with _lock:
+        _caches[cache.name] = cache
+    return cache
+
+def invalidate_tables(*tables):
+    """Drop every registered cache derived from any of the given tables"""
+    tables = set(tables)
+    with _lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        if cache.tables & tables:
+            cache.clear()
+
+def all_stats():
+    with _lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+def clear_all():
+    with _lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,142 @@
+import itertools
+import json
+import queue
+import threading
+
+class Subscription:
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lagged = False
+
+class DashboardHub:
+    """In-process fan-out of dashboard stat deltas to server-sent event clients.
+
+    Each channel (one per learner when sharding, otherwise a single None
+    channel) keeps one snapshot of the dashboard stats. The snapshot is
+    loaded from the database when the first client connects and then kept
+    current by applying the same deltas that are sent to clients, so
+    further clients never trigger the dashboard aggregates again.
+
+    Events only reach clients connected to the process that handled the
+    write. With several worker processes the counters cannot be trusted, so
+    ``fresh`` subscriptions reload the snapshot from the database and
+    ``refresh`` replaces it (and resends it) when the cache coherence
+    watcher sees another process write the dashboard tables.
+    """
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._snapshots = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, load_snapshot, fresh=False):
+        """Register a client and return its subscription and the current snapshot"""
+        with self._lock:
+            snapshot = None if fresh else self._snapshots.get(channel)
+        if snapshot is None:
+            snapshot = load_snapshot()
+
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            if self._closed:
+                # Shutting down: the stream ends right after the snapshot
+                subscription.lagged = True
+                subscription.queue.put_nowait(None)
+            if fresh:
+                self._snapshots[channel] = snapshot
+            snapshot = self._snapshots.setdefault(channel, snapshot)
+            self._subscribers.setdefault(channel, set()).add(subscription)
+            return subscription, dict(snapshot)
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+                # Nobody keeps the snapshot current any more
+                self._snapshots.pop(channel, None)
+
+    def has_listeners(self, channel):
+        with self._lock:
+            return bool(self._subscribers.get(channel))
+
+    def publish(self, channel, event_type, delta=None, values=None):
+        """Apply a delta to the channel snapshot and push it to every client.
+
+        ``delta`` holds counters to add, ``values`` holds fields to replace.
+        """
+        delta = delta or {}
+        values = values or {}
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            snapshot = self._snapshots.get(channel)
+            if snapshot is not None:
+                for key, amount in delta.items():
+                    snapshot[key] = snapshot.get(key, 0) + amount
+                snapshot.update(values)
+                snapshot['success_rate'] = success_rate(snapshot['correct_reviews'], snapshot['total_reviews'])
+            event = {
+                'id': next(self._ids),
+                'type': event_type,
+                'delta': delta,
+                'values': dict(values, success_rate=snapshot['success_rate']) if snapshot else values
+            }
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.lagged = True
+
+    def refresh(self, channel, snapshot):
+        """Replace the channel snapshot with one loaded from the database and resend it"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            if not subscribers:
+                return
+            self._snapshots[channel] = snapshot
+            event = {'id': next(self._ids), 'type': 'snapshot', 'snapshot': dict(snapshot)}
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.lagged = True
+
+    def reset(self, channel):
+        """Drop the snapshot after bulk changes and tell clients to reload"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            self._snapshots.pop(channel, None)
+        for subscription in subscribers:
+            subscription.lagged = True
+            try:
+                # Wake the client up so it notices straight away
+                subscription.queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def close(self):
+        """End every stream with a resync, so clients reconnect elsewhere; used on shutdown"""
+        with self._lock:
+            self._closed = True
+            channels = list(self._subscribers)
+        for channel in channels:
+            self.reset(channel)
+
+def success_rate(correct, total):
+    return round(correct / total * 100, 1) if total else 0
+
+def format_event(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+dashboard_hub = DashboardHub()
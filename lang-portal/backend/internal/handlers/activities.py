@@ -1,6 +1,7 @@
 from flask import jsonify, request
 from flask_restful import Resource
 from internal.models.models import db, StudyActivity, StudySession
+from internal.cache.entities import activity_cache
 from sqlalchemy import func
 
 class StudyActivityListAPI(Resource):
@@ -82,6 +83,7 @@ class StudyActivityAPI(Resource):
         activity.description = data.get('description', activity.description)
         
         db.session.commit()
+        activity_cache.invalidate(activity_id)
         
         return {
             'id': activity.id,
@@ -106,5 +108,6 @@ class StudyActivityAPI(Resource):
         
         db.session.delete(activity)
         db.session.commit()
+        activity_cache.invalidate(activity_id)
         
         return '', 204 
\ No newline at end of file
@@ -0,0 +1,83 @@
+from flask import current_app, g, request
+from flask_restful import Resource
+from internal.models.models import db
+from internal.analytics.export import current_reviews
+from internal.analytics.retention import select, retention_curve, interval_recall, cohorts
+from internal.middleware.profiler import require_access
+from internal.handlers.params import int_arg
+
+MAX_RETENTION_DAYS = 365
+MAX_COHORT_WEEKS = 52
+
+def load_reviews(refresh=False):
+    return current_reviews(current_app._get_current_object(), db.engine.url.database, refresh=refresh)
+
+def filtered_reviews(manifest, columns):
+    """Columns limited to the current learner and the ?group_id= / ?word_id= filters"""
+    mask = None
+
+    def narrow(condition):
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    learner_id = g.get('learner_id')
+    if learner_id is not None:
+        learners = manifest['learners']
+        narrow(columns['learner'] == (learners.index(learner_id) if learner_id in learners else -1))
+    for name in ('group_id', 'word_id'):
+        if name in request.args:
+            value = int_arg(name)
+            if value is None:
+                raise ValueError(f'Invalid {name}')
+            narrow(columns[name] == value)
+    return select(columns, mask)
+
+def export_info(manifest):
+    return {'rows': manifest['rows'], 'exported_at': manifest['exported_at']}
+
+class RetentionAPI(Resource):
+    def get(self):
+        """GET /api/analytics/retention - Recall rate by days since a word was first reviewed"""
+        max_days = int_arg('max_days', 30)
+        if max_days is None or max_days < 1 or max_days > MAX_RETENTION_DAYS:
+            return {'error': f'max_days must be between 1 and {MAX_RETENTION_DAYS}'}, 400
+
+        manifest, columns = load_reviews()
+        try:
+            columns = filtered_reviews(manifest, columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return {'items': retention_curve(columns, max_days=max_days), 'export': export_info(manifest)}
+
+class IntervalRecallAPI(Resource):
+    def get(self):
+        """GET /api/analytics/intervals - Recall rate by time since the previous review of a word"""
+        manifest, columns = load_reviews()
+        try:
+            columns = filtered_reviews(manifest, columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return {'items': interval_recall(columns), 'export': export_info(manifest)}
+
+class CohortsAPI(Resource):
+    def get(self):
+        """GET /api/analytics/cohorts - Learners by week of first review and their weekly activity"""
+        max_weeks = int_arg('max_weeks', 12)
+        if max_weeks is None or max_weeks < 1 or max_weeks > MAX_COHORT_WEEKS:
+            return {'error': f'max_weeks must be between 1 and {MAX_COHORT_WEEKS}'}, 400
+
+        manifest, columns = load_reviews()
+        return {
+            'items': cohorts(columns, manifest['learners'], max_weeks=max_weeks),
+            'export': export_info(manifest)
+        }
+
+class AnalyticsExportAPI(Resource):
+    def post(self):
+        """POST /api/analytics/export - Re-exports the review history now instead of waiting for it to go stale"""
+        # Exports are expensive, so only debug mode or a signed request may force one
+        require_access(current_app)
+        manifest, _ = load_reviews(refresh=True)
+        return export_info(manifest), 201
@@ -0,0 +1,76 @@
+from flask import current_app, g, request
+from flask_restful import Resource
+from werkzeug.test import EnvironBuilder
+from internal.models.models import db
+from sqlalchemy import text
+from urllib.parse import urlsplit
+
+MAX_BATCH_SIZE = 20
+
+def run_get(path):
+    """Dispatch one GET inside the current app context and return (status, body)"""
+    headers = [(key, value) for key, value in request.headers.items()
+               if key.lower() not in ('content-type', 'content-length')]
+    builder = EnvironBuilder(path=path, method='GET', headers=headers)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    # The app context is already pushed, so the nested request shares the
+    # database session (and with it the open read transaction). It also
+    # shares g, so it runs its hooks against an empty g and the batch
+    # request's own state (profile, shard) is put back afterwards.
+    saved = dict(vars(g))
+    vars(g).clear()
+    # Single-flight would hand back results read outside this snapshot
+    g.in_batch = True
+    try:
+        with current_app.request_context(environ):
+            if request.url_rule is not None:
+                view_class = getattr(current_app.view_functions[request.url_rule.endpoint], 'view_class', None)
+                if not getattr(view_class, 'batchable', True):
+                    return 400, {'error': 'This endpoint cannot be batched'}
+
+            response = current_app.full_dispatch_request()
+            try:
+                if response.is_streamed:
+                    return 400, {'error': 'Streaming endpoints cannot be batched'}
+                return response.status_code, response.get_json(silent=True)
+            finally:
+                response.close()
+    finally:
+        vars(g).clear()
+        vars(g).update(saved)
+
+class BatchAPI(Resource):
+    def post(self):
+        """POST /api/batch - Runs several GET requests against one database snapshot
+
+        Body: {"requests": ["/api/dashboard/quick_stats", ...]}. Responses come
+        back in the same order, each with its own status.
+        """
+        data = request.get_json(silent=True)
+        paths = data.get('requests') if isinstance(data, dict) else None
+        if not isinstance(paths, list) or not paths:
+            return {'error': 'requests must be a non-empty list of paths'}, 400
+        if len(paths) > MAX_BATCH_SIZE:
+            return {'error': f'At most {MAX_BATCH_SIZE} requests per batch'}, 400
+        for path in paths:
+            if not isinstance(path, str) or not urlsplit(path).path.startswith('/api/'):
+                return {'error': f'Invalid path: {path}'}, 400
+            if urlsplit(path).path.rstrip('/') == request.path.rstrip('/'):
+                return {'error': 'Batches cannot be nested'}, 400
+
+        # pysqlite does not open a transaction for reads, so open one
+        # explicitly: every query below then sees the same snapshot
+        db.session.execute(text('BEGIN'))
+        try:
+            responses = []
+            for path in paths:
+                status, body = run_get(path)
+                responses.append({'path': path, 'status': status, 'body': body})
+        finally:
+            db.session.rollback()
+
+        return {'responses': responses}
@@ -0,0 +1,18 @@
+from flask import current_app
+from flask_restful import Resource
+from internal.cache.registry import all_stats
+from internal.middleware.single_flight import single_flight
+from internal.cache.coherence import get_watcher
+
+class CacheStatsAPI(Resource):
+    def get(self):
+        """GET /api/cache/stats - Returns hit and miss counts for in-process caches
+
+        single_flight.hits counts requests that shared another request's result.
+        """
+        watcher = get_watcher(current_app)
+        return {
+            'caches': all_stats(),
+            'single_flight': single_flight.stats(),
+            'coherence': watcher.stats() if watcher else None
+        }
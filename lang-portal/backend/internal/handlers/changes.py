@@ -0,0 +1,65 @@
+from flask import g, request
+from flask_restful import Resource
+from internal.models.models import db
+from internal.handlers.params import int_arg
+from internal.storage.change_log import (
+    TRACKED_TABLES, SHARD_TRACKED_TABLES, read_changes, change_log_horizon, latest_change_seq
+)
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+def parse_since(value, sharded):
+    """'<seq>' normally, '<shared seq>.<shard seq>' for a sharded learner"""
+    parts = value.split('.') if sharded else [value]
+    if len(parts) > 2 or not all(part.isdigit() for part in parts):
+        return None
+    seqs = [int(part) for part in parts]
+    return seqs + [0] * (2 - len(seqs)) if sharded else seqs[0]
+
+def cursor_gone(next_since):
+    """410 for a cursor older than the trimmed log: reload everything, then continue from next_since"""
+    return {
+        'error': 'Cursor is older than the kept change log; reload all rows and continue from next_since',
+        'next_since': next_since
+    }, 410
+
+class ChangesAPI(Resource):
+    def get(self):
+        """GET /api/changes - Rows changed since ?since=, oldest change first
+
+        Each entry carries the row's latest state ('upsert') or only its key
+        ('delete'). Pass next_since back as ?since= until has_more is false.
+        A cursor from before the oldest kept entry gets 410.
+        """
+        limit = int_arg('limit', DEFAULT_LIMIT)
+        if limit is None or limit < 1 or limit > MAX_LIMIT:
+            return {'error': f'limit must be between 1 and {MAX_LIMIT}'}, 400
+
+        sharded = g.get('shard_engine') is not None
+        since = parse_since(request.args.get('since', '0'), sharded)
+        if since is None:
+            return {'error': 'Invalid since cursor'}, 400
+
+        if not sharded:
+            if since < change_log_horizon(db.session):
+                return cursor_gone(str(latest_change_seq(db.session)))
+            changes, last_seq, has_more = read_changes(db.session, since, limit, TRACKED_TABLES)
+            return {'changes': changes, 'next_since': str(last_seq), 'has_more': has_more}
+
+        # The learner's shard logs its own tables; the shared tables are logged
+        # in the attached shared database, so the cursor keeps one seq for each
+        shared_tables = [table for table in TRACKED_TABLES if table not in SHARD_TRACKED_TABLES]
+        if since[0] < change_log_horizon(db.session, 'shared') or since[1] < change_log_horizon(db.session):
+            return cursor_gone(f"{latest_change_seq(db.session, 'shared')}.{latest_change_seq(db.session)}")
+        shared_changes, shared_seq, shared_more = read_changes(
+            db.session, since[0], limit, shared_tables, schema='shared')
+        shard_changes, shard_seq, shard_more = [], since[1], False
+        if not shared_more:
+            shard_changes, shard_seq, shard_more = read_changes(
+                db.session, since[1], limit - len(shared_changes) or 1, SHARD_TRACKED_TABLES)
+        return {
+            'changes': shared_changes + shard_changes,
+            'next_since': f'{shared_seq}.{shard_seq}',
+            'has_more': shared_more or shard_more
+        }
@@ -1,13 +1,25 @@
-from flask import jsonify
+from flask import jsonify, g, Response, current_app
 from flask_restful import Resource
+from internal.cache.coherence import get_watcher
+from internal.events import dashboard_hub, format_event
+from internal.middleware.single_flight import coalesce
 from internal.models.models import (
     db, StudySession, StudyActivity, Group, 
-    Word, WordReviewItem
+    Word, review_history
 )
-from sqlalchemy import func, distinct, case
+from sqlalchemy import func, distinct, case, text
 from datetime import datetime, timedelta
+import queue
+import time
+
+KEEPALIVE_SECONDS = 15
+# With several workers, idle streams check this often for other processes' writes
+COHERENCE_POLL_SECONDS = 1
+# Tables the dashboard snapshot is computed from
+DASHBOARD_TABLES = {'words', 'groups', 'study_activities', 'study_sessions', 'word_review_items'}
 
 class LastStudySessionAPI(Resource):
+    @coalesce
     def get(self):
         """GET /api/dashboard/last_study_session"""
         last_session = db.session.query(
@@ -31,11 +43,12 @@ class LastStudySessionAPI(Resource):
         }
 
 class StudyProgressAPI(Resource):
+    @coalesce
     def get(self):
         """GET /api/dashboard/study_progress"""
         # Get total unique words studied
         words_studied = db.session.query(
-            func.count(distinct(WordReviewItem.word_id))
+            func.count(distinct(review_history.c.word_id))
         ).scalar()
         
         # Get total available words
@@ -47,12 +60,13 @@ class StudyProgressAPI(Resource):
         }
 
 class QuickStatsAPI(Resource):
+    @coalesce
     def get(self):
         """GET /api/dashboard/quick_stats"""
         # Calculate success rate
         stats = db.session.query(
-            func.count(case((WordReviewItem.correct == True, 1))).label('correct'),
-            func.count(WordReviewItem.id).label('total')
+            func.coalesce(func.sum(review_history.c.correct_count), 0).label('correct'),
+            func.coalesce(func.sum(review_history.c.review_count), 0).label('total')
         ).first()
         
         success_rate = (stats.correct / stats.total * 100) if stats.total > 0 else 0
@@ -93,4 +107,157 @@ class QuickStatsAPI(Resource):
             streak += 1
             current_date = current_date - timedelta(days=1)
         
-        return streak 
\ No newline at end of file
+        return streak 
+
+class DashboardStreamAPI(Resource):
+    # Never finishes, so it cannot run inside POST /api/batch
+    batchable = False
+
+    def get(self):
+        """GET /api/dashboard/stream - Server-sent events with dashboard stat deltas"""
+        channel = g.get('learner_id')
+        app = current_app._get_current_object()
+        watcher = get_watcher(app)
+        # Other workers' writes never reach this process's counters, so
+        # with several workers every client starts from the database
+        subscription, snapshot = dashboard_hub.subscribe(channel, load_dashboard_snapshot,
+                                                         fresh=watcher is not None)
+        poll_seconds = COHERENCE_POLL_SECONDS if watcher is not None else KEEPALIVE_SECONDS
+
+        # The generator runs after the request context is gone, so it only
+        # touches the subscription queue, and the database only through the
+        # coherence watcher in its own app context.
+        def stream():
+            try:
+                yield 'retry: 3000\n\n'
+                yield format_event('snapshot', snapshot)
+                last_sent = time.monotonic()
+                while True:
+                    try:
+                        event = subscription.queue.get(timeout=poll_seconds)
+                    except queue.Empty:
+                        if watcher is not None:
+                            with app.app_context():
+                                watcher.check()
+                        if time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                            last_sent = time.monotonic()
+                            yield ': keepalive\n\n'
+                        continue
+                    if event is None or subscription.lagged:
+                        # Missed events; the client should reconnect for a new snapshot
+                        yield format_event('resync', {})
+                        return
+                    last_sent = time.monotonic()
+                    if event['type'] == 'snapshot':
+                        yield format_event('snapshot', event['snapshot'], event['id'])
+                        continue
+                    yield format_event(event['type'], {
+                        'delta': event['delta'],
+                        'values': event['values']
+                    }, event['id'])
+            finally:
+                dashboard_hub.unsubscribe(channel, subscription)
+
+        return Response(stream(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+def load_dashboard_snapshot():
+    """Current dashboard stats, in the same shape as the polling endpoints"""
+    last_session = LastStudySessionAPI().get()
+    counts = db.session.query(
+        func.coalesce(func.sum(review_history.c.correct_count), 0).label('correct'),
+        func.coalesce(func.sum(review_history.c.review_count), 0).label('total')
+    ).first()
+
+    snapshot = {
+        'last_study_session': last_session if isinstance(last_session, dict) else None,
+        'correct_reviews': counts.correct,
+        'total_reviews': counts.total
+    }
+    snapshot.update(StudyProgressAPI().get())
+    snapshot.update(QuickStatsAPI().get())
+    return snapshot
+
+def publish_study_session(session, group_name):
+    """Push a new study session to dashboard stream clients"""
+    channel = g.get('learner_id')
+    if not dashboard_hub.has_listeners(channel):
+        return
+
+    group_sessions = db.session.execute(
+        text("SELECT COUNT(*) FROM (SELECT 1 FROM study_sessions WHERE group_id = :group_id LIMIT 2)"),
+        {"group_id": session.group_id}
+    ).scalar()
+
+    dashboard_hub.publish(channel, 'study_session', delta={
+        'total_study_sessions': 1,
+        'total_active_groups': 1 if group_sessions == 1 else 0
+    }, values={
+        'last_study_session': {
+            'id': session.id,
+            'group_id': session.group_id,
+            'group_name': group_name,
+            'created_at': session.created_at.isoformat(),
+            'study_activity_id': session.study_activity_id
+        },
+        'study_streak_days': QuickStatsAPI()._calculate_streak()
+    })
+
+def publish_review(word_id, correct):
+    """Push a recorded word review to dashboard stream clients"""
+    channel = g.get('learner_id')
+    if not dashboard_hub.has_listeners(channel):
+        return
+
+    word_reviews = db.session.execute(
+        text("SELECT COUNT(*) FROM (SELECT 1 FROM review_history WHERE word_id = :word_id LIMIT 2)"),
+        {"word_id": word_id}
+    ).scalar()
+
+    dashboard_hub.publish(channel, 'review', delta={
+        'total_reviews': 1,
+        'correct_reviews': 1 if correct else 0,
+        'total_words_studied': 1 if word_reviews == 1 else 0
+    })
+
+def publish_review_removed(word_id, correct):
+    """Push a deleted word review to dashboard stream clients"""
+    channel = g.get('learner_id')
+    if not dashboard_hub.has_listeners(channel):
+        return
+
+    word_reviews = db.session.execute(
+        text("SELECT COUNT(*) FROM (SELECT 1 FROM review_history WHERE word_id = :word_id LIMIT 1)"),
+        {"word_id": word_id}
+    ).scalar()
+
+    dashboard_hub.publish(channel, 'review_removed', delta={
+        'total_reviews': -1,
+        'correct_reviews': -1 if correct else 0,
+        'total_words_studied': -1 if word_reviews == 0 else 0
+    })
+
+def publish_reset():
+    dashboard_hub.reset(g.get('learner_id'))
+
+def refresh_dashboard(tables):
+    """Coherence watcher listener: reload the snapshot after other processes' writes.
+
+    The watcher only follows the main database, so this refreshes the
+    unsharded channel; learner channels are reloaded on each connect.
+    """
+    if tables is not None and not tables & DASHBOARD_TABLES:
+        return
+    if not dashboard_hub.has_listeners(None):
+        return
+    # A fresh app context reads the main database even during a learner's request
+    with current_app.app_context():
+        snapshot = load_dashboard_snapshot()
+    dashboard_hub.refresh(None, snapshot)
+
+def init_dashboard_coherence(app):
+    watcher = get_watcher(app)
+    if watcher is not None:
+        watcher.add_listener(refresh_dashboard)
\ No newline at end of file
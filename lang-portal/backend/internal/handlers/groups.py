@@ -1,7 +1,19 @@
-from flask import jsonify
+from flask import current_app, jsonify, request, Response
 from flask_restful import Resource
 from internal.models.models import db, Group, Word, WordReviewItem
+from internal.cache.entities import get_group
+from internal.cache.groups import group_word_ids
+from internal.cache.decks import get_deck
+from internal.cache.registry import invalidate_tables
+from internal.handlers.params import int_arg
 from sqlalchemy import func, case, text
+import gzip
+import heapq
+import json
+import random
+
+MAX_SAMPLE_SIZE = 500
+MAX_MEMBER_IDS = 10000
 
 class GroupListAPI(Resource):
     def get(self):
@@ -54,9 +66,6 @@ class GroupWordsAPI(Resource):
     def get(self, group_id):
         """GET /api/groups/:id/words - Returns all words in a group"""
         try:
-            # Debug: Print group_id being requested
-            print(f"Requesting words for group_id: {group_id}")
-            
             # First verify group exists
             group = db.session.execute(
                 text("SELECT id FROM groups WHERE id = :id"),
@@ -66,7 +75,6 @@ class GroupWordsAPI(Resource):
             if not group:
                 return {"error": "Group not found"}, 404
 
-            # Debug: Print SQL query
             query = """
                 SELECT 
                     w.id,
@@ -74,23 +82,19 @@ class GroupWordsAPI(Resource):
                     w.romaji,
                     w.english,
                     w.parts,
-                    COUNT(CASE WHEN wri.correct = 1 THEN 1 END) as correct_count,
-                    COUNT(CASE WHEN wri.correct = 0 THEN 1 END) as wrong_count
+                    COALESCE(SUM(rh.correct_count), 0) as correct_count,
+                    COALESCE(SUM(rh.wrong_count), 0) as wrong_count
                 FROM words w
                 INNER JOIN words_groups wg ON w.id = wg.word_id
-                LEFT JOIN word_review_items wri ON w.id = wri.word_id
+                LEFT JOIN review_history rh ON w.id = rh.word_id
                 WHERE wg.group_id = :group_id
                 GROUP BY w.id, w.kanji, w.romaji, w.english, w.parts
             """
-            print(f"Executing query:\n{query}")
             
             words = db.session.execute(
                 text(query),
                 {"group_id": group_id}
             ).fetchall()
-            
-            # Debug: Print results
-            print(f"Found {len(words)} words")
 
             return {
                 "items": [{
@@ -106,7 +110,7 @@ class GroupWordsAPI(Resource):
             }
             
         except Exception as e:
-            print(f"Error in GroupWordsAPI: {str(e)}")
+            current_app.logger.exception("Error in GroupWordsAPI")
             # Return the actual error for debugging
             return {"error": str(e)}, 500
 
@@ -130,11 +134,11 @@ class GroupStudySessionsAPI(Resource):
                         ss.id,
                         ss.created_at,
                         sa.name as activity_name,
-                        COUNT(wri.id) as total_reviews,
-                        SUM(CASE WHEN wri.correct = 1 THEN 1 ELSE 0 END) as correct_reviews
+                        SUM(rh.review_count) as total_reviews,
+                        SUM(rh.correct_count) as correct_reviews
                     FROM study_sessions ss
                     LEFT JOIN study_activities sa ON ss.study_activity_id = sa.id
-                    LEFT JOIN word_review_items wri ON ss.id = wri.study_session_id
+                    LEFT JOIN review_history rh ON ss.id = rh.study_session_id
                     WHERE ss.group_id = :group_id
                     GROUP BY ss.id, ss.created_at, sa.name
                     ORDER BY ss.created_at DESC
@@ -154,5 +158,201 @@ class GroupStudySessionsAPI(Resource):
             }
             
         except Exception as e:
-            print(f"Error in GroupStudySessionsAPI: {str(e)}")
-            return {"error": str(e)}, 500
\ No newline at end of file
+            current_app.logger.exception("Error in GroupStudySessionsAPI")
+            return {"error": str(e)}, 500
+
+class GroupSampleAPI(Resource):
+    def get(self, group_id):
+        """GET /api/groups/:id/sample - Returns a random sample of words from a group"""
+        get_group(group_id)
+
+        n = int_arg('n', 20)
+        if n is None or n < 1 or n > MAX_SAMPLE_SIZE:
+            return {"error": f"n must be between 1 and {MAX_SAMPLE_SIZE}"}, 400
+        weighted = request.args.get('weighted', 'false').lower() in ('1', 'true', 'yes')
+
+        word_ids = group_word_ids(group_id)
+        k = min(n, len(word_ids))
+
+        if weighted:
+            sample = self._weighted_sample(word_ids, k)
+        else:
+            sample = random.sample(word_ids, k)
+
+        words = db.session.execute(
+            text("""
+                SELECT id, kanji, romaji, english, parts
+                FROM words
+                WHERE id IN (SELECT value FROM json_each(:ids))
+            """),
+            {"ids": json.dumps(sample)}
+        ).fetchall()
+        words_by_id = {word[0]: word for word in words}
+
+        return {
+            "items": [{
+                "id": word[0],
+                "kanji": word[1],
+                "romaji": word[2],
+                "english": word[3],
+                "parts": word[4]
+            } for word in (words_by_id.get(word_id) for word_id in sample) if word],
+            "group_size": len(word_ids),
+            "weighted": weighted
+        }
+
+    def _weighted_sample(self, word_ids, k):
+        """Sample without replacement, favouring words that are answered wrong more often"""
+        scores = db.session.execute(
+            text("""
+                SELECT word_id, score
+                FROM word_stats
+                WHERE word_id IN (SELECT value FROM json_each(:ids))
+            """),
+            {"ids": json.dumps(list(word_ids))}
+        ).fetchall()
+        scores_by_id = dict(scores)
+
+        def key(word_id):
+            # Smoothed, recency-weighted error rate; unseen words get weight 0.5
+            weight = scores_by_id.get(word_id, 0.5)
+            # Efraimidis-Spirakis key: top-k of u^(1/w) is a weighted sample
+            return random.random() ** (1 / weight)
+
+        return heapq.nlargest(k, word_ids, key=key)
+
+# A versioned URL (?v=<etag>) never changes content, so it can be cached for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+class GroupDeckAPI(Resource):
+    def get(self, group_id):
+        """GET /api/groups/:id/deck - Returns the group's quiz deck as one prebuilt, compressed blob
+
+        Clients revalidate with If-None-Match, or request /deck?v=<etag> and
+        cache that URL for good.
+        """
+        deck = get_deck(group_id)
+        etag = f'"{deck.etag}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL if request.args.get('v') == deck.etag else 'no-cache'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+            'X-Deck-Word-Count': str(deck.word_count)
+        }
+
+        if request.if_none_match.contains(deck.etag):
+            return Response(status=304, headers=headers)
+
+        if 'gzip' in request.accept_encodings:
+            headers['Content-Encoding'] = 'gzip'
+            body = deck.body
+        else:
+            body = gzip.decompress(deck.body)
+        return Response(body, mimetype='application/json', headers=headers)
+
+def member_filter(data):
+    """Build the WHERE clause over ``words w`` for a members request body.
+
+    Accepts any combination of ``word_ids`` (a list), ``from_group`` (words
+    in another group) and ``parts`` (exact matches on keys of the parts
+    JSON). Returns (sql, params), or raises ValueError when the body selects
+    nothing.
+    """
+    conditions = []
+    params = {}
+
+    if 'word_ids' in data:
+        word_ids = data['word_ids']
+        if not isinstance(word_ids, list) or not word_ids or len(word_ids) > MAX_MEMBER_IDS \
+                or not all(isinstance(word_id, int) and not isinstance(word_id, bool) for word_id in word_ids):
+            raise ValueError(f'word_ids must be a list of 1 to {MAX_MEMBER_IDS} integers')
+        conditions.append("w.id IN (SELECT value FROM json_each(:word_ids))")
+        params['word_ids'] = json.dumps(word_ids)
+
+    if 'from_group' in data:
+        if not isinstance(data['from_group'], int) or isinstance(data['from_group'], bool):
+            raise ValueError('from_group must be a group id')
+        get_group(data['from_group'])
+        conditions.append("w.id IN (SELECT word_id FROM words_groups WHERE group_id = :from_group)")
+        params['from_group'] = data['from_group']
+
+    if 'parts' in data:
+        parts = data['parts']
+        if not isinstance(parts, dict) or not parts \
+                or not all(isinstance(value, (str, int, float)) for value in parts.values()):
+            raise ValueError('parts must be an object of string or number values')
+        for n, (key, value) in enumerate(parts.items()):
+            conditions.append(f"json_extract(w.parts, :path_{n}) = :value_{n}")
+            # Quoted so that keys with dots or spaces are taken literally
+            params[f'path_{n}'] = '$.' + json.dumps(key)
+            params[f'value_{n}'] = value
+
+    if not conditions:
+        raise ValueError('Provide word_ids, from_group or parts')
+    return ' AND '.join(conditions), params
+
+class GroupMembersAPI(Resource):
+    def post(self, group_id):
+        """POST /api/groups/:id/members - Adds every matching word to the group in one statement
+
+        With ``"move": true`` and ``from_group``, the words also leave the
+        source group in the same transaction.
+        """
+        get_group(group_id)
+        data = request.get_json(silent=True) or {}
+        try:
+            where, params = member_filter(data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if data.get('move') and 'from_group' not in data:
+            return {'error': 'move needs from_group'}, 400
+
+        params['group_id'] = group_id
+        added = db.session.execute(text(f"""
+            INSERT INTO words_groups (word_id, group_id)
+            SELECT w.id, :group_id
+            FROM words w
+            WHERE {where}
+              AND NOT EXISTS (
+                  SELECT 1 FROM words_groups wg
+                  WHERE wg.group_id = :group_id AND wg.word_id = w.id
+              )
+        """), params).rowcount
+
+        removed = 0
+        if data.get('move') and data['from_group'] != group_id:
+            removed = db.session.execute(text(f"""
+                DELETE FROM words_groups
+                WHERE group_id = :from_group
+                  AND word_id IN (SELECT w.id FROM words w WHERE {where})
+            """), params).rowcount
+
+        db.session.commit()
+        # Member lists, bitmaps and decks are all keyed off words_groups
+        invalidate_tables('words_groups')
+
+        result = {'group_id': group_id, 'added': added}
+        if data.get('move'):
+            result['removed_from_source'] = removed
+        return result
+
+    def delete(self, group_id):
+        """DELETE /api/groups/:id/members - Removes every matching word from the group in one statement"""
+        get_group(group_id)
+        data = request.get_json(silent=True) or {}
+        try:
+            where, params = member_filter(data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        params['group_id'] = group_id
+        removed = db.session.execute(text(f"""
+            DELETE FROM words_groups
+            WHERE group_id = :group_id
+              AND word_id IN (SELECT w.id FROM words w WHERE {where})
+        """), params).rowcount
+
+        db.session.commit()
+        invalidate_tables('words_groups')
+        return {'group_id': group_id, 'removed': removed}
@@ -0,0 +1,11 @@
+from flask import request
+
+def int_arg(name, default=None):
+    """Integer query argument: ``default`` when it is absent, None when it is not an integer"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return None
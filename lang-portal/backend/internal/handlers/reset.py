@@ -1,5 +1,7 @@
 from flask_restful import Resource
 from internal.models.models import db
+from internal.cache.registry import invalidate_tables
+from internal.handlers.dashboard import publish_reset
 from sqlalchemy import text
 
 class ResetHistory(Resource):
@@ -7,8 +9,12 @@ class ResetHistory(Resource):
         try:
             # Execute each statement separately
             db.session.execute(text("DELETE FROM word_review_items"))
+            db.session.execute(text("DELETE FROM word_review_daily"))
+            db.session.execute(text("DELETE FROM word_stats"))
             db.session.execute(text("DELETE FROM study_sessions"))
             db.session.commit()
+            invalidate_tables('word_review_items', 'word_review_daily', 'word_stats', 'study_sessions')
+            publish_reset()
             
             return {
                 "success": True,
@@ -23,10 +29,15 @@ class FullReset(Resource):
         try:
             # Execute each statement separately
             db.session.execute(text("DELETE FROM word_review_items"))
+            db.session.execute(text("DELETE FROM word_review_daily"))
+            db.session.execute(text("DELETE FROM word_stats"))
             db.session.execute(text("DELETE FROM study_sessions"))
             db.session.execute(text("DELETE FROM study_activities"))
             db.session.execute(text("DELETE FROM words_groups"))
             db.session.commit()
+            invalidate_tables('word_review_items', 'word_review_daily', 'word_stats', 'study_sessions',
+                              'study_activities', 'words_groups')
+            publish_reset()
             
             return {
                 "success": True,
@@ -2,41 +2,103 @@ from flask import jsonify, request
 from flask_restful import Resource
 from internal.models.models import (
     db, StudySession, StudyActivity, Group, 
-    Word, WordReviewItem
+    Word, WordReviewItem, review_history
 )
-from sqlalchemy import func, case
+from internal.cache.entities import (
+    get_group, get_activity, get_session,
+    group_name, activity_name
+)
+from internal.handlers.dashboard import publish_study_session
+from internal.handlers.params import int_arg
+from sqlalchemy import func, case, tuple_, cast, literal, String
 from datetime import datetime
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_session_cursor(value):
+    """Parse a '<created_at>,<id>' cursor into a (created_at text, int) tuple.
+
+    created_at stays text in the stored form: sessions written with
+    datetime('now') have no fractional seconds, and only the stored text
+    sorts the same way as the ORDER BY (a bound datetime always has them).
+    """
+    created_at, _, session_id = value.rpartition(',')
+    if parse_datetime(created_at) is None or not session_id.isdigit():
+        return None
+    return created_at.replace('T', ' ', 1), int(session_id)
+
 class StudySessionListAPI(Resource):
     def get(self):
-        """GET /api/study_sessions - Returns all study sessions"""
-        page = 1  # TODO: Get from request
-        per_page = 100
-        
-        sessions = db.session.query(
-            StudySession,
-            Group.name.label('group_name'),
-            StudyActivity.name.label('activity_name'),
-            func.count(WordReviewItem.id).label('review_items_count')
-        ).join(StudySession.group)\
-         .join(StudySession.study_activity)\
-         .outerjoin(StudySession.review_items)\
-         .group_by(StudySession.id)\
-         .paginate(page=page, per_page=per_page)
-        
+        """GET /api/study_sessions - Returns study sessions, newest first
+
+        Uses keyset pagination: pass the previous page's next_cursor as
+        ?before=<created_at>,<id>. Optional ?from= and ?to= bound created_at.
+        """
+        limit = int_arg('limit', DEFAULT_PAGE_SIZE)
+        if limit is None or limit < 1 or limit > MAX_PAGE_SIZE:
+            return {'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}, 400
+
+        # Inner joins drop sessions whose group or activity was deleted; the names come from the cache
+        query = db.session.query(StudySession, cast(StudySession.created_at, String))\
+            .join(Group, Group.id == StudySession.group_id)\
+            .join(StudyActivity, StudyActivity.id == StudySession.study_activity_id)
+
+        if 'from' in request.args:
+            start = parse_datetime(request.args['from'])
+            if start is None:
+                return {'error': 'Invalid from datetime'}, 400
+            query = query.filter(StudySession.created_at >= start)
+
+        if 'to' in request.args:
+            end = parse_datetime(request.args['to'])
+            if end is None:
+                return {'error': 'Invalid to datetime'}, 400
+            query = query.filter(StudySession.created_at < end)
+
+        if 'before' in request.args:
+            cursor = parse_session_cursor(request.args['before'])
+            if cursor is None:
+                return {'error': 'Invalid before cursor'}, 400
+            query = query.filter(
+                tuple_(StudySession.created_at, StudySession.id) < tuple_(literal(cursor[0], String), cursor[1]))
+
+        # Walks idx_study_sessions_created_at_id; one extra row tells us if there is a next page
+        rows = query.order_by(StudySession.created_at.desc(), StudySession.id.desc())\
+            .limit(limit + 1)\
+            .all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        sessions = [session for session, _ in rows]
+
+        # Count reviews only for the sessions on this page
+        review_counts = dict(db.session.query(
+            review_history.c.study_session_id,
+            func.sum(review_history.c.review_count)
+        ).filter(review_history.c.study_session_id.in_([session.id for session in sessions]))\
+         .group_by(review_history.c.study_session_id)\
+         .all()) if sessions else {}
+
+        # Group and activity names come from the entity cache instead of a join
         return {
             'items': [{
-                'id': session.StudySession.id,
-                'activity_name': session.activity_name,
-                'group_name': session.group_name,
-                'start_time': session.StudySession.created_at.isoformat(),
-                'review_items_count': session.review_items_count
-            } for session in sessions.items],
+                'id': session.id,
+                'activity_name': activity_name(session.study_activity_id),
+                'group_name': group_name(session.group_id),
+                'start_time': session.created_at.isoformat(),
+                'review_items_count': review_counts.get(session.id, 0)
+            } for session in sessions],
             'pagination': {
-                'current_page': sessions.page,
-                'total_pages': sessions.pages,
-                'total_items': sessions.total,
-                'items_per_page': per_page
+                'items_per_page': limit,
+                'has_more': has_more,
+                # Built from the stored text, so the cursor row never matches its own filter
+                'next_cursor': f'{rows[-1][1]},{sessions[-1].id}' if has_more else None
             }
         }
 
@@ -48,8 +110,8 @@ class StudySessionListAPI(Resource):
             return {'error': 'Missing required fields: group_id, study_activity_id'}, 400
             
         # Verify group and activity exist
-        group = Group.query.get_or_404(data['group_id'])
-        activity = StudyActivity.query.get_or_404(data['study_activity_id'])
+        group = get_group(data['group_id'])
+        get_activity(data['study_activity_id'])
         
         # Create new session
         session = StudySession(
@@ -60,6 +122,7 @@ class StudySessionListAPI(Resource):
         
         db.session.add(session)
         db.session.commit()
+        publish_study_session(session, group['name'])
         
         return {
             'id': session.id,
@@ -71,58 +134,71 @@ class StudySessionListAPI(Resource):
 class StudySessionAPI(Resource):
     def get(self, session_id):
         """GET /api/study_sessions/:id - Returns details about a specific study session"""
+        review_items_count = db.session.query(
+            func.coalesce(func.sum(review_history.c.review_count), 0)
+        ).filter(review_history.c.study_session_id == session_id)\
+         .scalar_subquery()
+
         session = db.session.query(
             StudySession,
-            Group.name.label('group_name'),
-            StudyActivity.name.label('activity_name'),
-            func.count(WordReviewItem.id).label('review_items_count')
-        ).join(StudySession.group)\
-         .join(StudySession.study_activity)\
-         .outerjoin(StudySession.review_items)\
+            review_items_count.label('review_items_count')
+        ).join(Group, Group.id == StudySession.group_id)\
+         .join(StudyActivity, StudyActivity.id == StudySession.study_activity_id)\
          .filter(StudySession.id == session_id)\
-         .group_by(StudySession.id)\
          .first_or_404()
         
         return {
             'id': session.StudySession.id,
-            'activity_name': session.activity_name,
-            'group_name': session.group_name,
+            'activity_name': activity_name(session.StudySession.study_activity_id),
+            'group_name': group_name(session.StudySession.group_id),
             'start_time': session.StudySession.created_at.isoformat(),
             'review_items_count': session.review_items_count
         }
 
 class StudySessionWordsAPI(Resource):
     def get(self, session_id):
-        """GET /api/study_sessions/:id/words - Returns words reviewed in a study session"""
-        page = 1  # TODO: Get from request
-        per_page = 100
+        """GET /api/study_sessions/:id/words - Returns words reviewed in a study session
+
+        Uses keyset pagination on word id: pass next_cursor back as ?after=.
+        """
+        limit = int_arg('limit', DEFAULT_PAGE_SIZE)
+        if limit is None or limit < 1 or limit > MAX_PAGE_SIZE:
+            return {'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}, 400
+        after = int_arg('after', 0)
+        if after is None:
+            return {'error': 'Invalid after cursor'}, 400
         
         # Verify session exists
-        session = StudySession.query.get_or_404(session_id)
+        get_session(session_id)
         
         # Get reviewed words with their results
         words = db.session.query(
             Word,
-            func.count(case((WordReviewItem.correct == True, 1))).label('correct_count'),
-            func.count(case((WordReviewItem.correct == False, 1))).label('wrong_count')
-        ).join(WordReviewItem)\
-         .filter(WordReviewItem.study_session_id == session_id)\
+            func.sum(review_history.c.correct_count).label('correct_count'),
+            func.sum(review_history.c.wrong_count).label('wrong_count')
+        ).join(review_history, review_history.c.word_id == Word.id)\
+         .filter(review_history.c.study_session_id == session_id)\
+         .filter(Word.id > after)\
          .group_by(Word.id)\
-         .paginate(page=page, per_page=per_page)
+         .order_by(Word.id)\
+         .limit(limit + 1)\
+         .all()
+        has_more = len(words) > limit
+        words = words[:limit]
         
         return {
             'items': [{
-                'japanese': word.Word.japanese,
+                'id': word.Word.id,
+                'japanese': word.Word.kanji,
                 'romaji': word.Word.romaji,
                 'english': word.Word.english,
                 'correct_count': word.correct_count,
                 'wrong_count': word.wrong_count
-            } for word in words.items],
+            } for word in words],
             'pagination': {
-                'current_page': words.page,
-                'total_pages': words.pages,
-                'total_items': words.total,
-                'items_per_page': per_page
+                'items_per_page': limit,
+                'has_more': has_more,
+                'next_cursor': words[-1].Word.id if has_more else None
             }
         }
 
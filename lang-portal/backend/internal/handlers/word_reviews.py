@@ -1,7 +1,12 @@
 from flask import jsonify, request
 from flask_restful import Resource
 from internal.models.models import db, WordReviewItem, Word
+from internal.cache.entities import get_session, get_word
+from internal.storage.write_queue import get_write_queue, enqueue_review
+from internal.storage.word_stats import record_review_stats, rebuild_word_stats
+from internal.handlers.dashboard import publish_review, publish_review_removed
 from sqlalchemy import func
+from datetime import datetime
 
 class WordReviewListAPI(Resource):
     def get(self):
@@ -32,7 +37,10 @@ class WordReviewListAPI(Resource):
         )
         
         db.session.add(review)
+        db.session.flush()
+        record_review_stats(db.session, review.word_id, review.correct, review.created_at)
         db.session.commit()
+        publish_review(review.word_id, review.correct)
         
         return {
             'id': review.id,
@@ -45,10 +53,20 @@ class WordReviewListAPI(Resource):
 class WordReviewSessionAPI(Resource):
     def post(self, session_id, word_id):
         """POST /api/study_sessions/:session_id/words/:word_id/review - Creates a review tied to a session"""
+        # Verify session and word exist, from the entity cache
+        get_session(session_id)
+        get_word(word_id)
+
         data = request.get_json()
         
         if not data or 'correct' not in data:
             return {'error': 'Correct field is required'}, 400
+        # Both write paths store exactly this value, so it must be a real boolean
+        if not isinstance(data['correct'], bool):
+            return {'error': 'Correct must be true or false'}, 400
+
+        if get_write_queue() is not None:
+            return self._post_queued(session_id, word_id, data['correct'])
             
         review = WordReviewItem(
             word_id=word_id,
@@ -57,7 +75,10 @@ class WordReviewSessionAPI(Resource):
         )
         
         db.session.add(review)
+        db.session.flush()
+        record_review_stats(db.session, review.word_id, review.correct, review.created_at)
         db.session.commit()
+        publish_review(review.word_id, review.correct)
         
         return {
             'id': review.id,
@@ -67,6 +88,29 @@ class WordReviewSessionAPI(Resource):
             'created_at': review.created_at.isoformat()
         }, 201
 
+    def _post_queued(self, session_id, word_id, correct):
+        """Group-commit path: the writer thread batches this insert with others"""
+        values = {
+            'word_id': word_id,
+            'study_session_id': session_id,
+            'correct': correct,
+            'created_at': datetime.utcnow()
+        }
+        try:
+            review_id = enqueue_review(values)
+        except TimeoutError:
+            # The writer is backed up; like a lock timeout, this is worth retrying
+            return {'error': 'Timed out waiting for the review writer'}, 503, {'Retry-After': '1'}
+        publish_review(word_id, correct)
+
+        return {
+            'id': review_id,
+            'word_id': word_id,
+            'study_session_id': session_id,
+            'correct': correct,
+            'created_at': values['created_at'].isoformat()
+        }, 201
+
 class WordReviewAPI(Resource):
     def get(self, review_id):
         """GET /api/word_reviews/:id - Returns details about a specific review"""
@@ -83,8 +127,12 @@ class WordReviewAPI(Resource):
     def delete(self, review_id):
         """DELETE /api/word_reviews/:id - Deletes a word review"""
         review = WordReviewItem.query.get_or_404(review_id)
+        word_id, correct = review.word_id, review.correct
         
         db.session.delete(review)
+        db.session.flush()
+        rebuild_word_stats(db.session, word_id)
         db.session.commit()
+        publish_review_removed(word_id, correct)
         
         return '', 204 
\ No newline at end of file
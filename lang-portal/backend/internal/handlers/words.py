@@ -1,23 +1,84 @@
-from flask import jsonify
+from flask import current_app, jsonify, request
 from flask_restful import Resource
 from internal.models.models import db
+from internal.cache.groups import group_bitmap, ids_from_bitmap
+from internal.handlers.params import int_arg
 from sqlalchemy import text
+import json
+
+def parse_group_ids(value):
+    """Parse a comma separated list of group ids, or return None if invalid"""
+    parts = [part.strip() for part in value.split(',') if part.strip()]
+    if not parts or not all(part.isdigit() for part in parts):
+        return None
+    return [int(part) for part in parts]
+
+def select_word_ids(args):
+    """Combine group memberships from ?in= (all of), ?any= (any of) and ?not_in=.
+
+    Returns (included, excluded) word id lists; ``included`` is None when
+    neither ?in= nor ?any= was given, meaning every word.
+    """
+    groups = {}
+    for name in ('in', 'any', 'not_in'):
+        if name in args:
+            groups[name] = parse_group_ids(args[name])
+            if groups[name] is None:
+                raise ValueError(f'Invalid {name} group list')
+
+    included = None
+    if 'in' in groups:
+        included = group_bitmap(groups['in'][0])
+        for group_id in groups['in'][1:]:
+            included &= group_bitmap(group_id)
+    if 'any' in groups:
+        union = 0
+        for group_id in groups['any']:
+            union |= group_bitmap(group_id)
+        included = union if included is None else included & union
+
+    excluded = 0
+    for group_id in groups.get('not_in', ()):
+        excluded |= group_bitmap(group_id)
+
+    if included is None:
+        return None, ids_from_bitmap(excluded)
+    return ids_from_bitmap(included & ~excluded), []
 
 class WordListAPI(Resource):
     def get(self):
-        """GET /api/words - Returns all words with pagination"""
+        """GET /api/words - Returns all words with pagination
+
+        Optional group filters: ?in=1,2 (in every group), ?any=1,2 (in at
+        least one group) and ?not_in=3 (in none of the groups).
+        """
+        try:
+            included, excluded = select_word_ids(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         try:
-            query = """
+            filters = []
+            params = {}
+            if included is not None:
+                filters.append("w.id IN (SELECT value FROM json_each(:included))")
+                params["included"] = json.dumps(included)
+            if excluded:
+                filters.append("w.id NOT IN (SELECT value FROM json_each(:excluded))")
+                params["excluded"] = json.dumps(excluded)
+
+            query = f"""
                 SELECT 
                     w.*,
-                    COUNT(CASE WHEN wri.correct = 1 THEN 1 END) as correct_count,
-                    COUNT(CASE WHEN wri.correct = 0 THEN 1 END) as wrong_count
+                    COALESCE(SUM(rh.correct_count), 0) as correct_count,
+                    COALESCE(SUM(rh.wrong_count), 0) as wrong_count
                 FROM words w
-                LEFT JOIN word_review_items wri ON w.id = wri.word_id
+                LEFT JOIN review_history rh ON w.id = rh.word_id
+                {"WHERE " + " AND ".join(filters) if filters else ""}
                 GROUP BY w.id;
             """
             
-            words = db.session.execute(text(query)).fetchall()
+            words = db.session.execute(text(query), params).fetchall()
             
             return {
                 "items": [{
@@ -37,7 +98,7 @@ class WordListAPI(Resource):
                 }
             }
         except Exception as e:
-            print(f"Error in WordListAPI: {str(e)}")
+            current_app.logger.exception("Error in WordListAPI")
             return {"error": str(e)}, 500
 
 class WordAPI(Resource):
@@ -60,5 +121,51 @@ class WordAPI(Resource):
                 "parts": result[4]
             }
         except Exception as e:
-            print(f"Error in WordAPI: {str(e)}")
-            return {"error": str(e)}, 500
\ No newline at end of file
+            current_app.logger.exception("Error in WordAPI")
+            return {"error": str(e)}, 500
+
+DEFAULT_DIFFICULT_LIMIT = 50
+MAX_DIFFICULT_LIMIT = 500
+
+class DifficultWordsAPI(Resource):
+    def get(self):
+        """GET /api/words/difficult - Returns the words answered wrong most often, hardest first
+
+        Reads the per-word statistics kept up to date as reviews are recorded,
+        ordered through idx_word_stats_score. Optional ?group_id= and ?limit=.
+        """
+        limit = int_arg('limit', DEFAULT_DIFFICULT_LIMIT)
+        if limit is None or limit < 1 or limit > MAX_DIFFICULT_LIMIT:
+            return {"error": f"limit must be between 1 and {MAX_DIFFICULT_LIMIT}"}, 400
+        group_id = int_arg('group_id')
+        if 'group_id' in request.args and group_id is None:
+            return {"error": "Invalid group_id"}, 400
+
+        query = """
+            SELECT
+                w.id, w.kanji, w.romaji, w.english, w.parts,
+                ws.correct_count, ws.wrong_count, ws.score, ws.last_reviewed_at
+            FROM word_stats ws
+            JOIN words w ON w.id = ws.word_id
+        """
+        params = {"limit": limit}
+        if group_id is not None:
+            query += " WHERE ws.word_id IN (SELECT word_id FROM words_groups WHERE group_id = :group_id)"
+            params["group_id"] = group_id
+        query += " ORDER BY ws.score DESC, ws.word_id LIMIT :limit"
+
+        words = db.session.execute(text(query), params).fetchall()
+
+        return {
+            "items": [{
+                "id": word[0],
+                "kanji": word[1],
+                "romaji": word[2],
+                "english": word[3],
+                "parts": word[4],
+                "correct_count": word[5],
+                "wrong_count": word[6],
+                "score": round(word[7], 4),
+                "last_reviewed_at": str(word[8]) if word[8] else None
+            } for word in words]
+        }
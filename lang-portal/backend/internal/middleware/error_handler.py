@@ -1,5 +1,6 @@
 from flask import jsonify
-from sqlalchemy.exc import SQLAlchemyError
+from flask_restful import Api
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from werkzeug.exceptions import HTTPException
 
 class APIError(Exception):
@@ -7,6 +8,19 @@ class APIError(Exception):
         self.message = message
         self.status_code = status_code
 
+class RestfulApi(Api):
+    """flask-restful Api that leaves non-HTTP errors to the app's error handlers.
+
+    Unless exceptions propagate (DEBUG or TESTING), flask-restful turns every
+    other exception into its own 500 before the handlers below see it.
+    Raising here makes its error router fall back to Flask's handling.
+    """
+
+    def handle_error(self, e):
+        if not isinstance(e, HTTPException):
+            raise e
+        return super().handle_error(e)
+
 def register_error_handlers(app):
     @app.errorhandler(APIError)
     def handle_api_error(error):
@@ -20,6 +34,16 @@ def register_error_handlers(app):
     def handle_db_error(error):
         return jsonify({'error': 'Database error occurred'}), 500
 
+    @app.errorhandler(OperationalError)
+    def handle_operational_error(error):
+        # Lock timeouts are transient, so tell the client to retry
+        if 'database is locked' in str(error.orig):
+            return jsonify({'error': 'Database is locked'}), 503, {'Retry-After': '1'}
+        # Learner shards attach the shared vocabulary read-only
+        if 'readonly database' in str(error.orig):
+            return jsonify({'error': 'Shared vocabulary cannot be changed through a learner shard'}), 403
+        return jsonify({'error': 'Database error occurred'}), 500
+
     @app.errorhandler(Exception)
     def handle_generic_error(error):
         return jsonify({'error': 'Internal server error'}), 500
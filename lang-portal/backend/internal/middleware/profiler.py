@@ -0,0 +1,190 @@
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from flask import g, request, current_app, jsonify, abort
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# The capture running on this thread, if any; SQL events look it up here
+_local = threading.local()
+
+MAX_STATEMENT_LENGTH = 2000
+SIGNATURE_MAX_AGE_SECONDS = 300
+
+class Capture:
+    """Samples one request thread's stack and collects its SQL timings"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.sql = []
+        self.started = time.perf_counter()
+        self.duration = None
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_filename}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            # Folded format (root first), as read by flame graph tools
+            self.stacks[';'.join(reversed(stack))] += 1
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, 'capture', None) is not None:
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = getattr(_local, 'capture', None)
+    starts = conn.info.get('profiler_start')
+    if capture is None or not starts:
+        return
+    capture.sql.append({
+        'statement': statement[:MAX_STATEMENT_LENGTH],
+        'duration_ms': round((time.perf_counter() - starts.pop()) * 1000, 3)
+    })
+
+def sign(secret, message, timestamp=None):
+    """Value for the profiler header: '<timestamp>:<hmac of timestamp and message>'"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f'{timestamp}:{message}'.encode(), hashlib.sha256).hexdigest()
+    return f'{timestamp}:{digest}'
+
+def has_valid_signature(app):
+    secret = app.config.get('PROFILER_SECRET')
+    value = request.headers.get(app.config['PROFILER_HEADER'], '')
+    timestamp, _, _ = value.partition(':')
+    if not secret or not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    expected = sign(secret, f'{request.method} {request.path}', int(timestamp))
+    return hmac.compare_digest(value, expected)
+
+def require_access(app):
+    """Debug-only endpoints answer 403 unless the app is in debug mode or the request is signed"""
+    if not app.debug and not has_valid_signature(app):
+        abort(403)
+
+def write_profile(profile_dir, profile, keep):
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = profile_dir / f".{profile['id']}.json.tmp"
+    tmp_path.write_text(json.dumps(profile))
+    os.replace(tmp_path, profile_dir / f"{profile['id']}.json")
+
+    # Rotate: only the newest ``keep`` captures stay
+    for old in sorted(profile_dir.glob('*.json'))[:-keep]:
+        old.unlink(missing_ok=True)
+
+def list_profiles(profile_dir, limit=50):
+    summaries = []
+    for path in sorted(Path(profile_dir).glob('*.json'), reverse=True)[:limit]:
+        try:
+            profile = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        summaries.append({key: profile[key] for key in (
+            'id', 'method', 'path', 'status', 'duration_ms', 'sql_count', 'sql_ms', 'samples', 'trigger'
+        )})
+    return summaries
+
+def init_profiler(app):
+    """Profile requests that carry a valid signed header, or a random PROFILER_SAMPLE_RATE share of them"""
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    # Listen on every engine, so shard engines are covered too
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        if getattr(_local, 'capture', None) is not None:
+            # A request nested in POST /api/batch; the batch's profile covers it
+            return
+        if has_valid_signature(app):
+            trigger = 'signed'
+        elif random.random() < app.config['PROFILER_SAMPLE_RATE']:
+            trigger = 'sampled'
+        else:
+            return
+        capture = Capture(app.config['PROFILER_INTERVAL_MS'] / 1000)
+        g.profile = (capture, trigger)
+        _local.capture = capture
+        capture.start()
+
+    @app.after_request
+    def mark_profiled(response):
+        if 'profile' in g:
+            g.profile_status = response.status_code
+            g.profile_id = f"{time.time_ns()}-{request.method.lower()}-{(request.endpoint or 'unknown')}"
+            response.headers['X-Profile-Id'] = g.profile_id
+        return response
+
+    @app.teardown_request
+    def finish_profile(error=None):
+        profiled = g.pop('profile', None)
+        if profiled is None:
+            return
+        capture, trigger = profiled
+        _local.capture = None
+        capture.stop()
+
+        profile = {
+            'id': g.get('profile_id') or f"{time.time_ns()}-{request.method.lower()}-error",
+            'trigger': trigger,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': g.get('profile_status', 500),
+            'error': repr(error) if error else None,
+            'started_at': time.time() - capture.duration,
+            'duration_ms': round(capture.duration * 1000, 3),
+            'interval_ms': app.config['PROFILER_INTERVAL_MS'],
+            'samples': sum(capture.stacks.values()),
+            'stacks': dict(capture.stacks.most_common()),
+            'sql_count': len(capture.sql),
+            'sql_ms': round(sum(query['duration_ms'] for query in capture.sql), 3),
+            'sql': capture.sql
+        }
+        try:
+            write_profile(Path(app.config['PROFILER_DIR']), profile, app.config['PROFILER_KEEP'])
+        except OSError as e:
+            app.logger.warning('Could not write profile %s: %s', profile['id'], e)
+
+    @app.route('/api/debug/profiles')
+    def profile_index():
+        require_access(app)
+        return jsonify({'items': list_profiles(app.config['PROFILER_DIR'])})
+
+    @app.route('/api/debug/profiles/<profile_id>')
+    def profile_detail(profile_id):
+        require_access(app)
+        path = Path(app.config['PROFILER_DIR']) / f'{profile_id}.json'
+        if '/' in profile_id or profile_id.startswith('.') or not path.is_file():
+            abort(404)
+        return current_app.response_class(path.read_text(), mimetype='application/json')
@@ -0,0 +1,93 @@
+import functools
+import threading
+
+from flask import g, request, has_request_context
+
+class Call:
+    """One in-flight computation that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one computation.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait and get the same result, or the
+    same exception. Nothing is cached: once the leader finishes, the next
+    call computes afresh. A follower may therefore get a result whose
+    queries started shortly before its own request arrived.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.leaders = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+                self.leaders += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        total = self.hits + self.leaders
+        return {
+            'hits': self.hits,
+            'computations': self.leaders,
+            'in_flight': in_flight,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+single_flight = SingleFlight()
+
+def coalesce(method):
+    """Decorator for idempotent Resource.get methods.
+
+    Identical requests (same resource, learner, URL arguments and query
+    string) that overlap share one execution. The shared result must not be
+    mutated by the caller.
+    """
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not has_request_context() or g.get('in_batch'):
+            # Called directly (e.g. to build the dashboard snapshot), or
+            # inside POST /api/batch, which must read its own snapshot
+            return method(self, *args, **kwargs)
+        key = (
+            name,
+            g.get('learner_id'),
+            args,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True)))
+        )
+        return single_flight.do(key, lambda: method(self, *args, **kwargs))
+    return wrapper
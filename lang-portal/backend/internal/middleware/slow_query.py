@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('lang_portal.slow_queries')
+
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent.parent)
+MAX_PARAMETERS_LENGTH = 1000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize(statement):
+    """Statement with literals and whitespace normalized, so variants group together"""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST.sub('(?...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+def fingerprint(statement):
+    return hashlib.sha1(normalize(statement).encode()).hexdigest()[:16]
+
+def calling_frame():
+    """The innermost frame in the backend's own code, e.g. 'internal/handlers/groups.py:90 get'"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BACKEND_DIR) and filename != __file__:
+            return f'{filename[len(BACKEND_DIR) + 1:]}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+class SlowQueryLog:
+    """Logs statements slower than a threshold as JSON lines, with their query plan"""
+
+    def __init__(self, threshold_ms, explain=True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = {
+            'fingerprint': fingerprint(statement),
+            'duration_ms': round(duration_ms, 3),
+            'statement': statement,
+            'parameters': json.dumps(parameters, default=str)[:MAX_PARAMETERS_LENGTH],
+            'executemany': executemany,
+            'caller': calling_frame(),
+            'database': conn.engine.url.database,
+            'plan': None
+        }
+        if self.explain and not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            entry['plan'] = self._explain(cursor, statement, parameters)
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+    def _explain(self, cursor, statement, parameters):
+        # A separate cursor, so the rows of the slow statement stay unread
+        explain_cursor = cursor.connection.cursor()
+        try:
+            rows = explain_cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+            return [row[-1] for row in rows]
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            explain_cursor.close()
+
+_active = None
+
+def init_slow_query_log(app):
+    """Log statements slower than SLOW_QUERY_MS from every engine, when set"""
+    global _active
+    threshold_ms = app.config.get('SLOW_QUERY_MS')
+    if threshold_ms is None:
+        return
+
+    if not logger.handlers:
+        log_file = Path(app.config['SLOW_QUERY_LOG_FILE'])
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    disable_slow_query_log()
+    _active = SlowQueryLog(threshold_ms, explain=app.config['SLOW_QUERY_EXPLAIN'])
+    event.listen(Engine, 'before_cursor_execute', _active.before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _active.after_cursor_execute)
+
+def disable_slow_query_log():
+    global _active
+    if _active is not None:
+        event.remove(Engine, 'before_cursor_execute', _active.before_cursor_execute)
+        event.remove(Engine, 'after_cursor_execute', _active.after_cursor_execute)
+        _active = None
+
+def summarize(lines):
+    """Aggregate slow-query log lines by fingerprint, slowest total first"""
+    groups = {}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'statement': normalize(entry['statement']),
+            'callers': set(),
+            'durations': []
+        })
+        group['durations'].append(entry['duration_ms'])
+        if entry.get('caller'):
+            group['callers'].add(entry['caller'])
+
+    summary = []
+    for group in groups.values():
+        durations = group.pop('durations')
+        group.update({
+            'count': len(durations),
+            'total_ms': round(sum(durations), 3),
+            'median_ms': round(statistics.median(durations), 3),
+            'max_ms': round(max(durations), 3),
+            'callers': sorted(group['callers'])
+        })
+        summary.append(group)
+    return sorted(summary, key=lambda group: group['total_ms'], reverse=True)
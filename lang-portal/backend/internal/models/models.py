@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime
 from datetime import datetime
 import json
+from internal.storage.sharding import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Word(db.Model):
     __tablename__ = 'words'
@@ -40,6 +42,10 @@ class Group(db.Model):
 
 class StudySession(db.Model):
     __tablename__ = 'study_sessions'
+    __table_args__ = (
+        # Backs keyset pagination of sessions by (created_at, id)
+        db.Index('idx_study_sessions_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
@@ -70,4 +76,64 @@ class WordReviewItem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     word = db.relationship('Word', back_populates='review_items')
-    study_session = db.relationship('StudySession', back_populates='review_items')
\ No newline at end of file
+    study_session = db.relationship('StudySession', back_populates='review_items')
+
+class WordStats(db.Model):
+    # Maintained as reviews are recorded, see internal/storage/word_stats.py
+    __tablename__ = 'word_stats'
+    __table_args__ = (
+        db.Index('idx_word_stats_score', 'score'),
+    )
+
+    word_id = db.Column(db.Integer, db.ForeignKey('words.id'), primary_key=True)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    wrong_count = db.Column(db.Integer, nullable=False, default=0)
+    # Counts decayed by age of the review, so recent answers weigh more
+    decayed_correct = db.Column(db.Float, nullable=False, default=0)
+    decayed_wrong = db.Column(db.Float, nullable=False, default=0)
+    last_reviewed_at = db.Column(db.DateTime)
+    # Smoothed error rate of the decayed counts
+    score = db.Column(db.Float, nullable=False, default=0.5)
+
+class WordReviewDaily(db.Model):
+    # Reviews rolled out of word_review_items by the archive task, one row
+    # per word, session and day
+    __tablename__ = 'word_review_daily'
+    __table_args__ = (
+        db.UniqueConstraint('word_id', 'study_session_id', 'day'),
+        db.Index('idx_word_review_daily_session', 'study_session_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    word_id = db.Column(db.Integer, db.ForeignKey('words.id'), nullable=False)
+    study_session_id = db.Column(db.Integer, db.ForeignKey('study_sessions.id'), nullable=False)
+    day = db.Column(db.String, nullable=False)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    wrong_count = db.Column(db.Integer, nullable=False, default=0)
+    last_reviewed_at = db.Column(db.DateTime)
+
+class ChangeLog(db.Model):
+    # Appended to by triggers, see internal/storage/change_log.py
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT, so a sequence number is never handed out twice
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String, nullable=False)
+    row_key = db.Column(db.String, nullable=False)
+    op = db.Column(db.String, nullable=False)
+    changed_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
+# Archived and live reviews as one history, one row per review or per daily
+# aggregate. It is a view (see internal/storage/history.py), so it is kept
+# out of db.metadata and create_all never tries to create it as a table.
+review_history = Table(
+    'review_history', MetaData(),
+    Column('word_id', Integer),
+    Column('study_session_id', Integer),
+    Column('day', String),
+    Column('correct_count', Integer),
+    Column('wrong_count', Integer),
+    Column('review_count', Integer),
+    Column('last_reviewed_at', DateTime)
+)
@@ -0,0 +1,138 @@
+"""Trigger-fed change log behind GET /api/changes.
+
+Every insert, update and delete on a tracked table appends a row to
+change_log with the row's key. AUTOINCREMENT keeps ``seq`` strictly
+increasing (never reused), so a client that remembers the last seq it saw
+can ask for exactly what changed since.
+
+Old entries are trimmed by ``cli.py trim-changes``. Trimming only ever
+removes the oldest entries, so everything up to ``change_log_horizon`` is
+gone and a cursor below it can no longer be served.
+"""
+import json
+
+from sqlalchemy import text
+
+# Tracked tables and the columns that identify a row
+TRACKED_TABLES = {
+    'words': ('id',),
+    'groups': ('id',),
+    'words_groups': ('word_id', 'group_id'),
+    'study_sessions': ('id',),
+    'word_review_items': ('id',),
+}
+
+# Tables that live in learner shards when sharding is on
+SHARD_TRACKED_TABLES = ('study_sessions', 'word_review_items')
+
+def _key_sql(table, row):
+    columns = TRACKED_TABLES[table]
+    return 'json_object(' + ', '.join(f"'{column}', {row}.{column}" for column in columns) + ')'
+
+def _key_changed_sql(table):
+    return ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in TRACKED_TABLES[table])
+
+def change_log_triggers_sql(tables):
+    statements = []
+    for table in tables:
+        log = f"INSERT INTO change_log (table_name, row_key, op) VALUES ('{table}', "
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_insert_change AFTER INSERT ON {table} BEGIN "
+            f"{log}{_key_sql(table, 'NEW')}, 'upsert'); END"
+        )
+        # A key change is a delete of the old row plus an upsert of the new one
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_update_change AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO change_log (table_name, row_key, op) SELECT '{table}', {_key_sql(table, 'OLD')}, 'delete' "
+            f"WHERE {_key_changed_sql(table)}; "
+            f"{log}{_key_sql(table, 'NEW')}, 'upsert'); END"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_delete_change AFTER DELETE ON {table} BEGIN "
+            f"{log}{_key_sql(table, 'OLD')}, 'delete'); END"
+        )
+    return statements
+
+def create_change_log_triggers(conn, tables=tuple(TRACKED_TABLES), replace=False):
+    """Create the triggers on a SQLAlchemy connection; the change_log table itself is a model"""
+    if replace:
+        for table in tables:
+            for op in ('insert', 'update', 'delete'):
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {table}_{op}_change')
+    for statement in change_log_triggers_sql(tables):
+        conn.exec_driver_sql(statement)
+
+def change_log_horizon(conn, schema=None):
+    """Highest seq that has been trimmed from the log (0 if none); older cursors missed changes"""
+    prefix = f'{schema}.' if schema else ''
+    return conn.execute(text(f"""
+        SELECT COALESCE(
+            (SELECT MIN(seq) FROM {prefix}change_log) - 1,
+            (SELECT seq FROM {prefix}sqlite_sequence WHERE name = 'change_log'),
+            0
+        )
+    """)).scalar()
+
+def latest_change_seq(conn, schema=None):
+    prefix = f'{schema}.' if schema else ''
+    return conn.execute(text(
+        f"SELECT COALESCE((SELECT seq FROM {prefix}sqlite_sequence WHERE name = 'change_log'), 0)"
+    )).scalar()
+
+def read_changes(conn, since, limit, tables, schema=None):
+    """Changes after ``since`` for the given tables, one entry per row with its latest state.
+
+    Returns (changes, last_seq, has_more). ``conn`` is a SQLAlchemy session
+    or connection; ``schema`` qualifies change_log (e.g. 'shared').
+    """
+    change_log = f'{schema}.change_log' if schema else 'change_log'
+    placeholders = ', '.join(f"'{table}'" for table in tables)
+    rows = conn.execute(text(f"""
+        SELECT seq, table_name, row_key, op
+        FROM {change_log}
+        WHERE seq > :since AND table_name IN ({placeholders})
+        ORDER BY seq
+        LIMIT :limit
+    """), {'since': since, 'limit': limit + 1}).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], since, False
+
+    # Only the newest entry per row matters to a client catching up
+    latest = {}
+    for seq, table, row_key, op in rows:
+        latest.pop((table, row_key), None)
+        latest[(table, row_key)] = (seq, op)
+
+    changes = []
+    upserts = {}
+    for (table, row_key), (seq, op) in latest.items():
+        change = {'seq': seq, 'table': table, 'op': op, 'key': json.loads(row_key), 'row': None}
+        changes.append(change)
+        if op == 'upsert':
+            upserts.setdefault(table, []).append(change)
+
+    for table, table_changes in upserts.items():
+        _attach_rows(conn, table, table_changes)
+
+    return changes, rows[-1][0], has_more
+
+def _attach_rows(conn, table, changes):
+    columns = TRACKED_TABLES[table]
+    keys = json.dumps([[change['key'][column] for column in columns] for change in changes])
+    match = ' AND '.join(f't.{column} = json_extract(k.value, \'$[{i}]\')' for i, column in enumerate(columns))
+    result = conn.execute(text(f"""
+        SELECT t.* FROM {table} t
+        JOIN json_each(:keys) k ON {match}
+    """), {'keys': keys})
+    names = list(result.keys())
+    rows = {tuple(row[names.index(column)] for column in columns): dict(zip(names, row)) for row in result}
+    for change in changes:
+        row = rows.get(tuple(change['key'][column] for column in columns))
+        if row is None:
+            # Deleted after this entry was written; a later delete entry follows
+            change['op'] = 'delete'
+        else:
+            change['row'] = {name: value if isinstance(value, (int, float, str, type(None))) else str(value)
+                             for name, value in row.items()}
@@ -0,0 +1,36 @@
+"""The review_history view: live reviews and archived daily aggregates as one history.
+
+Aggregates read counts from the view (SUM of correct_count, wrong_count and
+review_count) instead of counting word_review_items rows, so they give the
+same answers before and after the archive task moves old reviews out of the
+hot table.
+"""
+
+REVIEW_HISTORY_VIEW_SQL = """
+CREATE VIEW IF NOT EXISTS review_history AS
+SELECT
+    word_id,
+    study_session_id,
+    day,
+    correct_count,
+    wrong_count,
+    correct_count + wrong_count AS review_count,
+    last_reviewed_at
+FROM word_review_daily
+UNION ALL
+SELECT
+    word_id,
+    study_session_id,
+    date(created_at) AS day,
+    CASE WHEN correct = 1 THEN 1 ELSE 0 END AS correct_count,
+    CASE WHEN correct = 0 THEN 1 ELSE 0 END AS wrong_count,
+    1 AS review_count,
+    created_at AS last_reviewed_at
+FROM word_review_items
+"""
+
+def create_review_history_view(conn, replace=False):
+    """Create the view on a SQLAlchemy connection, optionally replacing an older definition"""
+    if replace:
+        conn.exec_driver_sql('DROP VIEW IF EXISTS review_history')
+    conn.exec_driver_sql(REVIEW_HISTORY_VIEW_SQL)
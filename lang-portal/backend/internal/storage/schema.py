@@ -0,0 +1,53 @@
+import zlib
+from pathlib import Path
+
+from sqlalchemy.schema import CreateTable
+
+from internal.models.models import db
+from internal.storage.history import REVIEW_HISTORY_VIEW_SQL, create_review_history_view
+from internal.storage.change_log import TRACKED_TABLES, change_log_triggers_sql, create_change_log_triggers
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent.parent / 'db' / 'migrations'
+
+def schema_stamp():
+    """Fingerprint of the models, views, triggers and migration files, stored in PRAGMA user_version"""
+    checksum = 0
+    for table in db.metadata.sorted_tables:
+        checksum = zlib.crc32(str(CreateTable(table)).encode(), checksum)
+    checksum = zlib.crc32(REVIEW_HISTORY_VIEW_SQL.encode(), checksum)
+    for statement in change_log_triggers_sql(TRACKED_TABLES):
+        checksum = zlib.crc32(statement.encode(), checksum)
+    for migration_file in sorted(MIGRATIONS_DIR.glob('*.sql')):
+        checksum = zlib.crc32(migration_file.name.encode(), checksum)
+        checksum = zlib.crc32(migration_file.read_bytes(), checksum)
+    # user_version is a signed 32-bit integer
+    return checksum & 0x7fffffff
+
+def ensure_schema(app):
+    """Bring the database schema up to date, at most once per schema version.
+
+    Reading user_version is a single pragma, so worker boots against an
+    up-to-date database skip create_all() and the migration scan entirely.
+    """
+    stamp = schema_stamp()
+    with app.app_context():
+        with db.engine.connect() as conn:
+            if conn.exec_driver_sql('PRAGMA user_version').scalar() == stamp:
+                return False
+
+        # Imported here so the app does not load the CLI tasks unless needed
+        from tasks.migration_manager import MigrationManager
+        MigrationManager(db.engine.url.database).run_migrations()
+        db.create_all()
+
+        with db.engine.begin() as conn:
+            create_review_history_view(conn, replace=True)
+            create_change_log_triggers(conn, replace=True)
+            conn.exec_driver_sql(f'PRAGMA user_version = {stamp}')
+    return True
+
+def reset_schema_stamp(app):
+    """Forget the stored stamp so the next start re-checks the schema"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('PRAGMA user_version = 0')
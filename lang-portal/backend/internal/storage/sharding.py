@@ -0,0 +1,135 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+
+from internal.middleware.error_handler import APIError
+
+# Tables that live in a learner's own shard. Everything else (words, groups,
+# words_groups, study_activities) is read from the shared database, which is
+# attached read-only to every shard connection so existing joins keep working.
+SHARDED_TABLES = ('study_sessions', 'word_review_items', 'word_stats', 'word_review_daily', 'change_log')
+
+LEARNER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class ShardRouter:
+    """Keeps an LRU of open engines, one per learner shard file"""
+
+    def __init__(self, shard_dir, shared_db_path, max_open_engines=32):
+        self.shard_dir = Path(shard_dir)
+        self.shared_db_path = Path(shared_db_path)
+        self.max_open_engines = max_open_engines
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def engine_for(self, learner_id):
+        """Return the engine for a learner, creating the shard if needed"""
+        with self._lock:
+            engine = self._engines.get(learner_id)
+            if engine is not None:
+                self._engines.move_to_end(learner_id)
+                return engine
+
+            engine = self._create_engine(learner_id)
+            self._engines[learner_id] = engine
+
+            while len(self._engines) > self.max_open_engines:
+                _, evicted = self._engines.popitem(last=False)
+                evicted.dispose()
+
+            return engine
+
+    def shard_path(self, learner_id):
+        return self.shard_dir / f'{learner_id}.db'
+
+    def open_learners(self):
+        with self._lock:
+            return list(self._engines)
+
+    def dispose(self):
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+    def _create_engine(self, learner_id):
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        engine = sa.create_engine(
+            f'sqlite:///file:{self.shard_path(learner_id)}?mode=rwc&uri=true'
+        )
+        shared_uri = f'file:{self.shared_db_path}?mode=ro'
+
+        @sa.event.listens_for(engine, 'connect')
+        def attach_shared(dbapi_connection, connection_record):
+            dbapi_connection.execute('ATTACH DATABASE ? AS shared', (shared_uri,))
+
+        # Imported here to avoid a circular import with the models module
+        from internal.models.models import db
+        from internal.storage.history import create_review_history_view
+        from internal.storage.change_log import SHARD_TRACKED_TABLES, create_change_log_triggers
+        with engine.begin() as conn:
+            for table_name in SHARDED_TABLES:
+                db.metadata.tables[table_name].create(conn, checkfirst=True)
+            create_review_history_view(conn)
+            create_change_log_triggers(conn, SHARD_TRACKED_TABLES)
+
+        return engine
+
+
+class RoutingSession(Session):
+    """Session that sends every statement of a sharded request to the learner's shard"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            engine = g.get('shard_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def resolve_learner_id():
+    """Pick the learner from the learner header, falling back to a bearer token"""
+    learner_id = request.headers.get(current_app.config['LEARNER_HEADER'])
+    if learner_id:
+        if not LEARNER_ID_PATTERN.match(learner_id):
+            raise APIError('Invalid learner id', 400)
+        return learner_id
+
+    auth = request.headers.get('Authorization', '')
+    if auth.startswith('Bearer ') and auth[7:].strip():
+        # Never put the raw token in a file name
+        return hashlib.sha256(auth[7:].strip().encode()).hexdigest()[:32]
+
+    return None
+
+
+def get_router(app):
+    router = app.extensions.get('shard_router')
+    if router is None:
+        from internal.models.models import db
+        router = app.extensions.setdefault('shard_router', ShardRouter(
+            app.config['SHARD_DIR'],
+            db.engine.url.database,
+            app.config['SHARD_MAX_OPEN_ENGINES']
+        ))
+    return router
+
+
+def init_sharding(app):
+    @app.before_request
+    def route_to_shard():
+        if not app.config.get('SHARDING_ENABLED'):
+            return
+
+        learner_id = resolve_learner_id()
+        if learner_id is None:
+            return
+
+        g.learner_id = learner_id
+        g.shard_engine = get_router(app).engine_for(learner_id)
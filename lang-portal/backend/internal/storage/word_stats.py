@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from sqlalchemy import func, select, delete
+from sqlalchemy.dialects.sqlite import insert
+
+from internal.models.models import WordStats, review_history
+
+# A review counts half as much after this many days
+HALF_LIFE_DAYS = 14
+
+stats_table = WordStats.__table__
+
+def error_score(decayed_correct, decayed_wrong):
+    """Laplace-smoothed error rate, so a word with no reviews scores 0.5"""
+    return (decayed_wrong + 1) / (decayed_correct + decayed_wrong + 2)
+
+def decay_factor(last_reviewed_at, reviewed_at):
+    if last_reviewed_at is None or reviewed_at <= last_reviewed_at:
+        return 1.0
+    age_days = (reviewed_at - last_reviewed_at).total_seconds() / 86400
+    return 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+def record_review_stats(conn, word_id, correct, reviewed_at=None):
+    """Fold one review into word_stats, inside the caller's transaction.
+
+    ``conn`` may be the ORM session or a Core connection.
+    """
+    reviewed_at = reviewed_at or datetime.utcnow()
+    current = conn.execute(
+        select(stats_table).where(stats_table.c.word_id == word_id)
+    ).first()
+
+    if current is None:
+        decayed_correct = 1.0 if correct else 0.0
+        decayed_wrong = 0.0 if correct else 1.0
+    else:
+        factor = decay_factor(current.last_reviewed_at, reviewed_at)
+        decayed_correct = current.decayed_correct * factor + (1 if correct else 0)
+        decayed_wrong = current.decayed_wrong * factor + (0 if correct else 1)
+
+    upsert = insert(stats_table).values(
+        word_id=word_id,
+        correct_count=1 if correct else 0,
+        wrong_count=0 if correct else 1,
+        decayed_correct=decayed_correct,
+        decayed_wrong=decayed_wrong,
+        last_reviewed_at=reviewed_at,
+        score=error_score(decayed_correct, decayed_wrong)
+    )
+    conn.execute(upsert.on_conflict_do_update(
+        index_elements=['word_id'],
+        set_={
+            'correct_count': stats_table.c.correct_count + (1 if correct else 0),
+            'wrong_count': stats_table.c.wrong_count + (0 if correct else 1),
+            'decayed_correct': upsert.excluded.decayed_correct,
+            'decayed_wrong': upsert.excluded.decayed_wrong,
+            'last_reviewed_at': func.max(stats_table.c.last_reviewed_at, upsert.excluded.last_reviewed_at),
+            'score': upsert.excluded.score
+        }
+    ))
+
+def rebuild_word_stats(conn, word_id):
+    """Recompute one word's stats from its review history, e.g. after a review is deleted.
+
+    The rebuilt counts are not decayed.
+    """
+    counts = conn.execute(
+        select(
+            func.coalesce(func.sum(review_history.c.correct_count), 0),
+            func.coalesce(func.sum(review_history.c.wrong_count), 0),
+            func.max(review_history.c.last_reviewed_at)
+        ).where(review_history.c.word_id == word_id)
+    ).first()
+    conn.execute(delete(stats_table).where(stats_table.c.word_id == word_id))
+
+    correct_count, wrong_count, last_reviewed_at = counts
+    if correct_count or wrong_count:
+        conn.execute(stats_table.insert().values(
+            word_id=word_id,
+            correct_count=correct_count,
+            wrong_count=wrong_count,
+            decayed_correct=correct_count,
+            decayed_wrong=wrong_count,
+            last_reviewed_at=last_reviewed_at,
+            score=error_score(correct_count, wrong_count)
+        ))
@@ -0,0 +1,178 @@
+import atexit
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from internal.models.models import db, WordReviewItem
+from internal.storage.word_stats import record_review_stats
+
+class PendingReview:
+    """A review waiting for the writer thread; the request blocks on ``done``"""
+
+    def __init__(self, engine, values):
+        self.engine = engine
+        self.values = values
+        self.id = None
+        self.error = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._state = 'queued'
+
+    def claim(self):
+        """Called by the writer before committing; False if the request gave up"""
+        with self._lock:
+            if self._state == 'cancelled':
+                return False
+            self._state = 'claimed'
+            return True
+
+    def cancel(self):
+        """Called by the request on timeout; False if the writer already has it"""
+        with self._lock:
+            if self._state == 'claimed':
+                return False
+            self._state = 'cancelled'
+            return True
+
+class ReviewWriteQueue:
+    """Single writer thread that commits review inserts in batches.
+
+    Requests enqueue their insert and wait. The writer collects up to
+    ``max_batch`` items or waits at most ``max_delay`` seconds, inserts them
+    all in one transaction and only then wakes the waiting requests, so each
+    acknowledged review is as durable as before but one commit (and one
+    fsync) is shared by the whole batch.
+    """
+
+    def __init__(self, max_batch=64, max_delay=0.005):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def submit(self, engine, values, timeout=30):
+        """Queue one review insert and wait until it is committed; returns the new id"""
+        self._ensure_started()
+        pending = PendingReview(engine, values)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            if pending.cancel():
+                # Still queued, so the writer will skip it and nothing is committed
+                raise TimeoutError('Timed out waiting for the review writer')
+            # The writer is committing it already; its outcome is the answer
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.id
+
+    def stop(self):
+        """Flush what is queued and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+        self._queue.put(None)
+        thread.join()
+        with self._lock:
+            self._thread = None
+            self._stopping = False
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'largest_batch': self.largest_batch,
+            'average_batch': round(self.items / self.batches, 2) if self.batches else 0.0
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='review-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stop_after_batch = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop_after_batch = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            if stop_after_batch:
+                return
+
+    def _write(self, batch):
+        batch = [pending for pending in batch if pending.claim()]
+        if not batch:
+            return
+        by_engine = {}
+        for pending in batch:
+            by_engine.setdefault(pending.engine, []).append(pending)
+
+        for engine, items in by_engine.items():
+            try:
+                self._commit(engine, items)
+            except Exception:
+                # One bad row must not fail the rest of the batch, so retry individually
+                for pending in items:
+                    try:
+                        self._commit(engine, [pending])
+                    except Exception as e:
+                        pending.error = e
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for pending in batch:
+            pending.done.set()
+
+    def _commit(self, engine, items):
+        insert = WordReviewItem.__table__.insert()
+        with engine.begin() as conn:
+            ids = []
+            for pending in items:
+                ids.append(conn.execute(insert, pending.values).inserted_primary_key[0])
+                record_review_stats(conn, pending.values['word_id'], pending.values['correct'],
+                                    pending.values.get('created_at'))
+        for pending, review_id in zip(items, ids):
+            pending.id = review_id
+
+def get_write_queue(app=None):
+    """Return the app's review write queue, or None when REVIEW_WRITE_QUEUE is off"""
+    app = app or current_app._get_current_object()
+    if not app.config.get('REVIEW_WRITE_QUEUE'):
+        return None
+    write_queue = app.extensions.get('review_write_queue')
+    if write_queue is None:
+        write_queue = app.extensions.setdefault('review_write_queue', ReviewWriteQueue(
+            max_batch=app.config['REVIEW_WRITE_BATCH_SIZE'],
+            max_delay=app.config['REVIEW_WRITE_MAX_DELAY_MS'] / 1000
+        ))
+        atexit.register(write_queue.stop)
+    return write_queue
+
+def enqueue_review(values):
+    """Insert a review through the write queue, on the engine of the current request"""
+    engine = db.session.get_bind()
+    return get_write_queue().submit(engine, values)
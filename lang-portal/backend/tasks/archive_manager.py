@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+class ArchiveManager:
+    """Rolls old reviews out of word_review_items into per-word, per-session daily counts.
+
+    The review_history view joins both back into one history, so every
+    aggregate reads the same totals before and after archiving while the
+    hot table (and its indexes) only holds recent reviews.
+    """
+
+    def __init__(self, db_path, shard_dir=None):
+        self.db_path = Path(db_path)
+        self.shard_dir = Path(shard_dir) if shard_dir else self.db_path.parent / 'shards'
+
+    def archive(self, older_than_days=90, batch_size=5000):
+        """Archives reviews older than ``older_than_days`` in the database and every shard.
+
+        Returns the number of reviews archived.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+        databases = [self.db_path]
+        if self.shard_dir.is_dir():
+            databases.extend(sorted(self.shard_dir.glob('*.db')))
+
+        total = 0
+        for db_path in databases:
+            archived = self.archive_database(db_path, cutoff, batch_size)
+            print(f"Archived {archived} reviews older than {cutoff} from {db_path}")
+            total += archived
+        return total
+
+    def archive_database(self, db_path, cutoff, batch_size=5000):
+        """Archives one database in batches, each in its own short write transaction"""
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            if not self._has_table(conn, 'word_review_daily'):
+                print(f"Skipping {db_path}: no word_review_daily table yet (start the server once to create it)")
+                return 0
+
+            archived = 0
+            while True:
+                # BEGIN IMMEDIATE takes the write lock up front, so the batch is
+                # selected and moved without another writer slipping in between
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    last_id = conn.execute("""
+                        SELECT MAX(id) FROM (
+                            SELECT id FROM word_review_items
+                            WHERE created_at < ?
+                            ORDER BY id
+                            LIMIT ?
+                        )
+                    """, (cutoff, batch_size)).fetchone()[0]
+                    if last_id is None:
+                        conn.rollback()
+                        return archived
+
+                    conn.execute("""
+                        INSERT INTO word_review_daily (
+                            word_id, study_session_id, day, correct_count, wrong_count, last_reviewed_at
+                        )
+                        SELECT
+                            word_id,
+                            study_session_id,
+                            date(created_at),
+                            SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END),
+                            SUM(CASE WHEN correct = 0 THEN 1 ELSE 0 END),
+                            MAX(created_at)
+                        FROM word_review_items
+                        WHERE created_at < ? AND id <= ?
+                        GROUP BY word_id, study_session_id, date(created_at)
+                        ON CONFLICT (word_id, study_session_id, day) DO UPDATE SET
+                            correct_count = correct_count + excluded.correct_count,
+                            wrong_count = wrong_count + excluded.wrong_count,
+                            last_reviewed_at = MAX(last_reviewed_at, excluded.last_reviewed_at)
+                    """, (cutoff, last_id))
+                    cursor = conn.execute(
+                        "DELETE FROM word_review_items WHERE created_at < ? AND id <= ?",
+                        (cutoff, last_id)
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                archived += cursor.rowcount
+        finally:
+            conn.close()
+
+    def _has_table(self, conn, name):
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
@@ -0,0 +1,100 @@
+import gzip
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+class BackupManager:
+    def __init__(self, db_path, backup_dir=None):
+        self.db_path = Path(db_path)
+        self.backup_dir = Path(backup_dir) if backup_dir else self.db_path.parent / 'backups'
+
+    def backup(self, pages=256, keep=10):
+        """Copies the live database into a gzip-compressed snapshot.
+
+        Uses SQLite's online backup API, copying ``pages`` pages per step so
+        the source is only read-locked for short stretches and writers keep
+        going while the backup runs.
+        """
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+        snapshot_path = self.backup_dir / f'{self.db_path.stem}-{timestamp}.db.gz'
+        tmp_path = self.backup_dir / f'.{self.db_path.stem}-{timestamp}.db.tmp'
+
+        print(f"Backing up {self.db_path} to {snapshot_path}")
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=pages, sleep=0.005)
+        finally:
+            target.close()
+            source.close()
+
+        try:
+            self._check_integrity(tmp_path)
+            with open(tmp_path, 'rb') as f_in, gzip.open(snapshot_path, 'wb', compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._prune(keep)
+        print(f"Backup completed: {snapshot_path} ({snapshot_path.stat().st_size} bytes)")
+        return snapshot_path
+
+    def restore(self, snapshot_path, target_path=None):
+        """Restores a snapshot over the target database.
+
+        A missing target (a freshly provisioned node) gets the decompressed
+        file moved into place. An existing database is overwritten through the
+        backup API so connections that are already open see the restored data.
+        """
+        snapshot_path = Path(snapshot_path)
+        target_path = Path(target_path) if target_path else self.db_path
+        if not snapshot_path.exists():
+            raise FileNotFoundError(f"Snapshot not found: {snapshot_path}")
+
+        print(f"Restoring {snapshot_path} to {target_path}")
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target_path.with_name(f'.{target_path.name}.restore')
+        try:
+            with gzip.open(snapshot_path, 'rb') as f_in, open(tmp_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
+            self._check_integrity(tmp_path)
+
+            if not target_path.exists():
+                os.replace(tmp_path, target_path)
+            else:
+                source = sqlite3.connect(tmp_path)
+                target = sqlite3.connect(target_path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                    source.close()
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        print("Restore completed")
+        return target_path
+
+    def list_snapshots(self):
+        """Returns snapshots, newest first"""
+        if not self.backup_dir.exists():
+            return []
+        return sorted(self.backup_dir.glob(f'{self.db_path.stem}-*.db.gz'), reverse=True)
+
+    def _check_integrity(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        finally:
+            conn.close()
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"Integrity check failed for {path}: {result}")
+
+    def _prune(self, keep):
+        for old_snapshot in self.list_snapshots()[keep:]:
+            old_snapshot.unlink()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from tasks.load_generator import LoadGenerator
+
+LISTENING = re.compile(r'Listening on http://[^:]+:(\d+)')
+REVIEW_LABEL = 'POST /api/study_sessions/:id/words/:word_id/review'
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... up to and including max_workers"""
+    counts = []
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    return counts + [max_workers]
+
+def start_server(database, workers, threads):
+    """Starts cmd/prefork.py on a free port and returns (process, port) once it is listening"""
+    process = subprocess.Popen(
+        [sys.executable, 'cmd/prefork.py', '--host', '127.0.0.1', '--port', '0',
+         '--workers', str(workers), '--threads', str(threads), '--database', str(database)],
+        cwd=backend_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    for line in process.stdout:
+        match = LISTENING.search(line)
+        if match:
+            return process, int(match.group(1))
+    process.wait()
+    raise RuntimeError(f'Server with {workers} workers exited with code {process.returncode}')
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure throughput of the prefork server from 1 to N workers')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=8, help='Request threads per worker')
+    parser.add_argument('--learners', type=int, default=32, help='Concurrent simulated learners')
+    parser.add_argument('--duration', type=int, default=15, help='Seconds per run')
+    parser.add_argument('--database', default=backend_dir / 'db' / 'words.db',
+                        help='Copied afresh for every run, never written to')
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'review p50':>11} {'review p99':>11} {'errors':>7}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts(args.max_workers):
+            database = Path(tmp) / f'bench-{workers}.db'
+            shutil.copy(args.database, database)
+            process, port = start_server(database, workers, args.threads)
+            try:
+                # No think time: every learner keeps a request in flight
+                report = LoadGenerator(
+                    base_url=f'http://127.0.0.1:{port}',
+                    learners=args.learners,
+                    duration=args.duration,
+                    think_time=(0, 0)
+                ).run()
+            finally:
+                stop_server(process)
+
+            throughput = report['throughput_rps']
+            if baseline is None:
+                baseline = throughput
+            review = report['endpoints'].get(REVIEW_LABEL, {})
+            print(f"{workers:>7} {throughput:>9.1f} {throughput / baseline if baseline else 0:>7.2f}x "
+                  f"{review.get('p50_ms', 0):>10.1f}ms {review.get('p99_ms', 0):>10.1f}ms "
+                  f"{sum(report['errors'].values()):>7}")
+
+if __name__ == '__main__':
+    main()
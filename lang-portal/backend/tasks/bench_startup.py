@@ -0,0 +1,61 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+TARGETS = {
+    'cli': [sys.executable, '-m', 'tasks.cli', '--help'],
+    'server': [sys.executable, '-c', 'from cmd.server import create_app; create_app()'],
+}
+
+def time_command(command, runs):
+    """Runs a command in a fresh interpreter and returns wall times in ms"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=backend_dir, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def slowest_imports(command, limit):
+    """Returns the modules with the highest cumulative import time (us)"""
+    result = subprocess.run([command[0], '-X', 'importtime'] + command[1:], cwd=backend_dir,
+                            check=True, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented by two extra spaces per level
+        if not name.startswith('  '):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start of the CLI and server')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--imports', type=int, default=0,
+                        help='Also show the N slowest top-level imports per target')
+    args = parser.parse_args()
+
+    # Warm the filesystem cache and make sure the schema stamp is current
+    time_command(TARGETS['server'], 1)
+
+    print(f"{'target':<8} {'min ms':>8} {'median ms':>10} {'max ms':>8}")
+    for name, command in TARGETS.items():
+        timings = time_command(command, args.runs)
+        print(f"{name:<8} {min(timings):>8.1f} {statistics.median(timings):>10.1f} {max(timings):>8.1f}")
+
+    for name, command in TARGETS.items():
+        if args.imports:
+            print(f"\nSlowest imports for {name}:")
+            for cumulative, module in slowest_imports(command, args.imports):
+                print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+if __name__ == '__main__':
+    main()
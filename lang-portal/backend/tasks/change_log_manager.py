@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+class ChangeLogManager:
+    """Trims old entries from change_log, in the database and every shard.
+
+    Only a prefix of the log (by seq) is ever removed, so GET /api/changes
+    can tell from the oldest remaining seq whether a cursor missed entries
+    and answer it with 410 instead of an incomplete feed.
+    """
+
+    def __init__(self, db_path, shard_dir=None):
+        self.db_path = Path(db_path)
+        self.shard_dir = Path(shard_dir) if shard_dir else self.db_path.parent / 'shards'
+
+    def trim(self, older_than_days=30, batch_size=5000):
+        """Deletes entries older than ``older_than_days``; returns the number deleted"""
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+        databases = [self.db_path]
+        if self.shard_dir.is_dir():
+            databases.extend(sorted(self.shard_dir.glob('*.db')))
+
+        total = 0
+        for db_path in databases:
+            trimmed = self.trim_database(db_path, cutoff, batch_size)
+            print(f"Trimmed {trimmed} change log entries older than {cutoff} from {db_path}")
+            total += trimmed
+        return total
+
+    def trim_database(self, db_path, cutoff, batch_size=5000):
+        """Trims one database in batches, each in its own short write transaction"""
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            if not self._has_table(conn, 'change_log'):
+                print(f"Skipping {db_path}: no change_log table yet (start the server once to create it)")
+                return 0
+
+            # Everything up to the newest old entry goes, so the log keeps a
+            # contiguous tail even if the clock ever went backwards
+            last_seq = conn.execute(
+                "SELECT MAX(seq) FROM change_log WHERE changed_at < ?", (cutoff,)
+            ).fetchone()[0]
+            if last_seq is None:
+                return 0
+
+            trimmed = 0
+            while True:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    cursor = conn.execute("""
+                        DELETE FROM change_log WHERE seq IN (
+                            SELECT seq FROM change_log WHERE seq <= ? ORDER BY seq LIMIT ?
+                        )
+                    """, (last_seq, batch_size))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                trimmed += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    return trimmed
+        finally:
+            conn.close()
+
+    def _has_table(self, conn, name):
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
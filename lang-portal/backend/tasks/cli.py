@@ -2,18 +2,22 @@ import click
 from pathlib import Path
 import sys
 
-# Add the backend directory to Python path
+# Add the backend directory to Python path. It goes first so that the
+# backend's cmd package wins over the standard library module of that name.
 backend_dir = Path(__file__).resolve().parent.parent
-sys.path.append(str(backend_dir))
+sys.path.insert(0, str(backend_dir))
 
-# Change the import to use the direct path
-from cmd.server import create_app
+from tasks.seed_manager import SeedManager
+from tasks.migration_manager import MigrationManager
+from tasks.backup_manager import BackupManager
+from tasks.archive_manager import ArchiveManager
+from tasks.change_log_manager import ChangeLogManager
+from tasks.load_generator import LoadGenerator, format_report
 
-from seed_manager import SeedManager
-from migration_manager import MigrationManager
-from internal.models.models import db
-
-app = create_app()
+def db_app():
+    """Build a config-and-database-only app for commands that use the ORM"""
+    from cmd.server import create_db_app
+    return create_db_app()
 
 @click.group()
 def cli():
@@ -23,16 +27,20 @@ def cli():
 @cli.command()
 def init_db():
     """Initialize the database"""
-    with app.app_context():
-        db.create_all()
-        click.echo('Database initialized!')
+    from internal.storage.schema import ensure_schema
+    ensure_schema(db_app())
+    click.echo('Database initialized!')
 
 @cli.command()
 def drop_db():
     """Drop all database tables"""
+    from internal.models.models import db
+    from internal.storage.schema import reset_schema_stamp
+    app = db_app()
     with app.app_context():
         db.drop_all()
-        click.echo('Database dropped!')
+    reset_schema_stamp(app)
+    click.echo('Database dropped!')
 
 @cli.command()
 def migrate():
@@ -57,5 +65,107 @@ def seed_activity():
     manager = SeedManager(db_path)
     manager.seed_basic_activity()
 
+@cli.command()
+@click.option('--output-dir', default=None, help='Directory for snapshots (default: db/backups)')
+@click.option('--pages', default=256, show_default=True, help='Pages copied per backup step')
+@click.option('--keep', default=10, show_default=True, help='Number of snapshots to keep')
+def backup(output_dir, pages: int, keep: int):
+    """Take a compressed snapshot of the live database"""
+    db_path = Path(__file__).parent.parent / 'db' / 'words.db'
+    manager = BackupManager(db_path, output_dir)
+    manager.backup(pages=pages, keep=keep)
+
+@cli.command()
+@click.argument('snapshot', required=False)
+@click.option('--target', default=None, help='Database to restore into (default: db/words.db)')
+def restore(snapshot, target):
+    """Restore the database from a snapshot (default: the newest one)"""
+    db_path = Path(__file__).parent.parent / 'db' / 'words.db'
+    manager = BackupManager(db_path)
+    if snapshot is None:
+        snapshots = manager.list_snapshots()
+        if not snapshots:
+            raise click.ClickException('No snapshots found')
+        snapshot = snapshots[0]
+    manager.restore(snapshot, target)
+
+@cli.command()
+@click.option('--older-than-days', default=90, show_default=True, help='Archive reviews older than this')
+@click.option('--batch-size', default=5000, show_default=True, help='Reviews moved per transaction')
+def archive(older_than_days: int, batch_size: int):
+    """Roll old word reviews into daily aggregates, in the database and all shards"""
+    db_path = Path(__file__).parent.parent / 'db' / 'words.db'
+    manager = ArchiveManager(db_path)
+    total = manager.archive(older_than_days=older_than_days, batch_size=batch_size)
+    click.echo(f'Archived {total} reviews')
+
+@cli.command(name='trim-changes')
+@click.option('--older-than-days', default=30, show_default=True, help='Drop change log entries older than this')
+@click.option('--batch-size', default=5000, show_default=True, help='Entries deleted per transaction')
+def trim_changes(older_than_days: int, batch_size: int):
+    """Trim old /api/changes entries, in the database and all shards; older cursors then get 410"""
+    db_path = Path(__file__).parent.parent / 'db' / 'words.db'
+    manager = ChangeLogManager(db_path)
+    total = manager.trim(older_than_days=older_than_days, batch_size=batch_size)
+    click.echo(f'Trimmed {total} change log entries')
+
+@cli.command(name='analytics-export')
+@click.option('--output-dir', default=None, help='Directory for the export (default: db/analytics)')
+def analytics_export(output_dir):
+    """Export review history to memory-mappable .npy columns for /api/analytics"""
+    from config import Config
+    from internal.analytics.export import export_reviews
+    db_path = Path(__file__).parent.parent / 'db' / 'words.db'
+    manifest = export_reviews(db_path, output_dir or Config.ANALYTICS_DIR, shard_dir=Config.SHARD_DIR)
+    click.echo(f"Exported {manifest['rows']} review rows from {len(manifest['learners'])} databases")
+
+@cli.command(name='slow-queries')
+@click.option('--log-file', default=None, help='Slow-query log to read (default: logs/slow_queries.log)')
+@click.option('--limit', default=20, show_default=True, help='Number of statements to show')
+def slow_queries(log_file, limit: int):
+    """Summarize the slow-query log by statement fingerprint"""
+    from config import Config
+    from internal.middleware.slow_query import summarize
+    log_file = Path(log_file or Config.SLOW_QUERY_LOG_FILE)
+    lines = []
+    for path in sorted(log_file.parent.glob(f'{log_file.name}*')):
+        lines.extend(path.read_text(encoding='utf-8').splitlines())
+
+    for group in summarize(lines)[:limit]:
+        click.echo(f"{group['fingerprint']}  count={group['count']}  total={group['total_ms']}ms  "
+                   f"median={group['median_ms']}ms  max={group['max_ms']}ms")
+        click.echo(f"    {group['statement'][:200]}")
+        for caller in group['callers']:
+            click.echo(f"    called from {caller}")
+
+@cli.command()
+@click.option('--base-url', default='http://localhost:5000', show_default=True)
+@click.option('--learners', default=10, show_default=True, help='Concurrent simulated learners')
+@click.option('--duration', default=30, show_default=True, help='Seconds to run for')
+@click.option('--reviews-per-session', default=20, show_default=True)
+@click.option('--think-min', default=0.5, show_default=True, help='Minimum seconds between answers')
+@click.option('--think-max', default=2.0, show_default=True, help='Maximum seconds between answers')
+@click.option('--poll-every', default=5, show_default=True, help='Poll the dashboard every N answers (0 disables)')
+@click.option('--learner-header', default=None, help='Send each learner id in this header, e.g. X-Learner-Id')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+def loadtest(base_url, learners, duration, reviews_per_session, think_min, think_max,
+             poll_every, learner_header, as_json):
+    """Replay study-session traffic from concurrent learners against a running server"""
+    generator = LoadGenerator(
+        base_url=base_url,
+        learners=learners,
+        duration=duration,
+        reviews_per_session=reviews_per_session,
+        think_time=(think_min, think_max),
+        poll_every=poll_every,
+        learner_header=learner_header
+    )
+    report = generator.run()
+    if as_json:
+        import json
+        click.echo(json.dumps(report, indent=2))
+    else:
+        click.echo(format_report(report))
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
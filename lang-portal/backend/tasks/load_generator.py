@@ -0,0 +1,198 @@
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+DASHBOARD_ENDPOINTS = (
+    '/api/dashboard/last_study_session',
+    '/api/dashboard/study_progress',
+    '/api/dashboard/quick_stats',
+)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class LoadGenerator:
+    """Simulates concurrent learners running study sessions against a live server.
+
+    Each learner opens a session, answers cards with a think time between
+    them and polls the dashboard every few answers, until the duration is up.
+    """
+
+    def __init__(self, base_url='http://localhost:5000', learners=10, duration=30,
+                 reviews_per_session=20, think_time=(0.5, 2.0), poll_every=5,
+                 learner_header=None, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.learners = learners
+        self.duration = duration
+        self.reviews_per_session = reviews_per_session
+        self.think_time = think_time
+        self.poll_every = poll_every
+        self.learner_header = learner_header
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = Counter()
+
+    def run(self):
+        """Runs the simulation and returns a report dict"""
+        group_id, activity_id, word_ids = self._discover()
+
+        deadline = time.monotonic() + self.duration
+        threads = [
+            threading.Thread(target=self._learner, args=(n, deadline, group_id, activity_id, word_ids),
+                             daemon=True)
+            for n in range(self.learners)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self._report(time.monotonic() - started)
+
+    def _discover(self):
+        """Picks a group, an activity and that group's words to study"""
+        conn = self._connect()
+        try:
+            _, groups = self._request(conn, 'GET', '/api/groups', record=False)
+            _, activities = self._request(conn, 'GET', '/api/study_activities', record=False)
+            if not groups or not groups.get('items') or not activities or not activities.get('items'):
+                raise RuntimeError('The server needs at least one group and one study activity')
+            group_id = groups['items'][0]['id']
+            _, words = self._request(conn, 'GET', f'/api/groups/{group_id}/words', record=False)
+        finally:
+            conn.close()
+
+        word_ids = [word['id'] for word in (words or {}).get('items', [])]
+        if not word_ids:
+            raise RuntimeError(f'Group {group_id} has no words to review')
+        return group_id, activities['items'][0]['id'], word_ids
+
+    def _learner(self, n, deadline, group_id, activity_id, word_ids):
+        rng = random.Random(n)
+        headers = {self.learner_header: f'learner-{n}'} if self.learner_header else {}
+        conn = self._connect()
+        try:
+            while time.monotonic() < deadline:
+                status, session = self._request(conn, 'POST', '/api/study_sessions', {
+                    'group_id': group_id,
+                    'study_activity_id': activity_id
+                }, headers=headers, label='POST /api/study_sessions')
+                if status != 201:
+                    time.sleep(rng.uniform(*self.think_time))
+                    continue
+
+                for answered in range(1, self.reviews_per_session + 1):
+                    time.sleep(rng.uniform(*self.think_time))
+                    if time.monotonic() >= deadline:
+                        return
+
+                    word_id = rng.choice(word_ids)
+                    self._request(conn, 'POST',
+                                  f"/api/study_sessions/{session['id']}/words/{word_id}/review",
+                                  {'correct': rng.random() < 0.7}, headers=headers,
+                                  label='POST /api/study_sessions/:id/words/:word_id/review')
+
+                    if self.poll_every and answered % self.poll_every == 0:
+                        for path in DASHBOARD_ENDPOINTS:
+                            self._request(conn, 'GET', path, headers=headers)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, conn, method, path, payload=None, headers=None, label=None, record=True):
+        label = label or f'{method} {path}'
+        headers = dict(headers or {})
+        body = None
+        if payload is not None:
+            body = json.dumps(payload)
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if record:
+                self._record(label, time.perf_counter() - start, f'connection: {type(e).__name__}')
+            return None, None
+        elapsed = time.perf_counter() - start
+
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = None
+
+        error = None
+        if status >= 400:
+            message = data.get('error', '') if isinstance(data, dict) else ''
+            if 'locked' in message.lower():
+                error = 'database is locked'
+            elif status != 404:
+                error = f'HTTP {status}'
+        if record:
+            self._record(label, elapsed, error)
+        return status, data
+
+    def _record(self, label, elapsed, error):
+        with self._lock:
+            self._latencies[label].append(elapsed * 1000)
+            if error:
+                self._errors[error] += 1
+
+    def _report(self, elapsed):
+        total = sum(len(latencies) for latencies in self._latencies.values())
+        endpoints = {}
+        for label, latencies in sorted(self._latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[label] = {
+                'requests': len(latencies),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p90_ms': round(percentile(latencies, 90), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'max_ms': round(latencies[-1], 2)
+            }
+
+        errors = sum(self._errors.values())
+        return {
+            'learners': self.learners,
+            'duration_s': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+            'errors': dict(self._errors),
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'endpoints': endpoints
+        }
+
+def format_report(report):
+    lines = [
+        f"Learners: {report['learners']}  Duration: {report['duration_s']}s  "
+        f"Requests: {report['requests']}  Throughput: {report['throughput_rps']} req/s",
+        f"Error rate: {report['error_rate'] * 100:.2f}%",
+    ]
+    for error, count in sorted(report['errors'].items()):
+        lines.append(f"  {error}: {count}")
+
+    lines.append('')
+    lines.append(f"{'endpoint':<56} {'reqs':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for label, stats in report['endpoints'].items():
+        lines.append(f"{label:<56} {stats['requests']:>6} {stats['p50_ms']:>8} "
+                     f"{stats['p90_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+    return '\n'.join(lines)
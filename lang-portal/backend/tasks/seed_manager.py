@@ -1,13 +1,12 @@
 import json
 import sqlite3
 from pathlib import Path
-from internal.models.models import db, Word, Group, StudyActivity
 from datetime import datetime
 
 class SeedManager:
-    def __init__(self):
+    def __init__(self, db_path=None):
         # Use the same path resolution as create_tables.py
-        self.db_path = Path(__file__).resolve().parent.parent / "db" / "words.db"
+        self.db_path = db_path or Path(__file__).resolve().parent.parent / "db" / "words.db"
         self.seeds_dir = Path(__file__).resolve().parent.parent / "db" / "seeds"
         print(f"Initializing SeedManager:")
         print(f"- Database path: {self.db_path}")
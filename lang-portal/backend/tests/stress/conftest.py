@@ -0,0 +1,60 @@
+import os
+import sqlite3
+
+import pytest
+
+from cmd.server import create_app
+from internal.cache.registry import clear_all
+from internal.models.models import db
+from tests.stress.harness import LockTimer
+
+WORD_COUNT = 50
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+@pytest.fixture
+def stress_settings():
+    """Thread and work counts; raise them through the environment for a real run"""
+    return {
+        'writers': env_int('STRESS_WRITERS', 4),
+        'readers': env_int('STRESS_READERS', 2),
+        'sessions_per_writer': env_int('STRESS_SESSIONS_PER_WRITER', 3),
+        'reviews_per_session': env_int('STRESS_REVIEWS_PER_SESSION', 10),
+    }
+
+@pytest.fixture
+def lock_timer():
+    return LockTimer()
+
+@pytest.fixture
+def app(tmp_path, lock_timer, request):
+    """The real app on a file-backed database of its own, instead of db/words.db"""
+    db_path = tmp_path / 'stress.db'
+    write_queue = getattr(request, 'param', False)
+    # Module level caches are keyed by id, so entries from other databases must go
+    clear_all()
+    app = create_app({
+        'TESTING': True,
+        'DEBUG': False,
+        'DATABASE': str(db_path),
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'factory': lock_timer.connection_factory()}},
+        'REVIEW_WRITE_QUEUE': write_queue,
+        'SHARDING_ENABLED': False,
+    })
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO words (kanji, romaji, english) VALUES (?, ?, ?)",
+                     [(f'語{n}', f'go{n}', f'word {n}') for n in range(WORD_COUNT)])
+    conn.commit()
+    conn.close()
+
+    yield app
+
+    write_queue = app.extensions.get('review_write_queue')
+    if write_queue is not None:
+        write_queue.stop()
+    with app.app_context():
+        db.engine.dispose()
+    clear_all()
@@ -0,0 +1,198 @@
+import random
+import sqlite3
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from tasks.load_generator import percentile
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+class LockTimer:
+    """Times every write statement and commit on the app's SQLite connections.
+
+    pysqlite opens the transaction inside the first write statement, and a
+    commit has to wait for readers to finish, so under contention these
+    timings are mostly time spent waiting for the database lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+
+    def record(self, kind, elapsed):
+        with self._lock:
+            self.timings[kind].append(elapsed * 1000)
+
+    def connection_factory(self):
+        """A sqlite3.Connection subclass to pass as connect_args={'factory': ...}"""
+        timer = self
+
+        class TimedCursor(sqlite3.Cursor):
+            def execute(self, sql, *args):
+                if not sql.lstrip().upper().startswith(WRITE_PREFIXES):
+                    return super().execute(sql, *args)
+                start = time.perf_counter()
+                try:
+                    return super().execute(sql, *args)
+                finally:
+                    timer.record('write', time.perf_counter() - start)
+
+        class TimedConnection(sqlite3.Connection):
+            def cursor(self, factory=TimedCursor):
+                return super().cursor(factory)
+
+            def commit(self):
+                start = time.perf_counter()
+                try:
+                    return super().commit()
+                finally:
+                    timer.record('commit', time.perf_counter() - start)
+
+        return TimedConnection
+
+    def summary(self):
+        with self._lock:
+            return {kind: summarize(values) for kind, values in sorted(self.timings.items())}
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(statistics.median(values), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2),
+        'total_ms': round(sum(values), 2)
+    }
+
+class StressRun:
+    """Writer threads create sessions and post reviews while readers poll, all
+    through the Flask app, and every acknowledged write is recorded so it can
+    be checked against the database afterwards.
+    """
+
+    READ_PATHS = (
+        '/api/dashboard/quick_stats',
+        '/api/dashboard/study_progress',
+        '/api/study_sessions',
+        '/api/words',
+    )
+
+    def __init__(self, app, writers, readers, sessions_per_writer, reviews_per_session):
+        self.app = app
+        self.writers = writers
+        self.readers = readers
+        self.sessions_per_writer = sessions_per_writer
+        self.reviews_per_session = reviews_per_session
+
+        self._lock = threading.Lock()
+        self.acknowledged = {}
+        self.statuses = Counter()
+        self.latencies = defaultdict(list)
+        self.reads = 0
+
+    def run(self, group_id, activity_id, word_ids):
+        """Runs the writers to completion, with readers polling meanwhile; returns the elapsed seconds"""
+        done = threading.Event()
+        barrier = threading.Barrier(self.writers + self.readers)
+        writers = [threading.Thread(target=self._writer, args=(n, barrier, group_id, activity_id, word_ids))
+                   for n in range(self.writers)]
+        readers = [threading.Thread(target=self._reader, args=(barrier, done))
+                   for _ in range(self.readers)]
+
+        started = time.perf_counter()
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in readers:
+            thread.join()
+        return elapsed
+
+    def _writer(self, n, barrier, group_id, activity_id, word_ids):
+        rng = random.Random(n)
+        client = self.app.test_client()
+        barrier.wait()
+        for _ in range(self.sessions_per_writer):
+            response = self._request(client, 'post', '/api/study_sessions', 'create session',
+                                     json={'group_id': group_id, 'study_activity_id': activity_id})
+            if response.status_code != 201:
+                continue
+            session_id = response.get_json()['id']
+            with self._lock:
+                self.acknowledged[session_id] = 0
+
+            for _ in range(self.reviews_per_session):
+                response = self._request(
+                    client, 'post',
+                    f'/api/study_sessions/{session_id}/words/{rng.choice(word_ids)}/review', 'post review',
+                    json={'correct': rng.random() < 0.7})
+                if response.status_code in (200, 201):
+                    with self._lock:
+                        self.acknowledged[session_id] += 1
+
+    def _reader(self, barrier, done):
+        client = self.app.test_client()
+        barrier.wait()
+        while not done.is_set():
+            for path in self.READ_PATHS:
+                self._request(client, 'get', path, 'read')
+                with self._lock:
+                    self.reads += 1
+
+    def _request(self, client, method, path, label, **kwargs):
+        start = time.perf_counter()
+        response = getattr(client, method)(path, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[label].append(elapsed * 1000)
+            self.statuses[(label, response.status_code)] += 1
+        return response
+
+    def lost_writes(self, db_path):
+        """Acknowledged sessions and reviews that are missing from the database"""
+        conn = sqlite3.connect(db_path)
+        try:
+            stored = dict(conn.execute(
+                "SELECT s.id, COUNT(r.id) FROM study_sessions s "
+                "LEFT JOIN word_review_items r ON r.study_session_id = s.id GROUP BY s.id"
+            ).fetchall())
+            stats_total = conn.execute(
+                "SELECT COALESCE(SUM(correct_count + wrong_count), 0) FROM word_stats").fetchone()[0]
+        finally:
+            conn.close()
+
+        lost = {}
+        for session_id, reviews in self.acknowledged.items():
+            if session_id not in stored:
+                lost[session_id] = 'session missing'
+            elif stored[session_id] != reviews:
+                lost[session_id] = f'{reviews} reviews acknowledged, {stored[session_id]} stored'
+        if stats_total != sum(self.acknowledged.values()):
+            lost['word_stats'] = f'{sum(self.acknowledged.values())} reviews acknowledged, {stats_total} counted'
+        return lost
+
+    def report(self, elapsed, lock_timer):
+        writes = len(self.acknowledged) + sum(self.acknowledged.values())
+        return {
+            'writers': self.writers,
+            'readers': self.readers,
+            'duration_s': round(elapsed, 3),
+            'acknowledged_writes': writes,
+            'write_throughput': round(writes / elapsed, 2) if elapsed else 0.0,
+            'reads': self.reads,
+            'read_throughput': round(self.reads / elapsed, 2) if elapsed else 0.0,
+            'statuses': {f'{label} {status}': count for (label, status), count in sorted(self.statuses.items())},
+            'latency': {label: summarize(values) for label, values in sorted(self.latencies.items())},
+            'lock_wait': lock_timer.summary()
+        }
+
+    def failures(self):
+        """Requests that did not succeed, by label and status"""
+        return {f'{label} {status}': count for (label, status), count in self.statuses.items()
+                if status >= 500 or (label != 'read' and status >= 400)}
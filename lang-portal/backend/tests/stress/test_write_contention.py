@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+from flask.testing import FlaskClient
+
+from tests.stress.harness import StressRun
+
+class TestWriteContention:
+    @pytest.mark.parametrize('app', [False, True], ids=['direct', 'write_queue'], indirect=True)
+    def test_concurrent_writers_lose_nothing(self, app, client: FlaskClient, stress_settings, lock_timer):
+        """Writers and readers hit the app at once; every acknowledged write must be stored"""
+        group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+        activity_id = json.loads(client.get('/api/study_activities').data)['items'][0]['id']
+        word_ids = [word['id'] for word in json.loads(client.get('/api/words').data)['items']]
+
+        run = StressRun(app, **stress_settings)
+        elapsed = run.run(group_id, activity_id, word_ids)
+        report = run.report(elapsed, lock_timer)
+        report['write_queue'] = app.config['REVIEW_WRITE_QUEUE']
+
+        print()
+        print(json.dumps(report, indent=2))
+        if os.environ.get('STRESS_REPORT'):
+            with open(os.environ['STRESS_REPORT'], 'a') as f:
+                f.write(json.dumps(report) + '\n')
+
+        assert run.failures() == {}
+        assert run.lost_writes(app.config['DATABASE']) == {}
+        expected_sessions = stress_settings['writers'] * stress_settings['sessions_per_writer']
+        assert len(run.acknowledged) == expected_sessions
+        assert sum(run.acknowledged.values()) == expected_sessions * stress_settings['reviews_per_session']
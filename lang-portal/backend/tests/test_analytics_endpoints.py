@@ -0,0 +1,119 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+from flask.testing import FlaskClient
+from internal.analytics.export import export_lock, current_reviews
+from internal.analytics.retention import retention_curve, interval_recall, cohorts, DAY, WEEK
+from internal.middleware.profiler import sign
+
+def make_columns(rows):
+    """rows of (learner, word_id, ts, correct), already sorted"""
+    rows = np.array(rows, dtype=np.int64).reshape(-1, 4)
+    return {
+        'learner': rows[:, 0].astype(np.int32),
+        'word_id': rows[:, 1],
+        'group_id': np.ones(len(rows), dtype=np.int64),
+        'ts': rows[:, 2],
+        'correct': rows[:, 3].astype(np.int32),
+        'reviews': np.ones(len(rows), dtype=np.int32)
+    }
+
+class TestRetention:
+    def test_retention_curve_skips_first_review(self):
+        columns = make_columns([
+            (0, 1, 0, 0), (0, 1, DAY, 1), (0, 1, 3 * DAY, 0),
+            (0, 2, 0, 1), (0, 2, DAY + 10, 0),
+        ])
+        curve = retention_curve(columns, max_days=3)
+        assert [point['reviews'] for point in curve] == [0, 2, 0, 1]
+        assert curve[1]['recall'] == 0.5
+        assert curve[0]['recall'] is None
+
+    def test_interval_recall_only_pairs_same_word(self):
+        columns = make_columns([
+            (0, 1, 0, 1), (0, 1, 1800, 1),
+            (0, 2, 5000, 0),
+            (1, 2, 5000 + 3 * DAY, 0),
+        ])
+        buckets = {item['interval']: item for item in interval_recall(columns)}
+        assert buckets['< 1h']['reviews'] == 1
+        assert buckets['< 1h']['recall'] == 1.0
+        assert sum(item['reviews'] for item in buckets.values()) == 1
+
+    def test_cohorts(self):
+        week = 100 * WEEK
+        columns = make_columns([
+            (0, 1, week, 1), (0, 1, week + WEEK, 1),
+            (1, 1, week + 10, 1),
+            (2, 1, week + WEEK, 0),
+        ])
+        result = cohorts(columns, ['', 'a', 'b'], max_weeks=4)
+        assert [(item['learners'], item['retention']) for item in result] == [
+            (2, [1.0, 0.5]),
+            (1, [1.0])
+        ]
+
+class TestAnalyticsEndpoints:
+    def test_retention_endpoint(self, app, client: FlaskClient, setup_study_session, tmp_path):
+        """Test GET /api/analytics/retention over an export of the live database"""
+        app.config['ANALYTICS_DIR'] = tmp_path / 'analytics'
+        session_id = setup_study_session['id']
+        group_id = setup_study_session['group_id']
+        word_id = json.loads(client.get(f'/api/groups/{group_id}/words').data)['items'][0]['id']
+
+        start = datetime.utcnow() - timedelta(days=10)
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.executemany(
+            "INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (?, ?, ?, ?)",
+            [(word_id, session_id, correct, (start + timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+             for days, correct in [(0, 0), (1, 1), (2, 1), (2.5, 0)]]
+        )
+        conn.commit()
+        conn.close()
+
+        # Forcing an export is gated like the profiler endpoints
+        app.config['PROFILER_SECRET'] = 'test-secret'
+        assert client.post('/api/analytics/export').status_code == 403
+        response = client.post('/api/analytics/export',
+                               headers={'X-Profile': sign('test-secret', 'POST /api/analytics/export')})
+        assert response.status_code == 201
+        assert json.loads(response.data)['rows'] >= 4
+
+        response = client.get(f'/api/analytics/retention?group_id={group_id}&word_id={word_id}&max_days=5')
+        assert response.status_code == 200
+        curve = json.loads(response.data)['items']
+        assert [point['reviews'] for point in curve] == [0, 1, 2, 0, 0, 0]
+        assert curve[2]['recall'] == 0.5
+
+        response = client.get(f'/api/analytics/intervals?word_id={word_id}')
+        assert response.status_code == 200
+        assert sum(item['reviews'] for item in json.loads(response.data)['items']) == 3
+
+        response = client.get('/api/analytics/cohorts')
+        assert response.status_code == 200
+        assert json.loads(response.data)['items'][0]['learners'] == 1
+
+        assert client.get('/api/analytics/retention?group_id=x').status_code == 400
+        assert client.get('/api/analytics/retention?max_days=0').status_code == 400
+        assert client.get('/api/analytics/retention?max_days=abc').status_code == 400
+
+    def test_export_waits_for_the_directory_lock(self, app, tmp_path):
+        """An export started while another process holds the lock waits for it"""
+        app.config['ANALYTICS_DIR'] = tmp_path / 'analytics'
+        exported = threading.Event()
+
+        def export():
+            with app.app_context():
+                current_reviews(app, app.config['DATABASE'], refresh=True)
+            exported.set()
+
+        with export_lock(app.config['ANALYTICS_DIR']):
+            thread = threading.Thread(target=export)
+            thread.start()
+            assert not exported.wait(0.2)
+        thread.join(10)
+        assert exported.is_set()
+        versions = [path for path in (tmp_path / 'analytics').iterdir() if path.is_dir()]
+        assert len(versions) == 1
@@ -0,0 +1,49 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from flask.testing import FlaskClient
+from tasks.archive_manager import ArchiveManager
+
+class TestArchive:
+    def test_archive_keeps_aggregates(self, app, client: FlaskClient, setup_study_session, tmp_path):
+        """Archived reviews still count in every aggregate"""
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get(f"/api/groups/{setup_study_session['group_id']}/words").data)['items'][0]['id']
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        old = (datetime.utcnow() - timedelta(days=200)).replace(hour=12, minute=0)
+        conn.executemany(
+            "INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (?, ?, ?, ?)",
+            [(word_id, session_id, correct, (old + timedelta(minutes=n)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+             for n, correct in enumerate([1, 1, 0, 1, 0])]
+        )
+        conn.commit()
+        conn.close()
+        client.post(f'/api/study_sessions/{session_id}/words/{word_id}/review', json={'correct': True})
+
+        def snapshot():
+            words = json.loads(client.get('/api/words').data)['items']
+            return (
+                next(word for word in words if word['id'] == word_id),
+                json.loads(client.get(f'/api/study_sessions/{session_id}').data)['review_items_count'],
+                json.loads(client.get('/api/dashboard/quick_stats').data)['success_rate'],
+                json.loads(client.get(f'/api/study_sessions/{session_id}/words').data)['items']
+            )
+
+        before = snapshot()
+        assert before[0]['correct_count'] == 4
+        assert before[0]['wrong_count'] == 2
+
+        archived = ArchiveManager(app.config['DATABASE'], shard_dir=tmp_path / 'shards').archive(
+            older_than_days=90, batch_size=2)
+        assert archived == 5
+        assert snapshot() == before
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        assert conn.execute(
+            "SELECT COUNT(*) FROM word_review_items WHERE study_session_id = ?", (session_id,)
+        ).fetchone()[0] == 1
+        assert conn.execute(
+            "SELECT correct_count, wrong_count FROM word_review_daily WHERE study_session_id = ?", (session_id,)
+        ).fetchall() == [(3, 2)]
+        conn.close()
@@ -0,0 +1,50 @@
+import sqlite3
+from tasks.backup_manager import BackupManager
+
+def make_database(path, words):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS words (id INTEGER PRIMARY KEY, kanji TEXT)")
+    conn.executemany("INSERT INTO words (kanji) VALUES (?)", [(word,) for word in words])
+    conn.commit()
+    conn.close()
+
+def read_words(path):
+    conn = sqlite3.connect(path)
+    words = [row[0] for row in conn.execute("SELECT kanji FROM words ORDER BY id")]
+    conn.close()
+    return words
+
+class TestBackup:
+    def test_backup_and_restore(self, tmp_path):
+        """A snapshot restores over a database that changed after the backup"""
+        db_path = tmp_path / 'words.db'
+        make_database(db_path, ['水', '火'])
+        manager = BackupManager(db_path)
+
+        snapshot = manager.backup(pages=1)
+        assert snapshot.name.endswith('.db.gz')
+
+        make_database(db_path, ['木'])
+        assert read_words(db_path) == ['水', '火', '木']
+
+        manager.restore(snapshot)
+        assert read_words(db_path) == ['水', '火']
+
+    def test_restore_provisions_new_database(self, tmp_path):
+        """Restoring to a missing path creates the database from the snapshot"""
+        db_path = tmp_path / 'words.db'
+        make_database(db_path, ['水'])
+        snapshot = BackupManager(db_path).backup()
+
+        new_node = tmp_path / 'node2' / 'words.db'
+        BackupManager(db_path).restore(snapshot, new_node)
+        assert read_words(new_node) == ['水']
+
+    def test_backup_keeps_latest_snapshots(self, tmp_path):
+        """Old snapshots are pruned beyond the keep limit"""
+        db_path = tmp_path / 'words.db'
+        make_database(db_path, ['水'])
+        manager = BackupManager(db_path)
+
+        snapshots = [manager.backup(keep=2) for _ in range(3)]
+        assert manager.list_snapshots() == [snapshots[2], snapshots[1]]
@@ -0,0 +1,73 @@
+from flask.testing import FlaskClient
+import json
+from cmd.server import create_app
+from internal.middleware.profiler import list_profiles
+
+class TestBatchEndpoints:
+    def test_batch_matches_individual_requests(self, client: FlaskClient, setup_study_session):
+        """Test POST /api/batch returns the same bodies as separate GETs, in order"""
+        group_id = setup_study_session['group_id']
+        paths = [
+            '/api/dashboard/last_study_session',
+            '/api/dashboard/study_progress',
+            '/api/dashboard/quick_stats',
+            f'/api/groups/{group_id}',
+            f'/api/groups/{group_id}/words',
+            f'/api/groups/{group_id}/study_sessions',
+        ]
+        response = client.post('/api/batch', json={'requests': paths})
+        assert response.status_code == 200
+        responses = json.loads(response.data)['responses']
+
+        assert [item['path'] for item in responses] == paths
+        for item in responses:
+            single = client.get(item['path'])
+            assert item['status'] == single.status_code
+            assert item['body'] == json.loads(single.data)
+
+    def test_batch_reports_errors_per_request(self, client: FlaskClient):
+        """Failed and unbatchable requests do not fail the whole batch"""
+        response = client.post('/api/batch', json={'requests': [
+            '/api/words/999999999',
+            '/api/dashboard/stream',
+            '/api/words?in=x',
+            '/api/dashboard/quick_stats',
+        ]})
+        assert response.status_code == 200
+        statuses = [item['status'] for item in json.loads(response.data)['responses']]
+        assert statuses == [404, 400, 400, 200]
+
+    def test_batch_validation(self, client: FlaskClient):
+        """Test POST /api/batch rejects malformed batches"""
+        assert client.post('/api/batch', json={}).status_code == 400
+        assert client.post('/api/batch', json={'requests': ['/not-api']}).status_code == 400
+        assert client.post('/api/batch', json={'requests': ['/api/batch']}).status_code == 400
+        assert client.post('/api/batch', json={'requests': ['/api/health'] * 21}).status_code == 400
+
+    def test_batch_keeps_request_state(self, tmp_path):
+        """Nested requests neither replace the batch's profile nor share single-flight results"""
+        app = create_app({
+            'PROFILER_ENABLED': True,
+            'PROFILER_SAMPLE_RATE': 1.0,
+            'PROFILER_DIR': tmp_path / 'profiles',
+            'PROFILER_INTERVAL_MS': 1
+        })
+        client = app.test_client()
+        before = json.loads(client.get('/api/cache/stats').data)['single_flight']
+
+        response = client.post('/api/batch', json={'requests': [
+            '/api/dashboard/quick_stats',
+            '/api/dashboard/study_progress',
+        ]})
+        assert response.status_code == 200
+        assert 'X-Profile-Id' in response.headers
+
+        profiles = list_profiles(tmp_path / 'profiles')
+        batch_profile = [p for p in profiles if p['id'] == response.headers['X-Profile-Id']]
+        assert batch_profile and batch_profile[0]['path'] == '/api/batch'
+        # The stats request and the batch; none of the nested GETs
+        assert len(profiles) == 2
+
+        after = json.loads(client.get('/api/cache/stats').data)['single_flight']
+        assert after['computations'] == before['computations']
+        assert after['hits'] == before['hits']
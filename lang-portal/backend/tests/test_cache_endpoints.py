@@ -0,0 +1,173 @@
+from flask.testing import FlaskClient
+import json
+import sqlite3
+import threading
+import time
+from internal.middleware.single_flight import SingleFlight
+from internal.cache.lru import LRUCache
+from cmd.server import create_app
+from internal.cache.registry import invalidate_tables
+
+def cache_stats(client: FlaskClient, name):
+    response = client.get('/api/cache/stats')
+    assert response.status_code == 200
+    return json.loads(response.data)['caches'][name]
+
+class TestCacheEndpoints:
+    def test_cache_stats(self, client: FlaskClient):
+        """Test GET /api/cache/stats"""
+        response = client.get('/api/cache/stats')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+
+        for name in ('words', 'groups', 'study_activities', 'study_sessions'):
+            stats = data['caches'][name]
+            assert isinstance(stats['hits'], int)
+            assert isinstance(stats['misses'], int)
+            assert isinstance(stats['hit_rate'], float)
+
+    def test_session_lookups_hit_cache(self, client: FlaskClient, setup_study_session):
+        """Repeated session lookups resolve the group name from the cache"""
+        session_id = setup_study_session['id']
+        client.get(f'/api/study_sessions/{session_id}')
+        before = cache_stats(client, 'groups')
+
+        response = client.get(f'/api/study_sessions/{session_id}')
+        assert response.status_code == 200
+        assert json.loads(response.data)['group_name'] == setup_study_session['group_name']
+
+        after = cache_stats(client, 'groups')
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses']
+
+    def test_activity_update_invalidates_cache(self, client: FlaskClient, setup_study_session):
+        """PUT on an activity is visible in the next session response"""
+        session_id = setup_study_session['id']
+        activity_id = setup_study_session['study_activity_id']
+        client.get(f'/api/study_sessions/{session_id}')
+
+        response = client.put(f'/api/study_activities/{activity_id}', json={'name': 'Renamed'})
+        assert response.status_code == 200
+
+        data = json.loads(client.get(f'/api/study_sessions/{session_id}').data)
+        assert data['activity_name'] == 'Renamed'
+
+    def test_review_validates_from_cache(self, client: FlaskClient, setup_study_session):
+        """Recording a review checks the session and word through the entity cache"""
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        url = f'/api/study_sessions/{session_id}/words/{word_id}/review'
+        client.post(url, json={'correct': True})
+        sessions = cache_stats(client, 'study_sessions')
+        words = cache_stats(client, 'words')
+
+        assert client.post(url, json={'correct': False}).status_code == 201
+        assert cache_stats(client, 'study_sessions')['hits'] == sessions['hits'] + 1
+        assert cache_stats(client, 'words')['hits'] == words['hits'] + 1
+
+        response = client.post(f'/api/study_sessions/999999999/words/{word_id}/review', json={'correct': True})
+        assert response.status_code == 404
+        response = client.post(f'/api/study_sessions/{session_id}/words/999999999/review', json={'correct': True})
+        assert response.status_code == 404
+
+    def test_sessions_of_deleted_activities_are_hidden(self, app, client: FlaskClient, setup_study_session):
+        """Sessions whose activity no longer exists are left out, as before the cache"""
+        session_id = setup_study_session['id']
+        activity_id = setup_study_session['study_activity_id']
+        client.get(f'/api/study_sessions/{session_id}')
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute('DELETE FROM study_activities WHERE id = ?', (activity_id,))
+        conn.commit()
+        conn.close()
+        invalidate_tables('study_activities')
+
+        items = json.loads(client.get('/api/study_sessions').data)['items']
+        assert session_id not in [item['id'] for item in items]
+        assert client.get(f'/api/study_sessions/{session_id}').status_code == 404
+
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        """A value loaded while the cache was invalidated is returned but not kept"""
+        cache = LRUCache('test', maxsize=4)
+
+        def stale_load():
+            # A writer commits and invalidates while this load is running
+            cache.clear()
+            return 'old'
+
+        assert cache.get_or_load(1, stale_load) == 'old'
+        assert cache.get(1) is None
+        assert cache.get_or_load(1, lambda: 'new') == 'new'
+        assert cache.get(1) == 'new'
+
+    def test_single_flight_coalesces_concurrent_calls(self):
+        """Overlapping calls with the same key share one computation"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'value': 42}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+                     for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while flight.stats()['hits'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        assert flight.stats()['hits'] == 3, 'followers did not join the in-flight call in time'
+        for thread in [leader] + followers:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{'value': 42}] * 4
+        assert flight.stats()['hits'] == 3
+        assert flight.stats()['in_flight'] == 0
+
+        # Finished results are not reused
+        flight.do('key', compute)
+        assert len(calls) == 2
+
+    def test_single_flight_stats(self, client: FlaskClient):
+        """GET /api/cache/stats reports single-flight counters for dashboard GETs"""
+        before = json.loads(client.get('/api/cache/stats').data)['single_flight']
+        assert client.get('/api/dashboard/quick_stats').status_code == 200
+        after = json.loads(client.get('/api/cache/stats').data)['single_flight']
+        assert after['computations'] == before['computations'] + 1
+
+    def test_writes_from_other_processes_invalidate_caches(self, app, setup_study_session):
+        """A rename through another connection is seen on the next request"""
+        client = create_app({'CACHE_COHERENCE': True}).test_client()
+        session_id = setup_study_session['id']
+        assert json.loads(client.get(f'/api/study_sessions/{session_id}').data)['group_name'] == \
+            setup_study_session['group_name']
+        sessions_before = cache_stats(client, 'study_sessions')['size']
+
+        # Another worker process writes through its own connection
+        def rename(name):
+            conn = sqlite3.connect(app.config['DATABASE'])
+            conn.execute("UPDATE groups SET name = ? WHERE id = ?", (name, setup_study_session['group_id']))
+            conn.commit()
+            conn.close()
+
+        rename('Renamed elsewhere')
+        try:
+            data = json.loads(client.get(f'/api/study_sessions/{session_id}').data)
+            assert data['group_name'] == 'Renamed elsewhere'
+            # Caches built from other tables are kept
+            assert cache_stats(client, 'study_sessions')['size'] == sessions_before
+            assert json.loads(client.get('/api/cache/stats').data)['coherence']['invalidations'] >= 1
+        finally:
+            rename(setup_study_session['group_name'])
+            # Let the watcher drop the renamed group for the tests that follow
+            client.get('/api/health')
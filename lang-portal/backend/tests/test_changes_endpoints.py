@@ -0,0 +1,126 @@
+from flask.testing import FlaskClient
+import json
+import sqlite3
+from tasks.change_log_manager import ChangeLogManager
+
+def latest_seq(client: FlaskClient, headers=None):
+    """Page through the whole log and return the cursor at its end"""
+    since = '0'
+    while True:
+        response = client.get(f'/api/changes?since={since}&limit=5000', headers=headers)
+        data = json.loads(response.data)
+        if response.status_code == 410:
+            # The log was trimmed; 410 carries the cursor to continue from
+            return data['next_since']
+        since = data['next_since']
+        if not data['has_more']:
+            return since
+
+def changes_since(client: FlaskClient, since, headers=None, **params):
+    query = '&'.join(f'{name}={value}' for name, value in params.items())
+    response = client.get(f'/api/changes?since={since}&{query}', headers=headers)
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+class TestChangesEndpoints:
+    def test_changes_since_cursor(self, app, client: FlaskClient):
+        """Only rows changed after the cursor are returned, once each with their latest state"""
+        since = latest_seq(client)
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        word_id = conn.execute("INSERT INTO words (kanji, romaji, english) VALUES ('猫', 'neko', 'cat')").lastrowid
+        conn.execute("UPDATE words SET english = 'kitty' WHERE id = ?", (word_id,))
+        gone_id = conn.execute("INSERT INTO words (kanji, romaji, english) VALUES ('犬', 'inu', 'dog')").lastrowid
+        conn.execute('DELETE FROM words WHERE id = ?', (gone_id,))
+        conn.commit()
+
+        try:
+            data = changes_since(client, since)
+            assert data['has_more'] is False
+            changes = {(change['table'], change['key']['id']): change for change in data['changes']}
+            assert len(changes) == 2
+
+            upsert = changes[('words', word_id)]
+            assert upsert['op'] == 'upsert'
+            assert upsert['row']['english'] == 'kitty'
+            deleted = changes[('words', gone_id)]
+            assert deleted['op'] == 'delete'
+            assert deleted['row'] is None
+
+            # Nothing new after the returned cursor
+            assert changes_since(client, data['next_since'])['changes'] == []
+        finally:
+            conn.execute('DELETE FROM words WHERE id = ?', (word_id,))
+            conn.commit()
+            conn.close()
+
+    def test_trimmed_cursor_is_gone(self, app, client: FlaskClient, setup_study_session, tmp_path):
+        """Cursors from before the trimmed part of the log get 410 and a cursor to resume from"""
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        review_url = f'/api/study_sessions/{session_id}/words/{word_id}/review'
+        client.post(review_url, json={'correct': True})
+        trimmed_to = int(latest_seq(client))
+        client.post(review_url, json={'correct': False})
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        conn.execute("UPDATE change_log SET changed_at = '2000-01-01 00:00:00' WHERE seq <= ?", (trimmed_to,))
+        conn.commit()
+        conn.close()
+        assert ChangeLogManager(app.config['DATABASE'], shard_dir=tmp_path / 'shards').trim(
+            older_than_days=1, batch_size=2) > 0
+
+        response = client.get(f'/api/changes?since={trimmed_to - 1}')
+        assert response.status_code == 410
+        assert int(json.loads(response.data)['next_since']) > trimmed_to
+
+        data = changes_since(client, trimmed_to)
+        assert [change['table'] for change in data['changes']] == ['word_review_items']
+
+    def test_changes_pagination(self, client: FlaskClient, setup_study_session):
+        """A small limit pages through the log with has_more"""
+        since = latest_seq(client)
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        for correct in (True, False, True):
+            client.post(f'/api/study_sessions/{session_id}/words/{word_id}/review',
+                        json={'correct': correct})
+
+        first = changes_since(client, since, limit=2)
+        assert first['has_more'] is True
+        second = changes_since(client, first['next_since'], limit=2)
+        assert second['has_more'] is False
+
+        tables = [change['table'] for change in first['changes'] + second['changes']]
+        assert tables.count('word_review_items') == 3
+
+        assert client.get('/api/changes?since=abc').status_code == 400
+        assert client.get('/api/changes?limit=0').status_code == 400
+        assert client.get('/api/changes?limit=abc').status_code == 400
+
+    def test_sharded_changes(self, app, client: FlaskClient, tmp_path):
+        """A learner's feed combines the shared log with their own shard's log"""
+        app.config.update({'SHARDING_ENABLED': True, 'SHARD_DIR': tmp_path / 'shards'})
+        headers = {'X-Learner-Id': 'alice'}
+        try:
+            since = latest_seq(client, headers)
+            assert '.' in since
+
+            group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+            activity_id = json.loads(client.get('/api/study_activities').data)['items'][0]['id']
+            session = client.post('/api/study_sessions', headers=headers,
+                                  json={'group_id': group_id, 'study_activity_id': activity_id})
+            assert session.status_code == 201
+
+            data = changes_since(client, since, headers)
+            assert [(change['table'], change['op']) for change in data['changes']] == \
+                [('study_sessions', 'upsert')]
+            assert data['changes'][0]['row']['group_id'] == group_id
+
+            # Other learners do not see it
+            assert changes_since(client, latest_seq(client, {'X-Learner-Id': 'bob'}),
+                                 {'X-Learner-Id': 'bob'})['changes'] == []
+        finally:
+            router = app.extensions.get('shard_router')
+            if router is not None:
+                router.dispose()
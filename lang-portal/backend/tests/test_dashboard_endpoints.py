@@ -1,6 +1,8 @@
 import pytest
 from flask.testing import FlaskClient
 import json
+import sqlite3
+from cmd.server import create_app
 
 class TestDashboardEndpoints:
     def test_last_study_session(self, client: FlaskClient, setup_study_session):
@@ -35,4 +37,76 @@ class TestDashboardEndpoints:
         assert isinstance(data.get('success_rate'), (int, float))
         assert isinstance(data.get('total_study_sessions'), int)
         assert isinstance(data.get('total_active_groups'), int)
-        assert isinstance(data.get('study_streak_days'), int)
\ No newline at end of file
+        assert isinstance(data.get('study_streak_days'), int)
+
+    def test_dashboard_stream(self, client: FlaskClient, setup_study_session):
+        """Test GET /api/dashboard/stream sends a snapshot and then deltas"""
+        response = client.get('/api/dashboard/stream', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        events = (chunk.decode() for chunk in response.response)
+        assert next(events).startswith('retry:')
+        snapshot = next(events)
+        assert snapshot.startswith('event: snapshot')
+        stats = json.loads(snapshot.split('data: ', 1)[1])
+        assert stats['last_study_session']['id'] == setup_study_session['id']
+
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        client.post(f"/api/study_sessions/{setup_study_session['id']}/words/{word_id}/review",
+                    json={'correct': True})
+
+        review = next(events)
+        assert 'event: review' in review
+        data = json.loads(review.split('data: ', 1)[1])
+        assert data['delta']['total_reviews'] == 1
+        assert data['delta']['correct_reviews'] == 1
+        assert data['values']['success_rate'] == 100.0
+
+        response.close()
+
+    def test_dashboard_stream_review_deleted(self, client: FlaskClient, setup_study_session):
+        """Test DELETE /api/word_reviews/:id reaches stream clients"""
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        review = json.loads(client.post(
+            f"/api/study_sessions/{setup_study_session['id']}/words/{word_id}/review",
+            json={'correct': True}
+        ).data)
+
+        response = client.get('/api/dashboard/stream', buffered=False)
+        events = (chunk.decode() for chunk in response.response)
+        next(events)
+        next(events)
+
+        assert client.delete(f"/api/word_reviews/{review['id']}").status_code == 204
+        removed = next(events)
+        assert 'event: review_removed' in removed
+        data = json.loads(removed.split('data: ', 1)[1])
+        assert data['delta']['total_reviews'] == -1
+        assert data['delta']['correct_reviews'] == -1
+
+        response.close()
+
+    def test_dashboard_stream_sees_other_processes(self, app, setup_study_session):
+        """With several workers the snapshot is reloaded after another process writes"""
+        client = create_app({'CACHE_COHERENCE': True}).test_client()
+        response = client.get('/api/dashboard/stream', buffered=False)
+        events = (chunk.decode() for chunk in response.response)
+        next(events)
+        before = json.loads(next(events).split('data: ', 1)[1])
+
+        # Another worker process records a review through its own connection
+        conn = sqlite3.connect(app.config['DATABASE'])
+        word_id = conn.execute('SELECT id FROM words LIMIT 1').fetchone()[0]
+        conn.execute('INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) '
+                     "VALUES (?, ?, 1, datetime('now'))", (word_id, setup_study_session['id']))
+        conn.commit()
+        conn.close()
+
+        refreshed = next(events)
+        assert refreshed.startswith('id: ')
+        assert 'event: snapshot' in refreshed
+        after = json.loads(refreshed.split('data: ', 1)[1])
+        assert after['total_reviews'] == before['total_reviews'] + 1
+
+        response.close()
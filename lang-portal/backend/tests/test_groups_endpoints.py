@@ -1,6 +1,9 @@
 from flask.testing import FlaskClient
+import gzip
 import json
+import sqlite3
 from typing import Dict, Any
+from internal.cache.registry import invalidate_tables
 
 class TestGroupsEndpoints:
     def test_get_groups_list(self, client: FlaskClient):
@@ -50,4 +53,124 @@ class TestGroupsEndpoints:
         assert 'items' in data
         for session in data['items']:
             assert 'activity_name' in session
-            assert 'created_at' in session
\ No newline at end of file
+            assert 'created_at' in session
+
+    def test_get_group_sample(self, client: FlaskClient):
+        """Test GET /api/groups/:id/sample"""
+        group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+        group_words = json.loads(client.get(f'/api/groups/{group_id}/words').data)['items']
+
+        for weighted in ('false', 'true'):
+            response = client.get(f'/api/groups/{group_id}/sample?n=5&weighted={weighted}')
+            assert response.status_code == 200
+            data = json.loads(response.data)
+
+            ids = [item['id'] for item in data['items']]
+            assert len(ids) == min(5, len(group_words))
+            assert len(set(ids)) == len(ids)
+            assert set(ids) <= {word['id'] for word in group_words}
+            assert data['group_size'] == len(group_words)
+
+    def test_get_group_sample_invalid_size(self, client: FlaskClient):
+        """Test GET /api/groups/:id/sample rejects out of range sizes"""
+        group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+        response = client.get(f'/api/groups/{group_id}/sample?n=0')
+        assert response.status_code == 400
+        assert client.get(f'/api/groups/{group_id}/sample?n=abc').status_code == 400
+
+    def test_get_group_deck(self, app, client: FlaskClient):
+        """Test GET /api/groups/:id/deck serves a cached, compressed deck with an ETag"""
+        group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+        group_words = json.loads(client.get(f'/api/groups/{group_id}/words').data)['items']
+
+        response = client.get(f'/api/groups/{group_id}/deck', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        deck = json.loads(gzip.decompress(response.data))
+        assert [item['id'] for item in deck['items']] == sorted(word['id'] for word in group_words)
+        # Counters change on every review, so they stay out of the immutable blob
+        assert all('correct_count' not in item for item in deck['items'])
+        etag = response.headers['ETag']
+
+        response = client.get(f'/api/groups/{group_id}/deck', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+        version = etag.strip('"')
+        response = client.get(f'/api/groups/{group_id}/deck?v={version}')
+        assert 'immutable' in response.headers['Cache-Control']
+        assert json.loads(response.data) == deck
+
+        # A membership change produces a new deck
+        conn = sqlite3.connect(app.config['DATABASE'])
+        word_id = conn.execute(
+            "SELECT id FROM words WHERE id NOT IN (SELECT word_id FROM words_groups WHERE group_id = ?) LIMIT 1",
+            (group_id,)
+        ).fetchone()[0]
+        conn.execute("INSERT INTO words_groups (word_id, group_id) VALUES (?, ?)", (word_id, group_id))
+        conn.commit()
+        conn.close()
+        invalidate_tables('words_groups')
+
+        response = client.get(f'/api/groups/{group_id}/deck')
+        assert response.headers['ETag'] != etag
+        assert word_id in [item['id'] for item in json.loads(response.data)['items']]
+
+        assert client.get('/api/groups/999999999/deck').status_code == 404
+
+    def test_group_members_bulk(self, app, client: FlaskClient):
+        """POST/DELETE /api/groups/:id/members change memberships in bulk"""
+        source_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+        source_words = {word['id'] for word in json.loads(client.get(f'/api/groups/{source_id}/words').data)['items']}
+        conn = sqlite3.connect(app.config['DATABASE'])
+        group_id = conn.execute("INSERT INTO groups (name) VALUES ('Bulk Test')").lastrowid
+        word_ids = [row[0] for row in conn.execute("SELECT id FROM words ORDER BY id LIMIT 3")]
+        greetings = {row[0] for row in conn.execute(
+            "SELECT id FROM words WHERE json_extract(parts, '$.type') = 'greeting'")}
+        conn.commit()
+        conn.close()
+
+        def members():
+            return {word['id'] for word in json.loads(client.get(f'/api/groups/{group_id}/words').data)['items']}
+
+        try:
+            # Warm the member cache so the writes have to invalidate it
+            client.get(f'/api/groups/{group_id}/sample')
+
+            response = client.post(f'/api/groups/{group_id}/members', json={'word_ids': word_ids})
+            assert response.status_code == 200
+            assert json.loads(response.data)['added'] == 3
+            # Adding the same words again is a no-op
+            response = client.post(f'/api/groups/{group_id}/members', json={'word_ids': word_ids})
+            assert json.loads(response.data)['added'] == 0
+
+            response = client.post(f'/api/groups/{group_id}/members', json={'parts': {'type': 'greeting'}})
+            assert members() == set(word_ids) | greetings
+            sample = json.loads(client.get(f'/api/groups/{group_id}/sample?n=100').data)
+            assert {word['id'] for word in sample['items']} == set(word_ids) | greetings
+
+            response = client.delete(f'/api/groups/{group_id}/members', json={'word_ids': word_ids[:1]})
+            assert json.loads(response.data)['removed'] == 1
+            assert word_ids[0] not in members()
+
+            # Move the source group's words over
+            response = client.post(f'/api/groups/{group_id}/members',
+                                   json={'from_group': source_id, 'move': True})
+            assert json.loads(response.data)['removed_from_source'] == len(source_words)
+            assert source_words <= members()
+            assert json.loads(client.get(f'/api/groups/{source_id}/words').data)['items'] == []
+
+            assert client.post(f'/api/groups/{group_id}/members', json={}).status_code == 400
+            assert client.post(f'/api/groups/{group_id}/members', json={'word_ids': ['a']}).status_code == 400
+            assert client.post(f'/api/groups/{group_id}/members', json={'move': True, 'word_ids': [1]}).status_code == 400
+            assert client.post('/api/groups/999999999/members', json={'word_ids': [1]}).status_code == 404
+        finally:
+            conn = sqlite3.connect(app.config['DATABASE'])
+            conn.execute("DELETE FROM words_groups WHERE group_id = ?", (source_id,))
+            conn.executemany("INSERT INTO words_groups (word_id, group_id) VALUES (?, ?)",
+                             [(word_id, source_id) for word_id in source_words])
+            conn.execute("DELETE FROM words_groups WHERE group_id = ?", (group_id,))
+            conn.execute("DELETE FROM groups WHERE id = ?", (group_id,))
+            conn.commit()
+            conn.close()
+            invalidate_tables('words_groups', 'groups')
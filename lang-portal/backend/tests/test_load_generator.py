@@ -0,0 +1,34 @@
+import threading
+from werkzeug.serving import make_server
+from tasks.load_generator import LoadGenerator, percentile
+
+class TestLoadGenerator:
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 90) == 0.0
+
+    def test_load_generator_reports_traffic(self, app):
+        """A short run against a live server reports throughput and latencies"""
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            report = LoadGenerator(
+                base_url=f'http://127.0.0.1:{server.server_port}',
+                learners=2,
+                duration=1,
+                reviews_per_session=3,
+                think_time=(0, 0.01),
+                poll_every=1
+            ).run()
+        finally:
+            server.shutdown()
+            thread.join()
+
+        assert report['requests'] > 0
+        assert report['throughput_rps'] > 0
+        assert report['errors'] == {}
+        assert 'POST /api/study_sessions' in report['endpoints']
+        assert 'GET /api/dashboard/quick_stats' in report['endpoints']
@@ -0,0 +1,79 @@
+import http.client
+import json
+import shutil
+import signal
+import time
+from cmd.prefork import warm_up
+from internal.cache.entities import group_cache
+from internal.cache.groups import group_members_cache
+from internal.cache.registry import clear_all
+from tasks.bench_server import start_server, stop_server, worker_counts
+
+def get_health(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request('GET', '/api/health')
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+class TestPrefork:
+    def test_worker_counts(self):
+        assert worker_counts(1) == [1]
+        assert worker_counts(6) == [1, 2, 4, 6]
+        assert worker_counts(8) == [1, 2, 4, 8]
+
+    def test_warm_up_fills_caches(self, app):
+        """Warm-up loads groups and their member lists before any request arrives"""
+        clear_all()
+        assert warm_up(app) >= 1
+        group_id = json.loads(app.test_client().get('/api/groups').data)['items'][0]['id']
+        assert group_cache.get(group_id) is not None
+        assert group_members_cache.get(group_id) is not None
+
+    def test_reload_and_shutdown(self, app, tmp_path):
+        """Workers keep serving across a SIGHUP restart and exit cleanly on SIGTERM"""
+        database = tmp_path / 'prefork.db'
+        shutil.copy(app.config['DATABASE'], database)
+        process, port = start_server(database, workers=2, threads=2)
+        try:
+            assert get_health(port) == (200, {'status': 'healthy'})
+
+            process.send_signal(signal.SIGHUP)
+            lines = []
+            for line in process.stdout:
+                lines.append(line)
+                if 'Reloaded' in line or 'aborted' in line:
+                    break
+            assert 'Reloaded with 2 workers' in lines[-1]
+            assert sum('ready' in line for line in lines) == 2
+            assert get_health(port) == (200, {'status': 'healthy'})
+        finally:
+            stop_server(process)
+        assert process.returncode == 0
+
+    def test_streams_do_not_hold_the_pool(self, app, tmp_path):
+        """A dashboard stream leaves the pool free and is ended on shutdown"""
+        database = tmp_path / 'prefork.db'
+        shutil.copy(app.config['DATABASE'], database)
+        process, port = start_server(database, workers=1, threads=1)
+        stream = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            stream.request('GET', '/api/dashboard/stream')
+            response = stream.getresponse()
+            assert response.status == 200
+            assert response.fp.readline().startswith(b'retry:')
+
+            # The only pool thread is still free for other requests
+            assert get_health(port) == (200, {'status': 'healthy'})
+
+            started = time.monotonic()
+            stop_server(process)
+            assert time.monotonic() - started < 10
+            assert b'event: resync' in response.read()
+        finally:
+            stream.close()
+            if process.poll() is None:
+                process.kill()
+        assert process.returncode == 0
@@ -0,0 +1,47 @@
+import json
+from flask.testing import FlaskClient
+from cmd.server import create_app
+from internal.middleware.profiler import sign
+
+def profiler_app(tmp_path, **config):
+    return create_app(dict({
+        'PROFILER_ENABLED': True,
+        'PROFILER_SECRET': 'test-secret',
+        'PROFILER_DIR': tmp_path / 'profiles',
+        'PROFILER_INTERVAL_MS': 1,
+        'PROFILER_KEEP': 2
+    }, **config))
+
+class TestProfiler:
+    def test_signed_request_is_profiled(self, tmp_path):
+        """A correctly signed request writes a profile listed by the index"""
+        client = profiler_app(tmp_path).test_client()
+        path = '/api/dashboard/quick_stats'
+
+        response = client.get(path, headers={'X-Profile': sign('test-secret', f'GET {path}')})
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+
+        profiles = json.loads(client.get('/api/debug/profiles').data)['items']
+        assert [item['id'] for item in profiles] == [profile_id]
+
+        profile = json.loads(client.get(f'/api/debug/profiles/{profile_id}').data)
+        assert profile['path'] == path
+        assert profile['status'] == 200
+        assert profile['trigger'] == 'signed'
+        assert profile['sql_count'] > 0
+        assert all(query['duration_ms'] >= 0 for query in profile['sql'])
+
+    def test_unsigned_and_badly_signed_requests_are_not_profiled(self, tmp_path):
+        client = profiler_app(tmp_path).test_client()
+        path = '/api/dashboard/quick_stats'
+        assert 'X-Profile-Id' not in client.get(path).headers
+        assert 'X-Profile-Id' not in client.get(path, headers={'X-Profile': sign('wrong', f'GET {path}')}).headers
+        assert 'X-Profile-Id' not in client.get(path, headers={'X-Profile': sign('test-secret', 'GET /other')}).headers
+
+    def test_sampled_profiles_rotate(self, tmp_path):
+        """With a sample rate of 1 every request is captured, and only the newest are kept"""
+        client = profiler_app(tmp_path, PROFILER_SAMPLE_RATE=1.0).test_client()
+        ids = [client.get('/api/dashboard/study_progress').headers['X-Profile-Id'] for _ in range(3)]
+
+        assert sorted(path.stem for path in (tmp_path / 'profiles').glob('*.json')) == sorted(ids[1:])
@@ -0,0 +1,21 @@
+import sqlite3
+from cmd.server import create_db_app
+from internal.storage.schema import ensure_schema, reset_schema_stamp, schema_stamp
+
+class TestSchema:
+    def test_schema_checked_once_per_version(self, tmp_path):
+        """The schema is only created the first time a database is seen"""
+        db_path = tmp_path / 'words.db'
+        app = create_db_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+
+        assert ensure_schema(app) is True
+        assert ensure_schema(app) is False
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == schema_stamp()
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        assert {'words', 'groups', 'words_groups', 'study_sessions', 'word_review_items'} <= tables
+
+        reset_schema_stamp(app)
+        assert ensure_schema(app) is True
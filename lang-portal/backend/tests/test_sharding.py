@@ -0,0 +1,60 @@
+import pytest
+from flask.testing import FlaskClient
+import json
+
+@pytest.fixture
+def sharded_app(app, tmp_path):
+    app.config.update({
+        'SHARDING_ENABLED': True,
+        'SHARD_DIR': tmp_path / 'shards'
+    })
+    yield app
+    router = app.extensions.get('shard_router')
+    if router is not None:
+        router.dispose()
+
+def create_session(client: FlaskClient, learner_id):
+    group_id = json.loads(client.get('/api/groups').data)['items'][0]['id']
+    activity_id = json.loads(client.get('/api/study_activities').data)['items'][0]['id']
+    return client.post('/api/study_sessions',
+                       json={'group_id': group_id, 'study_activity_id': activity_id},
+                       headers={'X-Learner-Id': learner_id})
+
+class TestSharding:
+    def test_sessions_are_isolated_per_learner(self, sharded_app, client: FlaskClient, tmp_path):
+        """Sessions created by one learner are invisible to other learners"""
+        response = create_session(client, 'alice')
+        assert response.status_code == 201
+        assert (tmp_path / 'shards' / 'alice.db').exists()
+
+        alice = json.loads(client.get('/api/study_sessions', headers={'X-Learner-Id': 'alice'}).data)
+        bob = json.loads(client.get('/api/study_sessions', headers={'X-Learner-Id': 'bob'}).data)
+        shared = json.loads(client.get('/api/study_sessions').data)
+
+        assert len(alice['items']) == 1
+        assert alice['items'][0]['group_name'] == 'Basic Greetings'
+        assert bob['items'] == []
+        assert shared['items'] == []
+
+    def test_shared_vocabulary_is_read_only(self, sharded_app, client: FlaskClient):
+        """Vocabulary is readable from a shard but cannot be written through it"""
+        response = client.get('/api/words', headers={'X-Learner-Id': 'alice'})
+        assert response.status_code == 200
+        assert len(json.loads(response.data)['items']) > 0
+
+        response = client.post('/api/study_activities', json={'name': 'Nope'},
+                               headers={'X-Learner-Id': 'alice'})
+        assert response.status_code == 403
+
+    def test_engine_lru_eviction(self, sharded_app, client: FlaskClient):
+        """Only the most recently used shard engines stay open"""
+        sharded_app.config['SHARD_MAX_OPEN_ENGINES'] = 2
+        for learner_id in ('a', 'b', 'c'):
+            client.get('/api/study_sessions', headers={'X-Learner-Id': learner_id})
+
+        assert sharded_app.extensions['shard_router'].open_learners() == ['b', 'c']
+
+    def test_invalid_learner_id(self, sharded_app, client: FlaskClient):
+        """Learner ids that are not safe file names are rejected"""
+        response = client.get('/api/study_sessions', headers={'X-Learner-Id': '../etc'})
+        assert response.status_code == 400
@@ -0,0 +1,45 @@
+import json
+import logging
+from flask.testing import FlaskClient
+from cmd.server import create_app
+from internal.middleware.slow_query import logger, fingerprint, summarize, disable_slow_query_log
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def emit(self, record):
+        self.entries.append(json.loads(record.getMessage()))
+
+class TestSlowQueryLog:
+    def test_slow_statements_are_logged_with_plan(self, tmp_path):
+        """With a zero threshold every statement is logged with caller and query plan"""
+        app = create_app({'SLOW_QUERY_MS': 0, 'SLOW_QUERY_LOG_FILE': tmp_path / 'slow.log'})
+        handler = ListHandler()
+        logger.addHandler(handler)
+        try:
+            group_id = json.loads(app.test_client().get('/api/groups').data)['items'][0]['id']
+            handler.entries.clear()
+            assert app.test_client().get(f'/api/groups/{group_id}/words').status_code == 200
+        finally:
+            logger.removeHandler(handler)
+            disable_slow_query_log()
+
+        words_query = next(entry for entry in handler.entries if 'words_groups' in entry['statement'])
+        assert words_query['caller'].startswith('internal/handlers/groups.py:')
+        assert str(group_id) in words_query['parameters']
+        assert words_query['plan'] and not words_query['plan'][0].startswith('EXPLAIN failed')
+        assert words_query['fingerprint'] == fingerprint(words_query['statement'])
+
+    def test_fingerprint_ignores_literals(self):
+        assert fingerprint("SELECT * FROM words WHERE id = 1") == fingerprint("SELECT *  FROM words WHERE id = 22")
+        assert fingerprint("SELECT * FROM words WHERE id IN (?, ?)") == fingerprint("SELECT * FROM words WHERE id IN (?)")
+        assert fingerprint("SELECT * FROM words") != fingerprint("SELECT * FROM groups")
+
+    def test_summarize_groups_by_fingerprint(self):
+        lines = [json.dumps({'fingerprint': fingerprint(statement), 'statement': statement,
+                             'duration_ms': duration, 'caller': 'a.py:1 get'})
+                 for statement, duration in [("SELECT 1", 5), ("SELECT 2", 15), ("SELECT * FROM words", 1)]]
+        summary = summarize(lines + ['not json'])
+        assert [(group['count'], group['total_ms']) for group in summary] == [(2, 20), (1, 1)]
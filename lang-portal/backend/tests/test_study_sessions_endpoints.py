@@ -1,7 +1,11 @@
 from flask.testing import FlaskClient
 import json
-from datetime import datetime
+import sqlite3
+import threading
+from datetime import datetime, timedelta
 from tests.utils.validation import ResponseValidator
+from internal.models.models import db, Group, StudyActivity, StudySession
+from internal.storage.write_queue import PendingReview, ReviewWriteQueue
 
 class TestStudySessionsEndpoints:
     def test_get_study_sessions_list(self, client: FlaskClient):
@@ -42,10 +46,13 @@ class TestStudySessionsEndpoints:
             assert isinstance(word['correct_count'], int)
             assert isinstance(word['wrong_count'], int)
 
-    def test_record_word_review(self, client: FlaskClient):
+    def test_record_word_review(self, client: FlaskClient, setup_study_session):
         """Test POST /api/study_sessions/:id/words/:word_id/review"""
         payload = {"correct": True}
-        response = client.post('/api/study_sessions/1/words/1/review',
+        # The session and word must exist
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        response = client.post(f'/api/study_sessions/{session_id}/words/{word_id}/review',
                              json=payload)
         assert response.status_code in [200, 201]
         data = json.loads(response.data)
@@ -56,4 +63,133 @@ class TestStudySessionsEndpoints:
             assert isinstance(data['word_id'], int)
         assert isinstance(data['study_session_id'], int)
         assert isinstance(data['correct'], bool)
-        assert isinstance(datetime.fromisoformat(data['created_at']), datetime)
\ No newline at end of file
+        assert isinstance(datetime.fromisoformat(data['created_at']), datetime)
+
+    def test_record_word_review_through_write_queue(self, app, client: FlaskClient, setup_study_session):
+        """Reviews posted concurrently are all committed by the group-commit writer"""
+        app.config['REVIEW_WRITE_QUEUE'] = True
+        # A longer window makes sure concurrent requests share commits
+        app.config['REVIEW_WRITE_MAX_DELAY_MS'] = 50
+        session_id = setup_study_session['id']
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        responses = []
+
+        def post_reviews():
+            thread_client = app.test_client()
+            for n in range(10):
+                responses.append(thread_client.post(
+                    f'/api/study_sessions/{session_id}/words/{word_id}/review',
+                    json={'correct': n % 2 == 0}
+                ))
+
+        threads = [threading.Thread(target=post_reviews) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        app.extensions['review_write_queue'].stop()
+
+        assert all(response.status_code == 201 for response in responses)
+        ids = {json.loads(response.data)['id'] for response in responses}
+        assert len(ids) == 40
+
+        reviews = json.loads(client.get('/api/word_reviews').data)['items']
+        assert ids <= {review['id'] for review in reviews}
+
+        stats = app.extensions['review_write_queue'].stats()
+        assert stats['items'] == 40
+        assert stats['batches'] < 40
+        assert stats['largest_batch'] > 1
+
+    def test_timed_out_review_is_not_written(self, app, setup_study_session):
+        """A review whose request gave up waiting is dropped by the writer"""
+        with app.app_context():
+            word_id = db.session.execute(db.text('SELECT id FROM words LIMIT 1')).scalar()
+            write_queue = ReviewWriteQueue()
+            pending = PendingReview(db.engine, {
+                'word_id': word_id,
+                'study_session_id': setup_study_session['id'],
+                'correct': True,
+                'created_at': datetime.utcnow()
+            })
+            assert pending.cancel()
+            write_queue._write([pending])
+
+            assert not pending.claim()
+            assert write_queue.stats()['items'] == 0
+            count = db.session.execute(db.text(
+                'SELECT COUNT(*) FROM word_review_items WHERE study_session_id = :id'
+            ), {'id': setup_study_session['id']}).scalar()
+            assert count == 0
+
+    def test_review_correct_must_be_boolean(self, app, client: FlaskClient, setup_study_session, monkeypatch):
+        """Both write paths reject a non-boolean correct; a backed-up writer answers 503"""
+        word_id = json.loads(client.get('/api/words').data)['items'][0]['id']
+        url = f"/api/study_sessions/{setup_study_session['id']}/words/{word_id}/review"
+        for queued in (False, True):
+            app.config['REVIEW_WRITE_QUEUE'] = queued
+            for value in ('false', 1, None):
+                assert client.post(url, json={'correct': value}).status_code == 400
+
+        def timeout(self, engine, values, timeout=30):
+            raise TimeoutError('Timed out waiting for the review writer')
+
+        monkeypatch.setattr(ReviewWriteQueue, 'submit', timeout)
+        response = client.post(url, json={'correct': True})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    def test_study_sessions_keyset_pagination(self, app, client: FlaskClient):
+        """Test GET /api/study_sessions walks pages with the before cursor"""
+        with app.app_context():
+            group = Group.query.first()
+            activity = StudyActivity.query.first()
+            start = datetime(2024, 1, 1)
+            for day in range(5):
+                db.session.add(StudySession(group_id=group.id, study_activity_id=activity.id,
+                                            created_at=start + timedelta(days=day)))
+            db.session.commit()
+
+        seen = []
+        url = '/api/study_sessions?limit=2&from=2024-01-01&to=2024-01-05'
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            seen.extend(item['start_time'] for item in data['items'])
+            cursor = data['pagination']['next_cursor']
+            url = f'/api/study_sessions?limit=2&from=2024-01-01&to=2024-01-05&before={cursor}' if cursor else None
+
+        assert seen == [(start + timedelta(days=day)).isoformat() for day in (3, 2, 1, 0)]
+
+    def test_study_sessions_pagination_whole_seconds(self, app, client: FlaskClient):
+        """Sessions stored by SQLite's datetime() (no fractional seconds) page to the end"""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        group_id = conn.execute('SELECT id FROM groups LIMIT 1').fetchone()[0]
+        activity_id = conn.execute('SELECT id FROM study_activities LIMIT 1').fetchone()[0]
+        ids = [conn.execute(
+            "INSERT INTO study_sessions (group_id, study_activity_id, created_at) "
+            "VALUES (?, ?, datetime('2030-01-01 10:00:00'))", (group_id, activity_id)
+        ).lastrowid for _ in range(3)]
+        conn.commit()
+        conn.close()
+
+        seen = []
+        params = {'limit': 1, 'from': '2030-01-01'}
+        for _ in range(5):
+            response = client.get('/api/study_sessions', query_string=params)
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            seen.extend(item['id'] for item in data['items'])
+            if not data['pagination']['has_more']:
+                break
+            params['before'] = data['pagination']['next_cursor']
+
+        assert seen == sorted(ids, reverse=True)
+
+    def test_study_sessions_invalid_cursor(self, client: FlaskClient):
+        """Test GET /api/study_sessions rejects malformed cursors"""
+        assert client.get('/api/study_sessions?before=yesterday').status_code == 400
+        assert client.get('/api/study_sessions?limit=0').status_code == 400
+        assert client.get('/api/study_sessions?limit=abc').status_code == 400
+        assert client.get('/api/study_sessions/1/words?after=x').status_code == 400
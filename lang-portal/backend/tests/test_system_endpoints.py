@@ -1,5 +1,9 @@
 from flask.testing import FlaskClient
 import json
+import sqlite3
+from sqlalchemy.exc import OperationalError
+from cmd.server import create_app
+from internal.handlers.activities import StudyActivityListAPI
 
 class TestSystemEndpoints:
     def test_reset_history(self, client: FlaskClient):
@@ -18,4 +22,26 @@ class TestSystemEndpoints:
         data = json.loads(response.data)
         
         assert data['success'] is True
-        assert data['message'] == "System has been fully reset"
\ No newline at end of file
+        assert data['message'] == "System has been fully reset"
+
+    def test_lock_errors_answer_503_in_production(self, monkeypatch):
+        """With DEBUG and TESTING off, lock timeouts still reach the app's error handler"""
+        app = create_app({'DEBUG': False, 'TESTING': False})
+        assert not app.config['PROPAGATE_EXCEPTIONS'] and not app.testing
+
+        def locked(self):
+            raise OperationalError('SELECT 1', {}, sqlite3.OperationalError('database is locked'))
+
+        monkeypatch.setattr(StudyActivityListAPI, 'get', locked)
+        response = app.test_client().get('/api/study_activities')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert json.loads(response.data) == {'error': 'Database is locked'}
+
+        def broken(self):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(StudyActivityListAPI, 'get', broken)
+        response = app.test_client().get('/api/study_activities')
+        assert response.status_code == 500
+        assert json.loads(response.data) == {'error': 'Internal server error'}
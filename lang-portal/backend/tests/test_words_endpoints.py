@@ -1,5 +1,8 @@
 from flask.testing import FlaskClient
 import json
+import sqlite3
+from cmd.server import create_app
+from internal.cache.registry import invalidate_tables
 from tests.utils.validation import ResponseValidator
 
 class TestWordsEndpoints:
@@ -25,4 +28,101 @@ class TestWordsEndpoints:
         # Updated to match actual API response
         assert 'kanji' in data  
         assert 'english' in data
-        assert 'id' in data
\ No newline at end of file
+        assert 'id' in data
+
+    def test_get_difficult_words(self, app, client: FlaskClient, setup_study_session):
+        """Test GET /api/words/difficult ranks words by error rate"""
+        session_id = setup_study_session['id']
+        group_id = setup_study_session['group_id']
+        words = json.loads(client.get(f'/api/groups/{group_id}/words').data)['items']
+        hard_word = words[0]['id']
+        easy_word = json.loads(client.get('/api/words').data)['items'][-1]['id']
+
+        for correct in (False, False, True):
+            client.post(f'/api/study_sessions/{session_id}/words/{hard_word}/review',
+                        json={'correct': correct})
+        for _ in range(3):
+            client.post(f'/api/study_sessions/{session_id}/words/{easy_word}/review',
+                        json={'correct': True})
+
+        response = client.get('/api/words/difficult?limit=2')
+        assert response.status_code == 200
+        items = json.loads(response.data)['items']
+        assert [item['id'] for item in items] == [hard_word, easy_word]
+        assert items[0]['wrong_count'] == 2
+        assert items[0]['correct_count'] == 1
+        assert items[0]['score'] > items[1]['score']
+
+        # Filtering by group still finds the hard word
+        response = client.get(f'/api/words/difficult?group_id={group_id}')
+        ids = [item['id'] for item in json.loads(response.data)['items']]
+        assert hard_word in ids
+
+        assert client.get('/api/words/difficult?limit=0').status_code == 400
+        assert client.get('/api/words/difficult?limit=abc').status_code == 400
+
+    def test_get_words_by_group_membership(self, app, client: FlaskClient):
+        """Test GET /api/words?in=&any=&not_in= group set algebra"""
+        conn = sqlite3.connect(app.config['DATABASE'])
+        word_ids = [row[0] for row in conn.execute("SELECT id FROM words ORDER BY id LIMIT 3")]
+        group_ids = []
+        for name in ('Set A', 'Set B'):
+            group_ids.append(conn.execute("INSERT INTO groups (name) VALUES (?)", (name,)).lastrowid)
+        # A = {w0, w1}, B = {w1, w2}
+        conn.executemany("INSERT INTO words_groups (word_id, group_id) VALUES (?, ?)", [
+            (word_ids[0], group_ids[0]), (word_ids[1], group_ids[0]),
+            (word_ids[1], group_ids[1]), (word_ids[2], group_ids[1])
+        ])
+        conn.commit()
+        invalidate_tables('words_groups')
+
+        def ids(query):
+            response = client.get(f'/api/words?{query}')
+            assert response.status_code == 200
+            return sorted(item['id'] for item in json.loads(response.data)['items'])
+
+        try:
+            a, b = group_ids
+            assert ids(f'in={a},{b}') == [word_ids[1]]
+            assert ids(f'any={a},{b}') == word_ids
+            assert ids(f'in={a}&not_in={b}') == [word_ids[0]]
+            assert word_ids[0] not in ids(f'not_in={a}')
+
+            assert client.get('/api/words?in=1,x').status_code == 400
+        finally:
+            conn.executemany("DELETE FROM words_groups WHERE group_id = ?", [(g,) for g in group_ids])
+            conn.executemany("DELETE FROM groups WHERE id = ?", [(g,) for g in group_ids])
+            conn.commit()
+            conn.close()
+            invalidate_tables('groups', 'words_groups')
+
+    def test_group_filters_follow_membership_writes(self, app, client: FlaskClient, setup_study_session):
+        """The members endpoint and other processes' writes invalidate the group bitmaps"""
+        group_id = setup_study_session['group_id']
+        conn = sqlite3.connect(app.config['DATABASE'])
+        word_id = conn.execute(
+            "SELECT id FROM words WHERE id NOT IN (SELECT word_id FROM words_groups WHERE group_id = ?) LIMIT 1",
+            (group_id,)
+        ).fetchone()[0]
+        coherent = create_app({'CACHE_COHERENCE': True}).test_client()
+
+        def group_word_ids(client):
+            response = client.get(f'/api/words?in={group_id}')
+            return [item['id'] for item in json.loads(response.data)['items']]
+
+        try:
+            assert word_id not in group_word_ids(client)
+            assert word_id not in group_word_ids(coherent)
+
+            client.post(f'/api/groups/{group_id}/members', json={'word_ids': [word_id]})
+            assert word_id in group_word_ids(client)
+
+            # Another worker process removes it through its own connection
+            conn.execute("DELETE FROM words_groups WHERE word_id = ? AND group_id = ?", (word_id, group_id))
+            conn.commit()
+            assert word_id not in group_word_ids(coherent)
+        finally:
+            conn.execute("DELETE FROM words_groups WHERE word_id = ? AND group_id = ?", (word_id, group_id))
+            conn.commit()
+            conn.close()
+            invalidate_tables('words_groups')
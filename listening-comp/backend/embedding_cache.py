@@ -0,0 +1,125 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 50000
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache entry.
+
+    NFKC folds full-width and half-width forms, and runs of whitespace
+    collapse to a single space.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent embedding cache in a SQLite file, keyed by (model, normalized text hash).
+
+    Vectors are stored as float32 bytes. When the cache grows past
+    ``max_entries``, the least recently used tenth is evicted.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'embedding_cache.sqlite3')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for the text, or None on a miss"""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Return the cached embedding for each text, with None for misses"""
+        keys = [text_hash(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key in set(keys):
+                    row = self._conn.execute(
+                        "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?",
+                        (model, key)
+                    ).fetchone()
+                    if row is not None:
+                        vectors[key] = np.frombuffer(row[0], dtype=np.float32).tolist()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(time.time(), model, key) for key in vectors]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return [vectors.get(key) for key in keys]
+
+    def put(self, model: str, text: str, vector: List[float]) -> None:
+        """Store an embedding, evicting the least recently used entries if the cache is full"""
+        self.put_many(model, [text], [vector])
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store several embeddings in one transaction"""
+        now = time.time()
+        rows = [
+            (model, text_hash(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._evict()
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Evict a batch at once so a full cache does not delete on every insert
+        excess = count - self.max_entries + max(1, self.max_entries // 10)
+        self._conn.execute("""
+            DELETE FROM embeddings WHERE rowid IN (
+                SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?
+            )
+        """, (excess,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
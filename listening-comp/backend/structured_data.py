@@ -330,14 +330,9 @@ Make sure to preserve all Japanese characters exactly as they appear in the tran
             return False
             
         try:
-            successful_saves = 0
-            for question in questions:
-                if self._is_valid_question(question):
-                    try:
-                        self.vector_store.add_question(question, source_file)
-                        successful_saves += 1
-                    except Exception as e:
-                        print(f"Warning: Failed to add question to vector store: {str(e)}")
+            valid_questions = [q for q in questions if self._is_valid_question(q)]
+            # One batched embedding pass and one vector store write for the whole transcript
+            successful_saves = self.vector_store.add_questions(valid_questions, source_file)
             
             print(f"Successfully saved {successful_saves} questions to vector store")
             return successful_saves > 0
@@ -5,14 +5,19 @@ from google import genai
 from dotenv import load_dotenv
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
+from backend.embedding_cache import EmbeddingCache
 
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 EMBEDDING_MODEL = "text-embedding-004"
+# The embedding API accepts at most 100 texts per request
+EMBEDDING_BATCH_SIZE = 100
+# Stay under Chroma's maximum number of records per add
+CHROMA_BATCH_SIZE = 5000
 
 
 class QuestionVectorStore:
-    def __init__(self, persist_dir: str = None):
+    def __init__(self, persist_dir: str = None, embedding_cache: EmbeddingCache = None):
         # Load environment variables
         load_dotenv()
         
@@ -38,6 +43,9 @@ class QuestionVectorStore:
         # Initialize embedding model
         self.embedding_model = EMBEDDING_MODEL
         self.client = genai.Client(api_key=self.api_key)
+
+        # Repeat texts are answered from the local cache instead of the API
+        self.embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache()
         
         # Mock data for different practice types
         self.mock_data = {
@@ -56,60 +64,105 @@ class QuestionVectorStore:
         }
     
     def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using Google's embedding model"""        
-        result = self.client.models.embed_content(
-            model=self.embedding_model,
-            contents=text
-        )
+        """Generate embedding for text using Google's embedding model, or return the cached one"""
+        return self.generate_embeddings([text])[0]
 
-        return result
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with as few API calls as possible.
 
-    def add_question(self, question: Dict[str, str], source_file: str) -> None:
-        """Add a question and its embeddings to the vector store."""
-        # Create the embedding for the question text
-        text_to_embed = f"{question['introduction']} {question['conversation']} {question['question']}"
-        
-        try:
+        Cached texts are looked up locally; the rest are deduplicated and sent
+        EMBEDDING_BATCH_SIZE at a time.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: One embedding per text, in the same order
+        """
+        embeddings = self.embedding_cache.get_many(self.embedding_model, texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+
+        fetched = {}
+        for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+            batch = missing[start:start + EMBEDDING_BATCH_SIZE]
             result = self.client.models.embed_content(
                 model=self.embedding_model,
-                contents=text_to_embed
+                contents=batch
             )
-            
-            # Get the embedding values
-            embedding = result.embeddings[0].values
-            
-            # Create a unique ID for the question
-            question_id = str(hash(text_to_embed))
-            
-            # Prepare the full text to store
-            full_text = f"""Introduction:
-                {question['introduction']}
+            values = [embedding.values for embedding in result.embeddings]
+            self.embedding_cache.put_many(self.embedding_model, batch, values)
+            fetched.update(zip(batch, values))
 
-                Conversation:
-                {question['conversation']}
+        return [embedding if embedding is not None else fetched[text]
+                for text, embedding in zip(texts, embeddings)]
 
-                Question:
-                {question['question']}
+    def add_question(self, question: Dict[str, str], source_file: str) -> None:
+        """Add a question and its embeddings to the vector store."""
+        self.add_questions([question], source_file)
 
-                Options:
-                {question['options']}"""
+    def add_questions(self, questions: List[Dict[str, str]], source_file: str) -> int:
+        """
+        Add several questions with batched embedding calls and a single Chroma write.
 
-            # Store in ChromaDB
-            self.collection.add(
-                ids=[question_id],
-                embeddings=[embedding],
-                documents=[full_text],
-                metadatas=[{
+        Args:
+            questions: List of question dictionaries
+            source_file: Name of source transcript file
+
+        Returns:
+            int: Number of questions added (repeats within the list are added once)
+        """
+        # Create the embedding text and a unique ID for each question
+        records = {}
+        for question in questions:
+            text_to_embed = f"{question['introduction']} {question['conversation']} {question['question']}"
+            records.setdefault(str(hash(text_to_embed)), (text_to_embed, question))
+        if not records:
+            return 0
+
+        try:
+            embeddings = self.generate_embeddings([text for text, _ in records.values()])
+            
+            ids, documents, metadatas = [], [], []
+            for question_id, (_, question) in records.items():
+                ids.append(question_id)
+                documents.append(self._question_document(question))
+                metadatas.append({
                     'source': source_file,
                     'introduction': question['introduction'],
                     'conversation': question['conversation'],
                     'question': question['question'],
                     'options': question['options']
-                }]
-            )
+                })
+
+            # Store in ChromaDB
+            for start in range(0, len(ids), CHROMA_BATCH_SIZE):
+                end = start + CHROMA_BATCH_SIZE
+                self.collection.add(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end]
+                )
             
         except Exception as e:
             raise Exception(f"Error creating embedding: {str(e)}")
+
+        return len(ids)
+
+    def _question_document(self, question: Dict[str, str]) -> str:
+        """Prepare the full text to store"""
+        return f"""Introduction:
+                {question['introduction']}
+
+                Conversation:
+                {question['conversation']}
+
+                Question:
+                {question['question']}
+
+                Options:
+                {question['options']}"""
     
     def search_similar(self, query: str, n_results: int = 3) -> List[Dict]:
         """Search for similar questions using semantic search"""
@@ -166,7 +219,7 @@ class QuestionVectorStore:
         
         try:
             # Create embedding for the query
-            query_embedding = self._create_embedding(query)
+            query_embedding = self.generate_embedding(query)
             
             # Convert to numpy array for similarity search
             if isinstance(query_embedding, list):